@@ -0,0 +1,89 @@
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+import logging
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import Settings
+from app.pipeline import PipelineRunner
+from app.schemas import PipelineResult
+
+
+logger = logging.getLogger(__name__)
+
+
+def date_range(start: date, end: date) -> list[date]:
+    if end < start:
+        raise ValueError(f"--to {end.isoformat()} is before --from {start.isoformat()}")
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+
+def run_backfill(
+    settings: Settings,
+    session_factory: sessionmaker[Session],
+    *,
+    start: date,
+    end: date,
+    workers: int,
+    key_prefix: str = "backfill-",
+    trigger_source: str = "manual",
+    on_result: Callable[[int, int, PipelineResult], None] | None = None,
+) -> list[PipelineResult]:
+    run_dates = date_range(start, end)
+    # One runner and one engine are shared; every run opens its own session from the pool.
+    runner = PipelineRunner(settings, session_factory)
+    results: list[PipelineResult] = []
+
+    def run_one(run_date: date) -> PipelineResult:
+        run_key = f"{key_prefix}{run_date.isoformat()}"
+        try:
+            return runner.run(run_date=run_date, run_key=run_key, trigger_source=trigger_source)
+        except Exception:
+            logger.exception("backfill run crashed", extra={"run_key": run_key})
+            return _crashed_result(run_date, run_key, trigger_source)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="backfill") as pool:
+        futures = [pool.submit(run_one, run_date) for run_date in run_dates]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if on_result:
+                on_result(len(results), len(run_dates), result)
+
+    return sorted(results, key=lambda result: result.run_date)
+
+
+def format_progress(done: int, total: int, result: PipelineResult) -> str:
+    return f"[{done}/{total}] run_key={result.run_key} status={result.status} reused={result.reused_existing_run}"
+
+
+def format_summary(results: list[PipelineResult]) -> str:
+    header = f"{'run_date':<12}{'run_key':<32}{'status':<11}{'total':>9}{'valid':>9}{'invalid':>9}  reused"
+    lines = [header, "-" * len(header)]
+    for result in results:
+        lines.append(
+            f"{result.run_date.isoformat():<12}{result.run_key:<32}{result.status:<11}"
+            f"{result.total_records:>9}{result.valid_records:>9}{result.invalid_records:>9}  {result.reused_existing_run}"
+        )
+
+    failed = sum(1 for result in results if result.status == "failed")
+    reused = sum(1 for result in results if result.reused_existing_run)
+    lines.append("-" * len(header))
+    lines.append(f"runs={len(results)} succeeded={len(results) - failed} failed={failed} reused={reused}")
+    return "\n".join(lines)
+
+
+def _crashed_result(run_date: date, run_key: str, trigger_source: str) -> PipelineResult:
+    return PipelineResult(
+        run_id=0,
+        run_key=run_key,
+        run_date=run_date,
+        trigger_source=trigger_source,
+        status="failed",
+        total_records=0,
+        valid_records=0,
+        invalid_records=0,
+        report_path=None,
+        reused_existing_run=False,
+    )
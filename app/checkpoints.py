@@ -0,0 +1,110 @@
+import logging
+import os
+from pathlib import Path
+import pickle
+import shutil
+
+from sqlalchemy.orm import Session
+
+from app.run_store import delete_step_checkpoints, get_step_checkpoint, save_step_checkpoint
+
+
+logger = logging.getLogger(__name__)
+
+
+# Step outputs are pickled in chunks: they are internal artifacts that must round-trip
+# exactly (dict key order feeds the stored payload) and never leave outputs/checkpoints.
+class CheckpointStore:
+    def __init__(
+        self,
+        db: Session,
+        *,
+        run_id: int,
+        root: Path,
+        input_fingerprint: str,
+        rules_version: str,
+        chunk_size: int,
+    ) -> None:
+        self.db = db
+        self.run_id = run_id
+        self.root = root
+        self.input_fingerprint = input_fingerprint
+        self.rules_version = rules_version
+        self.chunk_size = chunk_size
+
+    def restorable_prefix(self, step_names: list[str]) -> int:
+        count = 0
+        for step_name in step_names:
+            if not self._is_current(step_name):
+                break
+            count += 1
+        return count
+
+    def record_count(self, step_name: str) -> int:
+        checkpoint = get_step_checkpoint(self.db, run_id=self.run_id, step_name=step_name)
+        return checkpoint.record_count if checkpoint else 0
+
+    def load(self, step_name: str) -> object:
+        checkpoint = get_step_checkpoint(self.db, run_id=self.run_id, step_name=step_name)
+        if checkpoint is None:
+            raise FileNotFoundError(f"no checkpoint for step '{step_name}'")
+
+        with Path(checkpoint.path).open("rb") as infile:
+            is_tuple = pickle.load(infile)
+            parts = []
+            for _ in range(pickle.load(infile)):
+                remaining = pickle.load(infile)
+                part: list[object] = []
+                while remaining:
+                    chunk = pickle.load(infile)
+                    part.extend(chunk)
+                    remaining -= len(chunk)
+                parts.append(part)
+        return tuple(parts) if is_tuple else parts[0]
+
+    def save(self, step_name: str, result: object, record_count: int) -> None:
+        try:
+            path = self._write(step_name, result)
+            save_step_checkpoint(
+                self.db,
+                run_id=self.run_id,
+                step_name=step_name,
+                path=str(path),
+                input_fingerprint=self.input_fingerprint,
+                rules_version=self.rules_version,
+                record_count=record_count,
+            )
+        except Exception:
+            # A missing checkpoint only costs recomputation on retry, so never fail the run for it.
+            self.db.rollback()
+            logger.warning("could not save step checkpoint", exc_info=True, extra={"step_name": step_name})
+
+    def clear(self) -> None:
+        delete_step_checkpoints(self.db, self.run_id)
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _is_current(self, step_name: str) -> bool:
+        checkpoint = get_step_checkpoint(self.db, run_id=self.run_id, step_name=step_name)
+        return (
+            checkpoint is not None
+            and checkpoint.input_fingerprint == self.input_fingerprint
+            and checkpoint.rules_version == self.rules_version
+            and Path(checkpoint.path).exists()
+        )
+
+    def _write(self, step_name: str, result: object) -> Path:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / f"{step_name}.pkl"
+        temp_path = path.with_name(path.name + ".tmp")
+
+        is_tuple = isinstance(result, tuple)
+        parts = result if is_tuple else (result,)
+        with temp_path.open("wb") as outfile:
+            pickle.dump(is_tuple, outfile)
+            pickle.dump(len(parts), outfile)
+            for part in parts:
+                pickle.dump(len(part), outfile)
+                for start in range(0, len(part), self.chunk_size):
+                    pickle.dump(part[start : start + self.chunk_size], outfile, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+        return path
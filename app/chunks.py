@@ -0,0 +1,38 @@
+from collections.abc import Callable, Sequence
+import threading
+
+from app.dag import StepCancelledError
+
+
+class ChunkTracker:
+    # Remembers which chunks of a step have committed across that step's retry attempts, so a
+    # retry re-executes only the failed chunk and the ones after it. Each chunk must commit its
+    # own work before returning.
+    def __init__(self, chunks: Sequence[Callable[[], object]]) -> None:
+        self.chunks = list(chunks)
+        self.completed: set[int] = set()
+
+    @property
+    def total(self) -> int:
+        return len(self.chunks)
+
+    def run(
+        self,
+        on_chunk_done: Callable[[int], None] | None = None,
+        *,
+        cancelled: threading.Event | None = None,
+    ) -> int:
+        # Returns how many chunks this call executed; on_chunk_done gets the running count.
+        executed = 0
+        for index, chunk in enumerate(self.chunks):
+            if index in self.completed:
+                continue
+            if cancelled is not None and cancelled.is_set():
+                # Stop between chunks; the ones already committed stay recorded for a later retry.
+                raise StepCancelledError(f"cancelled after {len(self.completed)} of {self.total} chunks")
+            chunk()
+            self.completed.add(index)
+            executed += 1
+            if on_chunk_done is not None:
+                on_chunk_done(executed)
+        return executed
@@ -0,0 +1,57 @@
+from functools import lru_cache
+import json
+from typing import Protocol
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on optional install
+    orjson = None
+
+
+class JsonCodec(Protocol):
+    name: str
+
+    def loads(self, data: bytes) -> object: ...
+
+    def dumps_line(self, row: dict[str, object]) -> bytes: ...
+
+    def dumps_document(self, payload: dict[str, object]) -> bytes: ...
+
+
+class StdlibCodec:
+    name = "json"
+
+    def __init__(self) -> None:
+        # json.dumps(..., sort_keys=True) builds a new encoder per call; reuse one instead.
+        self._line_encoder = json.JSONEncoder(sort_keys=True)
+        self._document_encoder = json.JSONEncoder(sort_keys=True, indent=2)
+
+    def loads(self, data: bytes) -> object:
+        return json.loads(data)
+
+    def dumps_line(self, row: dict[str, object]) -> bytes:
+        return self._line_encoder.encode(row).encode("utf-8") + b"\n"
+
+    def dumps_document(self, payload: dict[str, object]) -> bytes:
+        return self._document_encoder.encode(payload).encode("utf-8") + b"\n"
+
+
+class OrjsonCodec(StdlibCodec):
+    # Only decoding moves to orjson: its compact, non-ASCII-escaped output would change published bytes.
+    name = "orjson"
+
+    def loads(self, data: bytes) -> object:
+        return orjson.loads(data)
+
+
+@lru_cache(maxsize=None)
+def get_codec(name: str = "auto") -> JsonCodec:
+    if name == "auto":
+        name = "orjson" if orjson is not None else "json"
+    if name == "json":
+        return StdlibCodec()
+    if name == "orjson":
+        if orjson is None:
+            raise RuntimeError("JSON_CODEC=orjson requires the orjson package")
+        return OrjsonCodec()
+    raise ValueError(f"unknown JSON codec: {name}")
@@ -0,0 +1,143 @@
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on optional install
+    np = None
+
+from app.schemas import InvalidRecord
+from app.step_logic import transform_records
+
+
+# Reason codes in the order validate_records checks them; 0 means the record is valid.
+REASONS = (
+    None,
+    "age must be an integer",
+    "record_key is required",
+    "full_name is required",
+    "email format is invalid",
+    "age must be between 18 and 120",
+)
+AGE_GROUPS = ("18-34", "35-54", "55+")
+
+# Digit strings up to 18 characters always fit in int64.
+_MAX_FAST_DIGITS = 18
+_INT64_MIN, _INT64_MAX = -(2**63), 2**63 - 1
+_OUT_OF_RANGE = 2**62
+
+
+def require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("VALIDATION_ENGINE=numpy requires the numpy package")
+
+
+def validate_records_columnar(
+    records: list[dict[str, object]],
+    *,
+    start_index: int = 0,
+) -> tuple[list[dict[str, object]], list[InvalidRecord]]:
+    # Same result as validate_records: field strings are still normalized per record (they are
+    # the published values), while the age coercion, range, bucketing and reason selection run
+    # on column arrays.
+    require_numpy()
+    if not records:
+        return [], []
+
+    keys = [str(record.get("record_key", "")).strip() for record in records]
+    names = [str(record.get("full_name", "")).strip() for record in records]
+    emails = [str(record.get("email", "")).strip().lower() for record in records]
+    ages, age_ok = _coerce_ages([record.get("age") for record in records])
+
+    count = len(records)
+    # len() counts embedded and trailing NULs, which numpy's fixed-width strings would drop.
+    has_key = np.fromiter(map(len, keys), dtype=np.int64, count=count) > 0
+    has_name = np.fromiter(map(len, names), dtype=np.int64, count=count) > 0
+    email_column = np.array(emails, dtype=str)
+    email_ok = (np.char.find(email_column, "@") >= 0) & (np.char.find(email_column, ".") >= 0)
+    in_range = (ages >= 18) & (ages <= 120)
+
+    codes = np.select(
+        [~age_ok, ~has_key, ~has_name, ~email_ok, ~in_range],
+        [1, 2, 3, 4, 5],
+        default=0,
+    )
+    groups = (ages > 34).astype(np.int8) + (ages > 54)
+
+    # tolist() hands back Python ints so published payloads never contain numpy scalars.
+    failed = np.flatnonzero(codes)
+    invalid = [
+        InvalidRecord(start_index + offset, records[offset], REASONS[code])
+        for offset, code in zip(failed.tolist(), codes[failed].tolist())
+    ]
+    passed = np.flatnonzero(codes == 0)
+    valid = [
+        {
+            "record_key": keys[offset],
+            "full_name": names[offset],
+            "email": emails[offset],
+            "age": age,
+            "age_group": AGE_GROUPS[group],
+            "source": str(records[offset].get("source", "unknown")),
+        }
+        for offset, age, group in zip(passed.tolist(), ages[passed].tolist(), groups[passed].tolist())
+    ]
+    return valid, invalid
+
+
+def transform_validate_records_columnar(
+    records: list[dict[str, object]],
+    *,
+    start_index: int = 0,
+) -> tuple[list[dict[str, object]], list[InvalidRecord]]:
+    return validate_records_columnar(transform_records(records), start_index=start_index)
+
+
+def _coerce_ages(raw_ages: list[object]) -> tuple["np.ndarray", "np.ndarray"]:
+    count = len(raw_ages)
+    ages = np.zeros(count, dtype=np.int64)
+    age_ok = np.zeros(count, dtype=bool)
+    fallback: list[int] = []
+
+    # Plain ints (bool is a subclass and goes through the fallback) copy straight in.
+    int_positions = [position for position, value in enumerate(raw_ages) if type(value) is int]
+    if int_positions:
+        int_values = np.array([raw_ages[position] for position in int_positions], dtype=object)
+        fits = np.array([_INT64_MIN <= value <= _INT64_MAX for value in int_values], dtype=bool)
+        positions = np.array(int_positions, dtype=np.intp)
+        ages[positions[fits]] = int_values[fits].astype(np.int64)
+        age_ok[positions[fits]] = True
+        fallback.extend(positions[~fits].tolist())
+
+    # Short ASCII digit strings are parsed from their code points; anything else (signs,
+    # underscores, non-ASCII digits, floats, None) falls back to int() for exact semantics.
+    str_positions = [position for position, value in enumerate(raw_ages) if type(value) is str]
+    if str_positions:
+        stripped = [raw_ages[position].strip() for position in str_positions]
+        lengths = np.fromiter(map(len, stripped), dtype=np.int64, count=len(stripped))
+        column = np.array(stripped, dtype=str)
+        width = max(column.dtype.itemsize // 4, 1)
+        code_points = column.view(np.uint32).reshape(len(stripped), width)[:, :_MAX_FAST_DIGITS]
+        within = np.arange(code_points.shape[1]) < lengths[:, None]
+        is_digit = (code_points >= 48) & (code_points <= 57)
+        fast = (lengths >= 1) & (lengths <= _MAX_FAST_DIGITS) & np.all(is_digit | ~within, axis=1)
+
+        values = np.zeros(len(stripped), dtype=np.int64)
+        digits = code_points.astype(np.int64) - 48
+        for column_index in range(code_points.shape[1]):
+            take = within[:, column_index]
+            values = np.where(take, values * 10 + digits[:, column_index], values)
+
+        positions = np.array(str_positions, dtype=np.intp)
+        ages[positions[fast]] = values[fast]
+        age_ok[positions[fast]] = True
+        fallback.extend(positions[~fast].tolist())
+
+    handled = set(int_positions) | set(str_positions)
+    fallback.extend(position for position in range(count) if position not in handled)
+    for position in fallback:
+        try:
+            value = int(raw_ages[position])
+        except (TypeError, ValueError):
+            continue
+        # Anything beyond int64 is out of the 18-120 range anyway; keep it failing that rule.
+        ages[position] = value if _INT64_MIN <= value <= _INT64_MAX else _OUT_OF_RANGE
+        age_ok[position] = True
+    return ages, age_ok
@@ -0,0 +1,73 @@
+import gzip
+import io
+from pathlib import Path
+from typing import BinaryIO
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on optional install
+    zstandard = None
+
+
+COMPRESSION_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def check_compression(compression: str) -> None:
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"unknown compression: {compression}")
+    if compression == "zstd":
+        _require_zstd()
+
+
+def compression_for(path: Path) -> str:
+    for name, suffix in COMPRESSION_SUFFIXES.items():
+        if suffix and path.name.endswith(suffix):
+            return name
+    return "none"
+
+
+def is_compressed(path: Path) -> bool:
+    return compression_for(path) != "none"
+
+
+def with_compression_suffix(path: Path, compression: str) -> Path:
+    return path.with_name(path.name + COMPRESSION_SUFFIXES[compression])
+
+
+def find_input(path: Path) -> Path:
+    # Plain files win; otherwise the first compressed variant that exists. Falls back to the
+    # plain path so a missing input reports the name operators expect.
+    for compression in COMPRESSION_SUFFIXES:
+        candidate = with_compression_suffix(path, compression)
+        if candidate.exists():
+            return candidate
+    return path
+
+
+def open_read(path: Path) -> BinaryIO:
+    compression = compression_for(path)
+    if compression == "gzip":
+        return gzip.open(path, "rb")
+    if compression == "zstd":
+        _require_zstd()
+        raw = path.open("rb")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True))
+    return path.open("rb")
+
+
+def open_write(path: Path, level: int | None = None) -> BinaryIO:
+    compression = compression_for(path)
+    if compression == "gzip":
+        # mtime=0 keeps the gzip header, and so the output bytes, reproducible.
+        return gzip.GzipFile(path, "wb", compresslevel=6 if level is None else level, mtime=0)
+    if compression == "zstd":
+        _require_zstd()
+        raw = path.open("wb")
+        compressor = zstandard.ZstdCompressor(level=3 if level is None else level)
+        return compressor.stream_writer(raw, closefd=True)
+    return path.open("wb")
+
+
+def _require_zstd() -> None:
+    if zstandard is None:
+        raise RuntimeError(".zst files require the zstandard package")
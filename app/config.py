@@ -1,11 +1,6 @@
 from dataclasses import dataclass
 import os
 
-from dotenv import load_dotenv
-
-
-load_dotenv()
-
 
 @dataclass(frozen=True)
 class Settings:
@@ -18,9 +13,55 @@ class Settings:
     retry_backoff_seconds: float
     schedule_hour_utc: int
     schedule_minute_utc: int
+    streaming: bool = False
+    chunk_size: int = 10_000
+    db_batch_size: int = 5_000
+    parallel_workers: int = 0
+    json_codec: str = "auto"
+    line_index_cache: bool = False
+    fused_validate: bool = False
+    profile_steps: str = ""
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_pre_ping: bool = True
+    db_pool_recycle_seconds: int = 1800
+    db_statement_cache_size: int = 500
+    checkpoints: bool = False
+    result_cache: bool = False
+    result_cache_dir: str = ""
+    result_cache_max_bytes: int = 10 * 1024**3
+    delta_publish: bool = False
+    current_records: bool = False
+    output_compression: str = "none"
+    compression_level: int | None = None
+    shard_field: str = ""
+    shard_rows: int = 0
+    validation_engine: str = "python"
+    rules_spec: str = ""
+    dag_workers: int = 0
+    retry_max_delay_seconds: float = 30.0
+    retry_deadline_seconds: float = 0.0
+    retry_jitter: bool = True
+    retry_policies: str = ""
+    circuit_breaker_failures: int = 5
+    circuit_breaker_reset_seconds: float = 60.0
+    run_queue: bool = False
+    queue_lease_seconds: float = 300.0
+    queue_poll_seconds: float = 5.0
+    queue_max_attempts: int = 3
+    metrics_port: int = 0
+    metrics_textfile: str = ""
+
+
+def _env_flag(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).strip().lower() in {"1", "true", "yes", "on"}
 
 
 def get_settings() -> Settings:
+    # Loaded here rather than at import so importing the package (e.g. `--version`) stays cheap.
+    from dotenv import load_dotenv
+
+    load_dotenv()
     return Settings(
         app_name=os.getenv("APP_NAME", "flowledger"),
         database_url=os.getenv("DATABASE_URL", "sqlite:///./pipeline.db"),
@@ -31,4 +72,42 @@ def get_settings() -> Settings:
         retry_backoff_seconds=float(os.getenv("RETRY_BACKOFF_SECONDS", "1")),
         schedule_hour_utc=int(os.getenv("SCHEDULE_HOUR_UTC", "2")),
         schedule_minute_utc=int(os.getenv("SCHEDULE_MINUTE_UTC", "0")),
+        streaming=_env_flag("STREAMING"),
+        chunk_size=int(os.getenv("CHUNK_SIZE", "10000")),
+        db_batch_size=int(os.getenv("DB_BATCH_SIZE", "5000")),
+        parallel_workers=int(os.getenv("PARALLEL_WORKERS", "0")),
+        json_codec=os.getenv("JSON_CODEC", "auto"),
+        line_index_cache=_env_flag("LINE_INDEX_CACHE"),
+        fused_validate=_env_flag("FUSED_VALIDATE"),
+        profile_steps=os.getenv("PROFILE_STEPS", ""),
+        db_pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+        db_max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        db_pool_pre_ping=_env_flag("DB_POOL_PRE_PING", "true"),
+        db_pool_recycle_seconds=int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800")),
+        db_statement_cache_size=int(os.getenv("DB_STATEMENT_CACHE_SIZE", "500")),
+        checkpoints=_env_flag("CHECKPOINTS"),
+        result_cache=_env_flag("RESULT_CACHE"),
+        result_cache_dir=os.getenv("RESULT_CACHE_DIR", ""),
+        result_cache_max_bytes=int(os.getenv("RESULT_CACHE_MAX_BYTES", str(10 * 1024**3))),
+        delta_publish=_env_flag("DELTA_PUBLISH"),
+        current_records=_env_flag("CURRENT_RECORDS"),
+        output_compression=os.getenv("OUTPUT_COMPRESSION", "none"),
+        compression_level=int(os.environ["COMPRESSION_LEVEL"]) if os.getenv("COMPRESSION_LEVEL") else None,
+        shard_field=os.getenv("SHARD_FIELD", ""),
+        shard_rows=int(os.getenv("SHARD_ROWS", "0")),
+        validation_engine=os.getenv("VALIDATION_ENGINE", "python"),
+        rules_spec=os.getenv("RULES_SPEC", ""),
+        dag_workers=int(os.getenv("DAG_WORKERS", "0")),
+        retry_max_delay_seconds=float(os.getenv("RETRY_MAX_DELAY_SECONDS", "30")),
+        retry_deadline_seconds=float(os.getenv("RETRY_DEADLINE_SECONDS", "0")),
+        retry_jitter=_env_flag("RETRY_JITTER", "true"),
+        retry_policies=os.getenv("RETRY_POLICIES", ""),
+        circuit_breaker_failures=int(os.getenv("CIRCUIT_BREAKER_FAILURES", "5")),
+        circuit_breaker_reset_seconds=float(os.getenv("CIRCUIT_BREAKER_RESET_SECONDS", "60")),
+        run_queue=_env_flag("RUN_QUEUE"),
+        queue_lease_seconds=float(os.getenv("QUEUE_LEASE_SECONDS", "300")),
+        queue_poll_seconds=float(os.getenv("QUEUE_POLL_SECONDS", "5")),
+        queue_max_attempts=int(os.getenv("QUEUE_MAX_ATTEMPTS", "3")),
+        metrics_port=int(os.getenv("METRICS_PORT", "0")),
+        metrics_textfile=os.getenv("METRICS_TEXTFILE", ""),
     )
@@ -0,0 +1,85 @@
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+import threading
+
+
+class StepCancelledError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class DagStep:
+    name: str
+    fn: Callable[[], object]
+    depends_on: tuple[str, ...] = ()
+
+
+def check_dag(steps: list[DagStep]) -> None:
+    names = [step.name for step in steps]
+    if len(set(names)) != len(names):
+        raise ValueError(f"duplicate DAG step names: {names}")
+    known = set(names)
+    for step in steps:
+        unknown = set(step.depends_on) - known
+        if unknown:
+            raise ValueError(f"step '{step.name}' depends on unknown steps: {sorted(unknown)}")
+
+    # Kahn's algorithm: anything left unvisited sits on a cycle.
+    pending = {step.name: set(step.depends_on) for step in steps}
+    ready = [name for name, deps in pending.items() if not deps]
+    while ready:
+        done = ready.pop()
+        del pending[done]
+        for name, deps in pending.items():
+            if done in deps:
+                deps.discard(done)
+                if not deps:
+                    ready.append(name)
+    if pending:
+        raise ValueError(f"DAG has a cycle through: {sorted(pending)}")
+
+
+def run_dag(
+    steps: list[DagStep],
+    *,
+    max_workers: int,
+    cancelled: threading.Event | None = None,
+) -> dict[str, object]:
+    # Steps start as soon as their dependencies succeed. The first failure sets `cancelled` so
+    # running siblings can stop at their next checkpoint, and nothing new is started.
+    check_dag(steps)
+    cancelled = cancelled or threading.Event()
+    by_name = {step.name: step for step in steps}
+    waiting = {step.name: set(step.depends_on) for step in steps}
+    results: dict[str, object] = {}
+    running: dict[Future, str] = {}
+    first_error: BaseException | None = None
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="dag") as pool:
+
+        def start_ready() -> None:
+            for name in [name for name, deps in waiting.items() if not deps]:
+                del waiting[name]
+                running[pool.submit(by_name[name].fn)] = name
+
+        start_ready()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except BaseException as exc:
+                    if first_error is None:
+                        first_error = exc
+                        cancelled.set()
+                    continue
+                for deps in waiting.values():
+                    deps.discard(name)
+            if first_error is None:
+                start_ready()
+
+    if first_error is not None:
+        raise first_error
+    return results
@@ -1,24 +1,125 @@
 from collections.abc import Generator
+import logging
+import threading
 
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, inspect, select, text
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlalchemy.orm import Session, sessionmaker
 
-from app.db_models import Base
+from app.config import Settings
+from app.db_models import ADDED_COLUMNS, SCHEMA_VERSION, Base, SchemaVersion, utc_now
 
 
-def build_session_factory(database_url: str) -> sessionmaker[Session]:
-    connect_args: dict[str, object] = {}
-    if database_url.startswith("sqlite"):
-        connect_args["check_same_thread"] = False
+logger = logging.getLogger(__name__)
+
+_engines: dict[tuple[str, tuple[tuple[str, object], ...]], Engine] = {}
+_schema_checked: set[int] = set()
+_lock = threading.Lock()
+
+
+def engine_options(settings: Settings) -> dict[str, object]:
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "query_cache_size": settings.db_statement_cache_size,
+    }
 
-    engine = create_engine(database_url, future=True, connect_args=connect_args)
-    Base.metadata.create_all(engine)
+
+def get_engine(database_url: str, **options: object) -> Engine:
+    # One engine (and pool) per URL and option set, reused for the life of the process.
+    cache_key = (database_url, tuple(sorted(options.items())))
+    with _lock:
+        engine = _engines.get(cache_key)
+        if engine is None:
+            engine = _create_engine(database_url, options)
+            _engines[cache_key] = engine
+        return engine
+
+
+def build_session_factory(database_url: str, **options: object) -> sessionmaker[Session]:
+    engine = get_engine(database_url, **options)
+    ensure_schema(engine)
     return sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
 
+def ensure_schema(engine: Engine) -> None:
+    with _lock:
+        if id(engine) in _schema_checked:
+            return
+        stored_version = _stored_schema_version(engine)
+        if stored_version != SCHEMA_VERSION:
+            logger.info("creating database schema", extra={"schema_version": SCHEMA_VERSION})
+            # create_all() only creates missing tables; columns added to existing ones need an ALTER.
+            Base.metadata.create_all(engine)
+            _add_columns(engine, stored_version or 0)
+            _store_schema_version(engine)
+        _schema_checked.add(id(engine))
+
+
 def get_db(session_factory: sessionmaker[Session]) -> Generator[Session, None, None]:
     db = session_factory()
     try:
         yield db
     finally:
         db.close()
+
+
+def _create_engine(database_url: str, options: dict[str, object]) -> Engine:
+    connect_args: dict[str, object] = {}
+    engine_kwargs = dict(options)
+    if database_url.startswith("sqlite"):
+        connect_args["check_same_thread"] = False
+        if ":memory:" in database_url or database_url.rstrip("/") == "sqlite:":
+            # In-memory SQLite uses a single-connection pool without size limits.
+            engine_kwargs.pop("pool_size", None)
+            engine_kwargs.pop("max_overflow", None)
+
+    return create_engine(database_url, future=True, connect_args=connect_args, **engine_kwargs)
+
+
+def _stored_schema_version(engine: Engine) -> int | None:
+    try:
+        with engine.connect() as connection:
+            return connection.execute(select(SchemaVersion.version).where(SchemaVersion.id == 1)).scalar_one_or_none()
+    except DBAPIError:
+        # Fresh database: the version table does not exist yet.
+        return None
+
+
+def _add_columns(engine: Engine, stored_version: int) -> None:
+    inspector = inspect(engine)
+    preparer = engine.dialect.identifier_preparer
+    with engine.begin() as connection:
+        for version, columns in sorted(ADDED_COLUMNS.items()):
+            if version <= stored_version:
+                continue
+            for table_name, column_name in columns:
+                if column_name in {column["name"] for column in inspector.get_columns(table_name)}:
+                    continue
+                column = Base.metadata.tables[table_name].c[column_name]
+                logger.info("adding column", extra={"table": table_name, "column": column_name})
+                connection.execute(
+                    text(
+                        f"ALTER TABLE {preparer.format_table(column.table)} "
+                        f"ADD COLUMN {preparer.format_column(column)} {column.type.compile(engine.dialect)}"
+                    )
+                )
+
+
+def _store_schema_version(engine: Engine) -> None:
+    with Session(engine) as db:
+        row = db.get(SchemaVersion, 1)
+        if row is None:
+            db.add(SchemaVersion(id=1, version=SCHEMA_VERSION, applied_at=utc_now()))
+            try:
+                db.commit()
+                return
+            except IntegrityError:
+                # Another process initialized the same fresh database first; update its row instead.
+                db.rollback()
+                row = db.get(SchemaVersion, 1)
+        row.version = SCHEMA_VERSION
+        row.applied_at = utc_now()
+        db.commit()
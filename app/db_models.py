@@ -4,6 +4,18 @@ from sqlalchemy import Date, DateTime, Float, ForeignKey, Integer, String, Text,
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
+# Bump whenever tables or columns change. Older databases then get create_all() for new tables,
+# plus an ALTER TABLE for each column listed in ADDED_COLUMNS under a newer version.
+SCHEMA_VERSION = 6
+
+# Nullable columns added to tables that already existed, keyed by the schema version that added them.
+# Version 1 covers columns that predate the schema_version table, so they are checked when no version is stored.
+ADDED_COLUMNS: dict[int, tuple[tuple[str, str], ...]] = {
+    1: (("step_runs", "cpu_time_ms"), ("step_runs", "peak_rss_delta_kb"), ("step_runs", "records_processed")),
+    6: (("step_runs", "chunks_total"), ("step_runs", "chunks_completed"), ("step_runs", "chunks_skipped")),
+}
+
+
 class Base(DeclarativeBase):
     pass
 
@@ -43,6 +55,13 @@ class StepRun(Base):
     started_at: Mapped[datetime] = mapped_column(DateTime, default=utc_now)
     completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     duration_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    cpu_time_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    peak_rss_delta_kb: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    records_processed: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Chunked steps only: chunks in the step, committed by this attempt, and already committed by earlier ones.
+    chunks_total: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    chunks_completed: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    chunks_skipped: Mapped[int | None] = mapped_column(Integer, nullable=True)
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     run: Mapped[PipelineRun] = relationship(back_populates="steps")
@@ -68,3 +87,64 @@ class PublishedRecord(Base):
     run_id: Mapped[int] = mapped_column(ForeignKey("pipeline_runs.id", ondelete="CASCADE"), index=True)
     record_key: Mapped[str] = mapped_column(String(128))
     payload: Mapped[str] = mapped_column(Text)
+
+
+class StepCheckpoint(Base):
+    __tablename__ = "step_checkpoints"
+    __table_args__ = (UniqueConstraint("run_id", "step_name", name="uq_run_step_checkpoint"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    run_id: Mapped[int] = mapped_column(ForeignKey("pipeline_runs.id", ondelete="CASCADE"), index=True)
+    step_name: Mapped[str] = mapped_column(String(64))
+    path: Mapped[str] = mapped_column(Text)
+    input_fingerprint: Mapped[str] = mapped_column(String(64))
+    rules_version: Mapped[str] = mapped_column(String(64))
+    record_count: Mapped[int] = mapped_column(Integer)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utc_now)
+
+
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer)
+    applied_at: Mapped[datetime] = mapped_column(DateTime, default=utc_now)
+
+
+class RecordFingerprint(Base):
+    __tablename__ = "record_fingerprints"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    record_key: Mapped[str] = mapped_column(String(128), unique=True)
+    fingerprint: Mapped[str] = mapped_column(String(32))
+    run_id: Mapped[int] = mapped_column(ForeignKey("pipeline_runs.id"), index=True)
+
+
+class CurrentRecord(Base):
+    __tablename__ = "current_records"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    record_key: Mapped[str] = mapped_column(String(128), unique=True)
+    payload: Mapped[str] = mapped_column(Text)
+    run_id: Mapped[int] = mapped_column(ForeignKey("pipeline_runs.id"), index=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=utc_now)
+
+    run: Mapped[PipelineRun] = relationship()
+
+
+class RunQueueItem(Base):
+    __tablename__ = "run_queue"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    run_key: Mapped[str] = mapped_column(String(128), unique=True)
+    run_date: Mapped[date] = mapped_column(Date)
+    trigger_source: Mapped[str] = mapped_column(String(32), default="manual")
+    status: Mapped[str] = mapped_column(String(32), default="queued", index=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    lease_owner: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    enqueued_at: Mapped[datetime] = mapped_column(DateTime, default=utc_now)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    run_id: Mapped[int | None] = mapped_column(ForeignKey("pipeline_runs.id"), nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -0,0 +1,51 @@
+from collections.abc import Iterable
+import hashlib
+
+from app.codec import JsonCodec
+from app.schemas import DeltaCounts
+
+
+class DeltaTracker:
+    # Holds every previous and current fingerprint in memory (one entry per record_key), so a
+    # delta run's memory grows with the number of keys even in streaming mode.
+    def __init__(self, previous: dict[str, str], codec: JsonCodec) -> None:
+        self.previous = previous
+        self.current: dict[str, str] = {}
+        self.counts = DeltaCounts()
+        self._dumps_line = codec.dumps_line
+
+    def classify(self, records: Iterable[dict[str, object]]) -> list[dict[str, object]]:
+        delta: list[dict[str, object]] = []
+        for record in records:
+            record_key = str(record["record_key"])
+            if record_key in self.current:
+                # Duplicate keys are dropped on insert, so only the first occurrence counts.
+                continue
+            fingerprint = hashlib.blake2b(self._dumps_line(record), digest_size=16).hexdigest()
+            self.current[record_key] = fingerprint
+
+            previous = self.previous.get(record_key)
+            if previous is None:
+                self.counts.new += 1
+                delta.append(record)
+            elif previous != fingerprint:
+                self.counts.changed += 1
+                delta.append(record)
+            else:
+                self.counts.unchanged += 1
+        return delta
+
+    def changed_fingerprints(self) -> dict[str, str]:
+        return {
+            record_key: fingerprint
+            for record_key, fingerprint in self.current.items()
+            if self.previous.get(record_key) != fingerprint
+        }
+
+    def deleted_keys(self) -> list[str]:
+        return [record_key for record_key in self.previous if record_key not in self.current]
+
+    def count_deleted(self) -> int:
+        # Only meaningful once every record has been classified.
+        self.counts.deleted = sum(1 for record_key in self.previous if record_key not in self.current)
+        return self.counts.deleted
@@ -0,0 +1,91 @@
+from collections import Counter
+from pathlib import Path
+import time
+
+from app.codec import get_codec
+from app import compression
+from app.compression import check_compression, compression_for, find_input
+from app.config import Settings
+from app.parallel import ChunkExecutor
+from app.rules import canonical_spec, load_rule_spec
+from app.schemas import DryRunResult
+from app.step_logic import JsonlWriter, dead_letter_rows, iter_chunks, iter_records
+
+
+# What a missing, unreadable or malformed input can raise while it is streamed: OSError (missing or
+# unreadable file, bad gzip header), ValueError (JSON/UTF-8 decode errors, records that are not
+# objects, a .zst input without zstandard), EOFError (truncated gzip) and zstandard's own error.
+INPUT_ERRORS: tuple[type[Exception], ...] = (OSError, ValueError, EOFError)
+if compression.zstandard is not None:
+    INPUT_ERRORS += (compression.zstandard.ZstdError,)
+
+
+def validate_file(settings: Settings, input_path: Path, *, dead_letter_path: Path | None = None) -> DryRunResult:
+    # Pre-flight check: no DB session, no run row, no published output. Always uses the fused
+    # transform+validate pass, which yields the same split and reasons as the two-step path.
+    started = time.perf_counter()
+    input_path = find_input(input_path)
+    try:
+        check_compression(compression_for(input_path))
+    except RuntimeError as exc:
+        raise ValueError(str(exc)) from exc
+    codec = get_codec(settings.json_codec)
+    rules_spec = ""
+    if settings.validation_engine == "compiled":
+        rules_spec = canonical_spec(load_rule_spec(settings.rules_spec))
+
+    total = valid_count = 0
+    reasons: Counter[str] = Counter()
+    writer = None
+    if dead_letter_path is not None:
+        writer = JsonlWriter(dead_letter_path, codec, compression_level=settings.compression_level)
+    try:
+        with ChunkExecutor(
+            settings.parallel_workers,
+            settings.chunk_size,
+            validation_engine=settings.validation_engine,
+            rules_spec=rules_spec,
+        ) as executor:
+            for chunk in iter_chunks(iter_records(input_path, codec), settings.chunk_size):
+                _check_objects(chunk, total)
+                valid, invalid = executor.transform_validate(chunk, start_index=total)
+                total += len(chunk)
+                valid_count += len(valid)
+                reasons.update(record.reason for record in invalid)
+                if writer is not None:
+                    writer.write_rows(dead_letter_rows(invalid))
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return DryRunResult(
+        input_path=str(input_path),
+        total_records=total,
+        valid_records=valid_count,
+        invalid_records=total - valid_count,
+        reasons=dict(reasons.most_common()),
+        dead_letter_path=str(dead_letter_path) if dead_letter_path is not None else None,
+        seconds=time.perf_counter() - started,
+    )
+
+
+def _check_objects(records: list[object], start_index: int) -> None:
+    # Partner files are untrusted: a line like `[1, 2]` is valid JSON but not a record.
+    for offset, record in enumerate(records):
+        if not isinstance(record, dict):
+            raise ValueError(f"record {start_index + offset} is not a JSON object: {type(record).__name__}")
+
+
+def format_dry_run(result: DryRunResult) -> str:
+    lines = [
+        f"input={result.input_path} total={result.total_records} valid={result.valid_records} "
+        f"invalid={result.invalid_records} seconds={result.seconds:.3f}"
+    ]
+    if result.reasons:
+        width = max(len(reason) for reason in result.reasons)
+        for reason, count in result.reasons.items():
+            share = count / result.total_records
+            lines.append(f"  {reason:<{width}}  {count:>9}  {share:7.2%}")
+    if result.dead_letter_path is not None:
+        lines.append(f"dead_letter={result.dead_letter_path}")
+    return "\n".join(lines)
@@ -0,0 +1,26 @@
+from functools import lru_cache
+import hashlib
+import importlib
+from pathlib import Path
+
+
+# Modules whose source defines transform/validate behaviour; editing any of them changes rules_version().
+RULE_MODULES = ("app.step_logic", "app.columnar", "app.rules")
+
+
+def file_sha256(path: Path) -> str:
+    with path.open("rb") as infile:
+        return hashlib.file_digest(infile, "sha256").hexdigest()
+
+
+@lru_cache(maxsize=None)
+def rules_version(*extra: str) -> str:
+    # extra mixes in run-specific rule inputs, such as the hash of a declarative rule spec.
+    digest = hashlib.sha256()
+    for module_name in RULE_MODULES:
+        module = importlib.import_module(module_name)
+        digest.update(module_name.encode("utf-8"))
+        digest.update(Path(module.__file__).read_bytes())
+    for value in extra:
+        digest.update(value.encode("utf-8"))
+    return digest.hexdigest()
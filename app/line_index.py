@@ -0,0 +1,152 @@
+from array import array
+from collections.abc import Iterator
+import logging
+import math
+import mmap
+import os
+from pathlib import Path
+import struct
+import sys
+
+from app.codec import JsonCodec, get_codec
+from app.schemas import RecordRange
+
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = ".idx"
+_INDEX_MAGIC = b"FLIDX001"
+_INDEX_HEADER = struct.Struct("<8sQQQ")
+
+
+class LineIndex:
+    def __init__(self, offsets: array, file_size: int) -> None:
+        # offsets[i] is the byte where record i starts; blank lines are not records.
+        self.offsets = offsets
+        self.file_size = file_size
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def byte_offset(self, record_index: int) -> int:
+        if record_index >= len(self.offsets):
+            return self.file_size
+        return self.offsets[record_index]
+
+    def split(self, parts: int) -> list[RecordRange]:
+        if not self.offsets:
+            return []
+
+        size = math.ceil(len(self.offsets) / max(1, parts))
+        return [
+            RecordRange(
+                start_index=start,
+                start_byte=self.offsets[start],
+                end_byte=self.byte_offset(start + size),
+            )
+            for start in range(0, len(self.offsets), size)
+        ]
+
+
+def index_path_for(input_path: Path) -> Path:
+    return input_path.with_name(input_path.name + INDEX_SUFFIX)
+
+
+def load_line_index(input_path: Path, *, cache: bool = False) -> LineIndex:
+    if not input_path.exists():
+        raise FileNotFoundError(f"input file not found: {input_path}")
+
+    stat = input_path.stat()
+    cache_path = index_path_for(input_path)
+    if cache:
+        cached = _read_cached_index(cache_path, stat)
+        if cached is not None:
+            return cached
+
+    index = LineIndex(_scan_offsets(input_path, stat.st_size), stat.st_size)
+    if cache:
+        _write_cached_index(cache_path, stat, index)
+    return index
+
+
+def iter_record_range(
+    input_path: Path,
+    start_byte: int = 0,
+    end_byte: int | None = None,
+    codec: JsonCodec | None = None,
+) -> Iterator[dict[str, object]]:
+    loads = (codec or get_codec()).loads
+    with input_path.open("rb") as infile:
+        file_size = os.fstat(infile.fileno()).st_size
+        end = file_size if end_byte is None else min(end_byte, file_size)
+        if start_byte >= end:
+            return
+
+        with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            mapped.seek(start_byte)
+            while mapped.tell() < end:
+                line = mapped.readline().strip()
+                if line:
+                    yield loads(line)
+
+
+def _scan_offsets(input_path: Path, file_size: int) -> array:
+    offsets = array("Q")
+    if file_size == 0:
+        return offsets
+
+    with input_path.open("rb") as infile, mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        position = 0
+        while position < file_size:
+            end = mapped.find(b"\n", position)
+            if end == -1:
+                end = file_size
+            if mapped[position:end].strip():
+                offsets.append(position)
+            position = end + 1
+    return offsets
+
+
+def _read_cached_index(cache_path: Path, stat: os.stat_result) -> LineIndex | None:
+    try:
+        data = cache_path.read_bytes()
+    except OSError:
+        return None
+    if len(data) < _INDEX_HEADER.size or (len(data) - _INDEX_HEADER.size) % 8:
+        return None
+
+    magic, file_size, mtime_ns, count = _INDEX_HEADER.unpack_from(data)
+    # A size or mtime change means the input was rewritten and the offsets are stale.
+    if magic != _INDEX_MAGIC or file_size != stat.st_size or mtime_ns != stat.st_mtime_ns:
+        return None
+
+    offsets = array("Q")
+    offsets.frombytes(data[_INDEX_HEADER.size :])
+    if sys.byteorder == "big":
+        offsets.byteswap()
+    if len(offsets) != count:
+        return None
+    return LineIndex(offsets, file_size)
+
+
+def _write_cached_index(cache_path: Path, stat: os.stat_result, index: LineIndex) -> None:
+    offsets = index.offsets
+    if sys.byteorder == "big":
+        offsets = array("Q", offsets)
+        offsets.byteswap()
+
+    temp_path = cache_path.with_name(cache_path.name + ".tmp")
+    try:
+        with temp_path.open("wb") as outfile:
+            outfile.write(_INDEX_HEADER.pack(_INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, len(index.offsets)))
+            outfile.write(offsets.tobytes())
+        os.replace(temp_path, cache_path)
+    except OSError:
+        # The cache only saves a rescan; a read-only or full input directory must not fail ingest.
+        logger.warning("could not write line index cache", exc_info=True, extra={"path": str(cache_path)})
+        try:
+            temp_path.unlink(missing_ok=True)
+        except OSError:
+            pass
@@ -1,15 +1,24 @@
 import argparse
 from datetime import date
 import logging
+from pathlib import Path
+import sys
+from typing import TYPE_CHECKING
 
-from app.config import get_settings
-from app.database import build_session_factory
-from app.pipeline import PipelineRunner
-from app.scheduler import start_scheduler
+from app import __version__
+
+
+if TYPE_CHECKING:
+    from app.config import Settings
+
+
+# Subcommands import their modules on demand: SQLAlchemy, APScheduler and python-dotenv
+# are only paid for by the commands that use them, and `--version`/`--help` stay instant.
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Run the automation pipeline")
+    parser.add_argument("--version", action="version", version=f"flowledger {__version__}")
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     run_parser = subparsers.add_parser("run", help="run one pipeline execution")
@@ -21,15 +30,61 @@ def parse_args() -> argparse.Namespace:
         choices=["manual", "scheduled"],
         help="Metadata label for how this run was triggered",
     )
+    run_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="only ingest/transform/validate the run date's input; no database, no published output",
+    )
+    run_parser.add_argument("--dead-letter", help="with --dry-run, also write invalid records to this path")
+
+    backfill_parser = subparsers.add_parser("backfill", help="run every date in a range concurrently")
+    backfill_parser.add_argument("--from", dest="from_date", required=True, help="First run date (YYYY-MM-DD)")
+    backfill_parser.add_argument("--to", dest="to_date", required=True, help="Last run date, inclusive (YYYY-MM-DD)")
+    backfill_parser.add_argument("--workers", type=int, default=4, help="Runs executed concurrently")
+    backfill_parser.add_argument(
+        "--key-prefix",
+        default="backfill-",
+        help="Run keys are <prefix><run-date>; reusing a prefix reuses succeeded runs",
+    )
+    backfill_parser.add_argument(
+        "--trigger-source",
+        default="manual",
+        choices=["manual", "scheduled"],
+        help="Metadata label for how these runs were triggered",
+    )
 
     schedule_parser = subparsers.add_parser("schedule", help="start daily scheduler")
     schedule_parser.add_argument("--run-now", action="store_true", help="also run once immediately")
 
+    enqueue_parser = subparsers.add_parser("enqueue", help="add a run to the run queue for workers")
+    enqueue_parser.add_argument("--run-date", required=True, help="Run date in YYYY-MM-DD format")
+    enqueue_parser.add_argument("--run-key", required=False, help="Idempotency key for this run")
+    enqueue_parser.add_argument(
+        "--trigger-source",
+        default="manual",
+        choices=["manual", "scheduled"],
+        help="Metadata label for how this run was triggered",
+    )
+
+    worker_parser = subparsers.add_parser("worker", help="execute runs claimed from the run queue")
+    worker_parser.add_argument("--concurrency", type=int, default=1, help="Runs executed concurrently")
+    worker_parser.add_argument("--drain", action="store_true", help="exit once the queue is empty")
+
+    validate_parser = subparsers.add_parser(
+        "validate-file",
+        help="ingest/transform/validate any input file without a database and summarize the results",
+    )
+    validate_parser.add_argument("input_path", help="JSONL input (.gz/.zst allowed)")
+    validate_parser.add_argument("--dead-letter", help="also write invalid records to this path")
+
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
+
+    from app.config import get_settings
+
     settings = get_settings()
 
     logging.basicConfig(
@@ -37,20 +92,95 @@ def main() -> None:
         format="%(asctime)s %(levelname)s %(name)s %(message)s",
     )
 
-    session_factory = build_session_factory(settings.database_url)
-    if args.command == "schedule":
-        start_scheduler(settings, session_factory, run_now=args.run_now)
+    COMMANDS[args.command](args, settings)
+
+
+def _session_factory(settings: "Settings"):
+    from app.database import build_session_factory, engine_options
+
+    return build_session_factory(settings.database_url, **engine_options(settings))
+
+
+def _schedule(args: argparse.Namespace, settings: "Settings") -> None:
+    from app.metrics import start_http_server
+    from app.scheduler import start_scheduler
+
+    if settings.metrics_port:
+        start_http_server(settings.metrics_port)
+    start_scheduler(settings, _session_factory(settings), run_now=args.run_now)
+
+
+def _enqueue(args: argparse.Namespace, settings: "Settings") -> None:
+    from app.run_store import enqueue_run
+
+    run_date = date.fromisoformat(args.run_date)
+    with _session_factory(settings)() as db:
+        item, queued = enqueue_run(
+            db,
+            run_key=args.run_key or run_date.isoformat(),
+            run_date=run_date,
+            trigger_source=args.trigger_source,
+        )
+        print(f"queued={queued} run_key={item.run_key} status={item.status} attempts={item.attempts}")
+
+
+def _worker(args: argparse.Namespace, settings: "Settings") -> None:
+    import signal
+
+    from app.backfill import format_summary
+    from app.metrics import start_http_server
+    from app.worker import RunWorker
+
+    worker = RunWorker(settings, _session_factory(settings), concurrency=args.concurrency)
+    if args.drain:
+        results = worker.drain()
+        _write_metrics_textfile(settings)
+        print(format_summary(results))
+        if any(result.status == "failed" for result in results):
+            raise SystemExit(1)
         return
+    if settings.metrics_port:
+        start_http_server(settings.metrics_port)
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    worker.run_forever()
+
+
+def _backfill(args: argparse.Namespace, settings: "Settings") -> None:
+    from app.backfill import format_progress, format_summary, run_backfill
+
+    results = run_backfill(
+        settings,
+        _session_factory(settings),
+        start=date.fromisoformat(args.from_date),
+        end=date.fromisoformat(args.to_date),
+        workers=args.workers,
+        key_prefix=args.key_prefix,
+        trigger_source=args.trigger_source,
+        on_result=lambda done, total, result: print(format_progress(done, total, result), flush=True),
+    )
+    _write_metrics_textfile(settings)
+    print(format_summary(results))
+    if any(result.status == "failed" for result in results):
+        raise SystemExit(1)
 
+
+def _run(args: argparse.Namespace, settings: "Settings") -> None:
     run_date = date.fromisoformat(args.run_date)
+    if args.dry_run:
+        _dry_run(settings, Path(settings.input_dir) / f"records-{run_date.isoformat()}.jsonl", args.dead_letter)
+        return
+
+    from app.pipeline import PipelineRunner
+
     run_key = args.run_key or run_date.isoformat()
 
-    runner = PipelineRunner(settings, session_factory)
+    runner = PipelineRunner(settings, _session_factory(settings))
     result = runner.run(
         run_date=run_date,
         run_key=run_key,
         trigger_source=args.trigger_source,
     )
+    _write_metrics_textfile(settings)
 
     print(
         "run_id={run_id} run_key={run_key} trigger={trigger} status={status} total={total} valid={valid} invalid={invalid} reused={reused} report={report}".format(
@@ -69,5 +199,38 @@ def main() -> None:
         raise SystemExit(1)
 
 
+def _validate_file(args: argparse.Namespace, settings: "Settings") -> None:
+    _dry_run(settings, Path(args.input_path), args.dead_letter)
+
+
+def _dry_run(settings: "Settings", input_path: Path, dead_letter: str | None) -> None:
+    from app.dry_run import INPUT_ERRORS, format_dry_run, validate_file
+
+    try:
+        result = validate_file(settings, input_path, dead_letter_path=Path(dead_letter) if dead_letter else None)
+    except INPUT_ERRORS as exc:
+        print(f"dry run failed: {input_path}: {exc}", file=sys.stderr)
+        raise SystemExit(1) from None
+    print(format_dry_run(result))
+
+
+def _write_metrics_textfile(settings: "Settings") -> None:
+    # One-shot commands have no process to scrape, so they leave a node-exporter textfile behind.
+    if settings.metrics_textfile:
+        from app.metrics import write_textfile
+
+        write_textfile(settings.metrics_textfile)
+
+
+COMMANDS = {
+    "run": _run,
+    "backfill": _backfill,
+    "schedule": _schedule,
+    "enqueue": _enqueue,
+    "worker": _worker,
+    "validate-file": _validate_file,
+}
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,235 @@
+from bisect import bisect_left
+import math
+import os
+from pathlib import Path
+import tempfile
+import threading
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+DB_BATCH_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        self._values: dict[tuple[str, ...], object] = {}
+
+    def _key(self, labels: dict[str, object]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _label_text(self, key: tuple[str, ...], extra: tuple[tuple[str, str], ...] = ()) -> str:
+        pairs = [*zip(self.labelnames, key), *extra]
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key: tuple[str, ...], value: object) -> list[str]:
+        return [f"{self.name}{self._label_text(key)} {_format_value(value)}"]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: object) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DURATION_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            # Per-bucket (non-cumulative) counts plus [sum, count]; cumulated at render time.
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _render_sample(self, key: tuple[str, ...], value: object) -> list[str]:
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip((*self.buckets, math.inf), counts):
+            cumulative += bucket_count
+            labels = self._label_text(key, (("le", _format_value(bound)),))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_text(key)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{self._label_text(key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DURATION_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric: _Metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = [line for metric in metrics for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        with self._lock:
+            for metric in self._metrics.values():
+                metric.clear()
+
+
+REGISTRY = MetricsRegistry()
+
+RUNS_IN_FLIGHT = REGISTRY.gauge("flowledger_runs_in_flight", "Pipeline runs currently executing in this process.")
+RUNS = REGISTRY.counter("flowledger_runs_total", "Finished pipeline runs by final status.", ("status",))
+STEP_DURATION = REGISTRY.histogram(
+    "flowledger_step_duration_seconds",
+    "Duration of step attempts (streaming stages: time spent in the stage).",
+    ("step", "status"),
+)
+STEP_RECORDS_PER_SECOND = REGISTRY.gauge(
+    "flowledger_step_records_per_second",
+    "Throughput of the most recent successful attempt of each step.",
+    ("step",),
+)
+STEP_RETRIES = REGISTRY.counter("flowledger_step_retries_total", "Step attempts after the first.", ("step",))
+RECORDS = REGISTRY.counter("flowledger_records_total", "Validated records by outcome.", ("outcome",))
+INVALID_RECORDS = REGISTRY.counter(
+    "flowledger_invalid_records_total",
+    "Invalid records by validation reason.",
+    ("reason",),
+)
+DB_BATCH_DURATION = REGISTRY.histogram(
+    "flowledger_db_batch_seconds",
+    "Latency of bulk insert batches by table.",
+    ("table",),
+    DB_BATCH_BUCKETS,
+)
+
+
+def start_http_server(port: int, addr: str = "0.0.0.0", registry: MetricsRegistry = REGISTRY) -> "ThreadingHTTPServer":
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer((addr, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def write_textfile(path: str | Path, registry: MetricsRegistry = REGISTRY) -> Path:
+    # node-exporter may read the directory at any moment, so write to a temp file and rename.
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "w", encoding="utf-8") as outfile:
+            outfile.write(registry.render())
+        os.chmod(temp_name, 0o644)
+        os.replace(temp_name, path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+    return path
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: object) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
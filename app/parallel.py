@@ -0,0 +1,180 @@
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor
+import json
+import math
+import multiprocessing
+from pathlib import Path
+
+from app.codec import JsonCodec, get_codec
+from app.compression import is_compressed
+from app.line_index import iter_record_range, load_line_index
+from app.schemas import InvalidRecord
+from app.step_logic import ingest_records, transform_records, transform_validate_records, validate_records
+
+
+def _pool_context() -> multiprocessing.context.BaseContext:
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def _ingest_range(input_path: Path, start_byte: int, end_byte: int, codec_name: str) -> list[dict[str, object]]:
+    return list(iter_record_range(input_path, start_byte, end_byte, get_codec(codec_name)))
+
+
+ValidateFn = Callable[..., tuple[list[dict[str, object]], list[InvalidRecord]]]
+
+
+def validators(engine: str, rules_spec: str = "") -> tuple[ValidateFn, ValidateFn]:
+    # Returns (validate, transform_validate) for a validation engine; every engine produces the same split.
+    if engine == "python":
+        return validate_records, transform_validate_records
+    if engine == "compiled":
+        from app.rules import DEFAULT_RULE_SPEC, compile_rules
+
+        validate = compile_rules(json.loads(rules_spec) if rules_spec else DEFAULT_RULE_SPEC)
+
+        def transform_validate(records, *, start_index=0):
+            return validate(transform_records(records), start_index=start_index)
+
+        return validate, transform_validate
+    if engine == "numpy":
+        from app.columnar import require_numpy, transform_validate_records_columnar, validate_records_columnar
+
+        require_numpy()
+        return validate_records_columnar, transform_validate_records_columnar
+    raise ValueError(f"unknown validation engine: {engine}")
+
+
+def _validate_slice(
+    records: list[dict[str, object]],
+    start_index: int,
+    engine: str,
+    rules_spec: str,
+) -> tuple[list[dict[str, object]], list[InvalidRecord]]:
+    return validators(engine, rules_spec)[0](records, start_index=start_index)
+
+
+def _transform_validate_slice(
+    records: list[dict[str, object]],
+    start_index: int,
+    engine: str,
+    rules_spec: str,
+) -> tuple[list[dict[str, object]], list[InvalidRecord]]:
+    return validators(engine, rules_spec)[1](records, start_index=start_index)
+
+
+class ChunkExecutor:
+    def __init__(
+        self,
+        workers: int,
+        chunk_size: int,
+        *,
+        cache_line_index: bool = False,
+        validation_engine: str = "python",
+        rules_spec: str = "",
+    ) -> None:
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.cache_line_index = cache_line_index
+        self.validation_engine = validation_engine
+        self.rules_spec = rules_spec
+        self._validate, self._transform_validate = validators(validation_engine, rules_spec)
+        self._executor: Executor | None = None
+
+    @property
+    def parallel(self) -> bool:
+        return self.workers > 1
+
+    def ingest(self, input_path: Path, codec: JsonCodec) -> list[dict[str, object]]:
+        if not self.parallel or is_compressed(input_path):
+            return ingest_records(input_path, codec)
+
+        # Workers map the same file and parse disjoint byte ranges cut on record boundaries.
+        index = load_line_index(input_path, cache=self.cache_line_index)
+        ranges = index.split(max(self.workers, math.ceil(len(index) / self.chunk_size)))
+        records: list[dict[str, object]] = []
+        for part in self._pool().map(
+            _ingest_range,
+            [input_path] * len(ranges),
+            [item.start_byte for item in ranges],
+            [item.end_byte for item in ranges],
+            [codec.name] * len(ranges),
+        ):
+            records.extend(part)
+        return records
+
+    def transform(self, records: list[dict[str, object]]) -> list[dict[str, object]]:
+        if not self.parallel:
+            return transform_records(records)
+
+        transformed: list[dict[str, object]] = []
+        for part in self._pool().map(transform_records, self._split(records)):
+            transformed.extend(part)
+        return transformed
+
+    def validate(
+        self,
+        records: list[dict[str, object]],
+        *,
+        start_index: int = 0,
+    ) -> tuple[list[dict[str, object]], list[InvalidRecord]]:
+        if not self.parallel:
+            return self._validate(records, start_index=start_index)
+        return self._map_split(_validate_slice, records, start_index)
+
+    def transform_validate(
+        self,
+        records: list[dict[str, object]],
+        *,
+        start_index: int = 0,
+    ) -> tuple[list[dict[str, object]], list[InvalidRecord]]:
+        if not self.parallel:
+            return self._transform_validate(records, start_index=start_index)
+        return self._map_split(_transform_validate_slice, records, start_index)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "ChunkExecutor":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            # Pools are created from backfill, DAG and worker threads; forking a multithreaded process
+            # can copy held locks (logging, the SQLAlchemy pool) into the child and deadlock it.
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_pool_context())
+        return self._executor
+
+    def _map_split(
+        self,
+        fn: Callable[..., tuple[list[dict[str, object]], list[InvalidRecord]]],
+        records: list[dict[str, object]],
+        start_index: int,
+    ) -> tuple[list[dict[str, object]], list[InvalidRecord]]:
+        slices = self._split(records)
+        offsets = []
+        offset = start_index
+        for records_slice in slices:
+            offsets.append(offset)
+            offset += len(records_slice)
+
+        valid: list[dict[str, object]] = []
+        invalid: list[InvalidRecord] = []
+        # map() yields in submission order, so the merge matches the serial output exactly.
+        engines = [self.validation_engine] * len(slices)
+        specs = [self.rules_spec] * len(slices)
+        for part_valid, part_invalid in self._pool().map(fn, slices, offsets, engines, specs):
+            valid.extend(part_valid)
+            invalid.extend(part_invalid)
+        return valid, invalid
+
+    def _split(self, records: list[dict[str, object]]) -> list[list[dict[str, object]]]:
+        # Spread small inputs across every worker, but never ship more than chunk_size records per task.
+        size = max(1, min(self.chunk_size, math.ceil(len(records) / self.workers)))
+        return [records[start : start + size] for start in range(0, len(records), size)]
@@ -1,39 +1,139 @@
+from collections import Counter
+from collections.abc import Callable
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass, field
 from datetime import date
+from functools import partial
 import json
 import logging
 from pathlib import Path
+import threading
+import time
 from typing import TypeVar
 
-from sqlalchemy import select
+from sqlalchemy import make_url, select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session, sessionmaker
 
+from app.checkpoints import CheckpointStore
+from app.chunks import ChunkTracker
+from app.codec import get_codec
+from app.compression import check_compression, find_input, with_compression_suffix
 from app.config import Settings
+from app.dag import DagStep, StepCancelledError, run_dag
 from app.db_models import PipelineRun, StepRun
-from app.retry import RetryExhaustedError, run_with_retries
+from app.delta import DeltaTracker
+from app.fingerprints import file_sha256, rules_version
+from app.metrics import (
+    INVALID_RECORDS,
+    RECORDS,
+    RUNS,
+    RUNS_IN_FLIGHT,
+    STEP_DURATION,
+    STEP_RECORDS_PER_SECOND,
+    STEP_RETRIES,
+)
+from app.parallel import ChunkExecutor
+from app.result_cache import CacheEntry, ResultCache, cache_key
+from app.retry import (
+    CircuitOpenError,
+    RetryExhaustedError,
+    RetryPolicy,
+    get_circuit_breaker,
+    parse_retry_policies,
+    run_with_retries,
+)
+from app.rules import canonical_spec, load_rule_spec, spec_hash
 from app.run_store import (
+    apply_record_fingerprints,
+    clear_run_outputs,
+    copy_run_outputs,
     create_or_get_run,
     create_step_attempt,
+    delete_current_records,
     finish_step_failure,
     finish_step_success,
+    get_run,
+    load_record_fingerprints,
     mark_run_failed,
     mark_run_running,
     mark_run_succeeded,
+    record_restored_step,
+    record_step_chunks,
+    refresh_current_records,
     reset_failed_run_state,
     store_dead_letters,
     store_published_records,
 )
-from app.schemas import InvalidRecord, PipelineResult
-from app.step_logic import ingest_records, transform_records, validate_records, write_json, write_jsonl
+from app.profiling import StageClock, StepProfiler, measure_usage, parse_profile_modes
+from app.sharding import ShardedWriter, ShardLayout, write_shards
+from app.schemas import InvalidRecord, PipelineResult, RunCounts, StepUsage
+from app.step_logic import (
+    JsonlWriter,
+    dead_letter_rows,
+    iter_chunks,
+    iter_records,
+    write_json,
+)
 
 
 logger = logging.getLogger(__name__)
 T = TypeVar("T")
 
+STREAM_STAGES = ("ingest", "transform", "validate", "publish_report")
+FUSED_STREAM_STAGES = ("ingest", "transform_validate", "publish_report")
+
+
+@dataclass
+class RunContext:
+    # Plain values rather than the PipelineRun itself: DAG branches read them from other threads,
+    # where touching the session-bound (and possibly expired) run object is not safe.
+    run_id: int
+    run_key: str
+    run_date: date
+    counts: RunCounts
+    executor: ChunkExecutor
+    input_path: Path
+    input_fingerprint: str | None = None
+    report_extras: dict[str, object] = field(default_factory=dict)
+    delta: DeltaTracker | None = None
+
 
 class PipelineRunner:
     def __init__(self, settings: Settings, session_factory: sessionmaker[Session]) -> None:
         self.settings = settings
         self.session_factory = session_factory
+        self.codec = get_codec(settings.json_codec)
+        check_compression(settings.output_compression)
+        self.rules_spec = ""
+        self.rules_version = rules_version()
+        if settings.validation_engine == "compiled":
+            # The declarative spec only drives the compiled engine, so only then does it feed rules_version.
+            spec = load_rule_spec(settings.rules_spec)
+            self.rules_spec = canonical_spec(spec)
+            self.rules_version = rules_version(spec_hash(spec))
+        self.default_retry_policy = RetryPolicy(
+            max_retries=settings.max_step_retries,
+            backoff_seconds=settings.retry_backoff_seconds,
+            max_delay_seconds=settings.retry_max_delay_seconds,
+            deadline_seconds=settings.retry_deadline_seconds or None,
+            jitter=settings.retry_jitter,
+        )
+        self.retry_policies = parse_retry_policies(settings.retry_policies, self.default_retry_policy)
+        self.db_breaker = None
+        if settings.circuit_breaker_failures > 0:
+            # Shared by every runner on this database, so persistence failures carry over between runs.
+            # The name ends up in error messages (and so in pipeline_runs.error), so mask the password.
+            self.db_breaker = get_circuit_breaker(
+                f"db:{make_url(settings.database_url).render_as_string(hide_password=True)}",
+                failure_threshold=settings.circuit_breaker_failures,
+                reset_seconds=settings.circuit_breaker_reset_seconds,
+                failure_types=(SQLAlchemyError,),
+            )
+        self.profiler = StepProfiler(
+            parse_profile_modes(settings.profile_steps),
+            Path(settings.output_dir) / "profiles",
+        )
 
     def run(self, *, run_date: date, run_key: str, trigger_source: str = "manual") -> PipelineResult:
         with self.session_factory() as db:
@@ -53,82 +153,466 @@ class PipelineRunner:
                     return self._result_from_run(run, report_path=self._report_path(run_key), reused_existing_run=True)
 
             mark_run_running(db, run)
+            RUNS_IN_FLIGHT.inc()
 
-            total_records = 0
-            valid_records: list[dict[str, object]] = []
-            invalid_records: list[InvalidRecord] = []
-
+            counts = RunCounts()
             try:
-                ingested = self._run_step(db, run, "ingest", lambda: self._ingest(run_date))
-                total_records = len(ingested)
-
-                transformed = self._run_step(db, run, "transform", lambda: transform_records(ingested))
-                valid_records, invalid_records = self._run_step(
-                    db,
-                    run,
-                    "validate",
-                    lambda: validate_records(transformed),
-                )
-
-                self._run_step(
-                    db,
-                    run,
-                    "publish_report",
-                    lambda: self._publish_outputs(
-                        run_key=run_key,
+                with ChunkExecutor(
+                    self.settings.parallel_workers,
+                    self.settings.chunk_size,
+                    cache_line_index=self.settings.line_index_cache,
+                    validation_engine=self.settings.validation_engine,
+                    rules_spec=self.rules_spec,
+                ) as executor:
+                    ctx = RunContext(
+                        run_id=run.id,
+                        run_key=run.run_key,
                         run_date=run_date,
-                        valid_records=valid_records,
-                        invalid_records=invalid_records,
-                        total_records=total_records,
-                    ),
-                )
-
-                store_published_records(db, run_id=run.id, records=valid_records)
-                store_dead_letters(db, run_id=run.id, invalid_records=invalid_records)
+                        counts=counts,
+                        executor=executor,
+                        input_path=self._input_path(run_date),
+                    )
+                    self._execute(db, ctx)
 
                 mark_run_succeeded(
                     db,
                     run,
-                    total_records=total_records,
-                    valid_records=len(valid_records),
-                    invalid_records=len(invalid_records),
+                    total_records=counts.total_records,
+                    valid_records=counts.valid_records,
+                    invalid_records=counts.invalid_records,
                 )
             except Exception as exc:
+                db.rollback()
                 mark_run_failed(
                     db,
                     run,
                     error=str(exc),
-                    total_records=total_records,
-                    valid_records=len(valid_records),
-                    invalid_records=len(invalid_records),
+                    total_records=counts.total_records,
+                    valid_records=counts.valid_records,
+                    invalid_records=counts.invalid_records,
                 )
                 logger.exception("pipeline run failed", extra={"run_key": run_key})
                 return self._result_from_run(run, report_path=self._report_path(run_key), reused_existing_run=False)
+            finally:
+                RUNS_IN_FLIGHT.dec()
+                RUNS.inc(status=run.status)
 
             return self._result_from_run(run, report_path=self._report_path(run_key), reused_existing_run=False)
 
-    def _run_step(self, db: Session, run: PipelineRun, step_name: str, fn):
+    def _execute(self, db: Session, ctx: RunContext) -> None:
+        if (self.settings.result_cache or self.settings.checkpoints) and ctx.input_path.exists():
+            # Hashed once per run and shared by the result cache and checkpoints.
+            ctx.input_fingerprint = file_sha256(ctx.input_path)
+
+        result_cache = self._result_cache() if ctx.input_fingerprint else None
+        if result_cache is not None:
+            # Output compression is part of the key: a cached .gz file cannot stand in for plain JSONL.
+            key = cache_key(ctx.input_fingerprint, self.rules_version, self.settings.output_compression)
+            entry = self._usable_cache_entry(db, result_cache, key)
+            if entry is not None:
+                self._publish_from_cache(db, ctx, result_cache, entry)
+                self._refresh_current_records(db, ctx)
+                return
+            ctx.report_extras["result_cache"] = {"status": "miss", "key": key}
+
+        execute = self._run_streaming if self.settings.streaming else self._run_batch
+        execute(db, ctx)
+        self._refresh_current_records(db, ctx)
+        if ctx.delta is not None:
+            # The fingerprints advance last: if anything before this fails, the retry still diffs
+            # against the previous run's state instead of seeing every record as unchanged.
+            self._run_step(
+                db,
+                ctx,
+                "save_delta_state",
+                partial(self._save_delta_state, db, ctx, ctx.delta),
+                count_records=lambda _: ctx.counts.valid_records,
+            )
+
+        if result_cache is not None:
+            publish_path, dead_letter_path, _ = self._output_paths(ctx.run_key)
+            try:
+                result_cache.store(
+                    key,
+                    source_run_id=ctx.run_id,
+                    total_records=ctx.counts.total_records,
+                    valid_records=ctx.counts.valid_records,
+                    invalid_records=ctx.counts.invalid_records,
+                    files={"published": publish_path, "dead_letter": dead_letter_path},
+                )
+            except OSError:
+                # The run already succeeded; a cache write failure only costs a future recompute.
+                logger.warning("could not store result cache entry", exc_info=True, extra={"run_key": ctx.run_key})
+
+    def _refresh_current_records(self, db: Session, ctx: RunContext) -> None:
+        if self.settings.current_records:
+            self._persist(refresh_current_records, db, run_id=ctx.run_id)
+
+    def _result_cache(self) -> ResultCache | None:
+        # Delta runs must diff against the current record state, so a cached full publish cannot
+        # stand in; sharded runs have no single published file to cache.
+        if not self.settings.result_cache or self.settings.delta_publish or self._sharded:
+            return None
+        root = Path(self.settings.result_cache_dir or Path(self.settings.output_dir) / "cache")
+        return ResultCache(root, self.settings.result_cache_max_bytes)
+
+    def _usable_cache_entry(self, db: Session, result_cache: ResultCache, key: str) -> CacheEntry | None:
+        entry = result_cache.lookup(key)
+        if entry is None:
+            return None
+        # DB rows are copied from the source run, so it must still exist with its outputs intact.
+        source_run = get_run(db, entry.source_run_id)
+        if source_run is None or source_run.status != "succeeded":
+            return None
+        return entry
+
+    def _publish_from_cache(self, db: Session, ctx: RunContext, result_cache: ResultCache, entry: CacheEntry) -> None:
+        logger.info("result cache hit", extra={"run_key": ctx.run_key, "cache_key": entry.key})
+        ctx.counts.total_records = entry.total_records
+        ctx.counts.valid_records = entry.valid_records
+        ctx.counts.invalid_records = entry.invalid_records
+        ctx.report_extras["result_cache"] = {"status": "hit", "key": entry.key, "source_run_id": entry.source_run_id}
+
+        def publish() -> None:
+            publish_path, dead_letter_path, report_path = self._output_paths(ctx.run_key)
+            result_cache.materialize(entry, "published", publish_path)
+            result_cache.materialize(entry, "dead_letter", dead_letter_path)
+            write_json(report_path, self._report_payload(ctx, ctx.counts), self.codec)
+
+        self._run_step(
+            db,
+            ctx,
+            "publish_report",
+            publish,
+            count_records=lambda _: entry.valid_records + entry.invalid_records,
+        )
+        self._persist(copy_run_outputs, db, source_run_id=entry.source_run_id, target_run_id=ctx.run_id)
+
+    def _run_batch(self, db: Session, ctx: RunContext) -> None:
+        counts, executor = ctx.counts, ctx.executor
+        data_steps: list[tuple[str, Callable[[object], object], Callable[[object], int]]] = [
+            ("ingest", lambda _: executor.ingest(ctx.input_path, self.codec), len),
+        ]
+        if self.settings.fused_validate:
+            data_steps.append(("transform_validate", executor.transform_validate, _count_split))
+        else:
+            data_steps.append(("transform", executor.transform, len))
+            data_steps.append(("validate", executor.validate, _count_split))
+
+        checkpoints = self._checkpoint_store(db, ctx)
+        resume_at, result = self._load_resume_point(checkpoints, [step_name for step_name, _, _ in data_steps])
+
+        for position, (step_name, fn, count_records) in enumerate(data_steps):
+            if position < resume_at:
+                # Steps before the resume point are not reloaded; only the last one's output is needed.
+                record_restored_step(
+                    db,
+                    run_id=ctx.run_id,
+                    step_name=step_name,
+                    attempt=self._next_attempt(db, ctx.run_id, step_name),
+                    records_processed=checkpoints.record_count(step_name),
+                )
+            else:
+                result = self._run_step(db, ctx, step_name, partial(fn, result), count_records=count_records)
+                if checkpoints is not None:
+                    checkpoints.save(step_name, result, count_records(result))
+
+            if step_name == "ingest":
+                counts.total_records = checkpoints.record_count("ingest") if position < resume_at else len(result)
+
+        valid_records, invalid_records = result
+        counts.valid_records = len(valid_records)
+        counts.invalid_records = len(invalid_records)
+        _record_validation_metrics(valid_records, invalid_records)
+
+        delta, delta_records = None, None
+        if self.settings.delta_publish:
+            delta, delta_records = self._run_step(
+                db,
+                ctx,
+                "classify_delta",
+                lambda: self._classify_delta(db, valid_records),
+                count_records=lambda _: counts.valid_records,
+            )
+            ctx.report_extras["delta"] = self._delta_report(ctx, delta)
+            ctx.delta = delta
+
+        if self.settings.dag_workers:
+            self._publish_dag(
+                ctx,
+                valid_records=valid_records,
+                invalid_records=invalid_records,
+                delta_records=delta_records,
+            )
+        else:
+            self._run_step(
+                db,
+                ctx,
+                "publish_report",
+                ChunkTracker(
+                    self._publish_chunks(
+                        ctx,
+                        valid_records=valid_records,
+                        invalid_records=invalid_records,
+                        delta_records=delta_records,
+                    )
+                ),
+                count_records=lambda _: counts.valid_records + counts.invalid_records,
+            )
+            batch_size = self.settings.db_batch_size
+            published_records = valid_records if delta_records is None else delta_records
+            self._run_step(
+                db,
+                ctx,
+                "store_published_records",
+                self._store_chunks(
+                    db,
+                    _store_published_chunk,
+                    published_records,
+                    run_id=ctx.run_id,
+                    batch_size=batch_size,
+                ),
+                count_records=lambda _: len(published_records),
+            )
+            self._run_step(
+                db,
+                ctx,
+                "store_dead_letters",
+                self._store_chunks(
+                    db,
+                    _store_dead_letter_chunk,
+                    invalid_records,
+                    run_id=ctx.run_id,
+                    batch_size=batch_size,
+                ),
+                count_records=lambda _: counts.invalid_records,
+            )
+        if checkpoints is not None:
+            checkpoints.clear()
+
+    def _classify_delta(
+        self,
+        db: Session,
+        valid_records: list[dict[str, object]],
+    ) -> tuple[DeltaTracker, list[dict[str, object]]]:
+        delta = DeltaTracker(load_record_fingerprints(db), self.codec)
+        return delta, delta.classify(valid_records)
+
+    def _delta_report(self, ctx: RunContext, delta: DeltaTracker) -> dict[str, object]:
+        delta.count_deleted()
+        return {**asdict(delta.counts), "delta_output": str(self._delta_path(ctx.run_key))}
+
+    def _save_delta_state(self, db: Session, ctx: RunContext, delta: DeltaTracker) -> None:
+        deleted = delta.deleted_keys()
+        self._persist(
+            apply_record_fingerprints,
+            db,
+            run_id=ctx.run_id,
+            changed=delta.changed_fingerprints(),
+            deleted=deleted,
+            batch_size=self.settings.db_batch_size,
+        )
+        if self.settings.current_records:
+            self._persist(delete_current_records, db, deleted, batch_size=self.settings.db_batch_size)
+
+    def _checkpoint_store(self, db: Session, ctx: RunContext) -> CheckpointStore | None:
+        if not self.settings.checkpoints or ctx.input_fingerprint is None:
+            return None
+        return CheckpointStore(
+            db,
+            run_id=ctx.run_id,
+            root=Path(self.settings.output_dir) / "checkpoints" / ctx.run_key,
+            input_fingerprint=ctx.input_fingerprint,
+            rules_version=self.rules_version,
+            chunk_size=self.settings.chunk_size,
+        )
+
+    def _load_resume_point(self, checkpoints: CheckpointStore | None, step_names: list[str]) -> tuple[int, object]:
+        if checkpoints is None:
+            return 0, None
+        resume_at = checkpoints.restorable_prefix(step_names)
+        if not resume_at:
+            return 0, None
+
+        try:
+            return resume_at, checkpoints.load(step_names[resume_at - 1])
+        except Exception:
+            logger.warning("discarding unreadable checkpoints", exc_info=True)
+            checkpoints.clear()
+            return 0, None
+
+    def _run_streaming(self, db: Session, ctx: RunContext) -> None:
+        counts = ctx.counts
+        # All stages advance together chunk by chunk, so a retry replays the whole pass
+        # and every stage gets a fresh attempt row.
+        stages = FUSED_STREAM_STAGES if self.settings.fused_validate else STREAM_STAGES
+        failed_stage = stages[0]
+
+        def execute_once():
+            nonlocal failed_stage
+            steps = {}
+            for name in stages:
+                attempt = self._next_attempt(db, ctx.run_id, name)
+                steps[name] = create_step_attempt(db, run_id=ctx.run_id, step_name=name, attempt=attempt)
+            clock = StageClock(stages)
+            try:
+                with self.profiler.profile(ctx.run_key, f"stream-{steps[stages[0]].attempt}"):
+                    self._stream_pass(db, ctx, clock)
+            except Exception as exc:
+                db.rollback()
+                failed_stage = clock.current
+                for name, step in steps.items():
+                    error = str(exc) if name == failed_stage else f"aborted after stage '{failed_stage}' failed"
+                    usage = clock.usage(name, counts.total_records)
+                    finish_step_failure(db, step, error, duration_ms=clock.elapsed_ms(name), usage=usage)
+                    _record_step_metrics(name, step.attempt, "failed", clock.elapsed_ms(name) / 1000)
+                raise
+
+            for name, step in steps.items():
+                usage = clock.usage(name, counts.total_records)
+                finish_step_success(db, step, duration_ms=clock.elapsed_ms(name), usage=usage)
+                seconds = clock.elapsed_ms(name) / 1000
+                _record_step_metrics(name, step.attempt, "succeeded", seconds, counts.total_records)
+
+        try:
+            run_with_retries(
+                execute_once,
+                policy=self._retry_policy("stream"),
+                should_retry=lambda exc: self._is_retryable(failed_stage, exc),
+            )
+        except RetryExhaustedError as exc:
+            raise RuntimeError(f"step '{failed_stage}' failed after retries: {exc}") from exc
+
+    def _stream_pass(self, db: Session, ctx: RunContext, clock: StageClock) -> None:
+        counts, executor = ctx.counts, ctx.executor
+        counts.total_records = counts.valid_records = counts.invalid_records = 0
+        clear_run_outputs(db, ctx.run_id)
+
+        with clock.stage("ingest"):
+            chunks = iter_chunks(iter_records(ctx.input_path, self.codec), self.settings.chunk_size)
+            chunk = next(chunks, None)
+
+        publish_path, dead_letter_path, report_path = self._output_paths(ctx.run_key)
+        delta = DeltaTracker(load_record_fingerprints(db), self.codec) if self.settings.delta_publish else None
+        ctx.delta = delta
+        layout = self._shard_layout(ctx.run_key)
+        with ExitStack() as writers:
+            if layout is not None:
+                published = writers.enter_context(ShardedWriter(layout))
+            else:
+                published = writers.enter_context(self._jsonl_writer(publish_path))
+            dead_letters = writers.enter_context(self._jsonl_writer(dead_letter_path))
+            if delta is not None:
+                delta_writer = writers.enter_context(self._jsonl_writer(self._delta_path(ctx.run_key)))
+            while chunk is not None:
+                if self.settings.fused_validate:
+                    with clock.stage("transform_validate"):
+                        valid, invalid = executor.transform_validate(chunk, start_index=counts.total_records)
+                else:
+                    with clock.stage("transform"):
+                        transformed = executor.transform(chunk)
+                    with clock.stage("validate"):
+                        valid, invalid = executor.validate(transformed, start_index=counts.total_records)
+                with clock.stage("publish_report"):
+                    published.write_rows(valid)
+                    dead_letters.write_rows(dead_letter_rows(invalid))
+                    stored = valid
+                    if delta is not None:
+                        stored = delta.classify(valid)
+                        delta_writer.write_rows(stored)
+                    batch_size = self.settings.db_batch_size
+                    self._persist(store_published_records, db, run_id=ctx.run_id, records=stored, batch_size=batch_size)
+                    self._persist(
+                        store_dead_letters,
+                        db,
+                        run_id=ctx.run_id,
+                        invalid_records=invalid,
+                        batch_size=batch_size,
+                    )
+
+                counts.total_records += len(chunk)
+                counts.valid_records += len(valid)
+                counts.invalid_records += len(invalid)
+                _record_validation_metrics(valid, invalid)
+
+                with clock.stage("ingest"):
+                    chunk = next(chunks, None)
+
+        with clock.stage("publish_report"):
+            if layout is not None:
+                layout.write_manifest(ctx.run_key, published.shards)
+            if delta is not None:
+                ctx.report_extras["delta"] = self._delta_report(ctx, delta)
+            write_json(report_path, self._report_payload(ctx, counts), self.codec)
+
+    def _run_step(
+        self,
+        db: Session,
+        ctx: RunContext,
+        step_name: str,
+        fn: Callable[[], T] | ChunkTracker,
+        *,
+        count_records: Callable[[T], int] | None = None,
+        cancelled: threading.Event | None = None,
+    ) -> T:
         def execute_once(attempt: int):
+            if cancelled is not None and cancelled.is_set():
+                # A sibling DAG branch failed; do not start (or retry) this one.
+                raise StepCancelledError(f"step '{step_name}' cancelled after a sibling step failed")
             # Persist each attempt so retries stay auditable.
-            step = create_step_attempt(db, run_id=run.id, step_name=step_name, attempt=attempt)
+            step = create_step_attempt(db, run_id=ctx.run_id, step_name=step_name, attempt=attempt)
+            usage = StepUsage()
+            started = time.perf_counter()
             try:
-                result = fn()
-                finish_step_success(db, step)
+                with measure_usage(usage), self.profiler.profile(ctx.run_key, f"{step_name}-{attempt}"):
+                    if isinstance(fn, ChunkTracker):
+                        result = self._run_chunks(db, step, fn, cancelled)
+                    else:
+                        result = fn()
+                if count_records is not None:
+                    usage.records_processed = count_records(result)
+                finish_step_success(db, step, usage=usage)
+                seconds = time.perf_counter() - started
+                _record_step_metrics(step_name, attempt, "succeeded", seconds, usage.records_processed)
                 return result
             except Exception as exc:
-                finish_step_failure(db, step, str(exc))
+                db.rollback()
+                finish_step_failure(db, step, str(exc), usage=usage)
+                _record_step_metrics(step_name, attempt, "failed", time.perf_counter() - started)
                 raise
 
         try:
             return run_with_retries(
-                lambda: execute_once(self._next_attempt(db, run.id, step_name)),
-                max_retries=self.settings.max_step_retries,
-                backoff_seconds=self.settings.retry_backoff_seconds,
+                lambda: execute_once(self._next_attempt(db, ctx.run_id, step_name)),
+                policy=self._retry_policy(step_name),
                 should_retry=lambda exc: self._is_retryable(step_name, exc),
+                # DAG branches back off on the cancel event, so a failing sibling wakes them at once.
+                sleep=time.sleep if cancelled is None else cancelled.wait,
             )
         except RetryExhaustedError as exc:
             raise RuntimeError(f"step '{step_name}' failed after retries: {exc}") from exc
 
+    def _store_chunks(self, db: Session, store: Callable[..., None], rows: list, **options: object) -> ChunkTracker:
+        # Each chunk commits on its own, so a retry resumes after the last committed chunk.
+        return ChunkTracker(
+            [partial(self._persist, store, db, chunk, **options) for chunk in iter_chunks(rows, self.settings.chunk_size)]
+        )
+
+    def _run_chunks(
+        self,
+        db: Session,
+        step: StepRun,
+        chunks: ChunkTracker,
+        cancelled: threading.Event | None = None,
+    ) -> int:
+        # Chunks committed by earlier attempts are skipped; progress is committed after every chunk.
+        skipped = len(chunks.completed)
+        record_step_chunks(db, step, total=chunks.total, completed=0, skipped=skipped)
+        return chunks.run(
+            lambda completed: record_step_chunks(db, step, total=chunks.total, completed=completed, skipped=skipped),
+            cancelled=cancelled,
+        )
+
     def _next_attempt(self, db: Session, run_id: int, step_name: str) -> int:
         stmt = (
             select(StepRun.attempt)
@@ -141,57 +625,224 @@ class PipelineRunner:
             return current + 1
         return 1
 
+    def _retry_policy(self, step_name: str) -> RetryPolicy:
+        return self.retry_policies.get(step_name, self.default_retry_policy)
+
+    def _persist(self, fn: Callable[..., T], db: Session, *args: object, **kwargs: object) -> T:
+        if self.db_breaker is None:
+            return fn(db, *args, **kwargs)
+        return self.db_breaker.call(partial(fn, db, *args, **kwargs))
+
     def _is_retryable(self, step_name: str, exc: Exception) -> bool:
+        if isinstance(exc, (StepCancelledError, CircuitOpenError)):
+            return False
         # Ingest parse and missing file errors do not recover on retry.
         if step_name == "ingest" and isinstance(exc, (FileNotFoundError, json.JSONDecodeError)):
             return False
         return True
 
-    def _ingest(self, run_date: date) -> list[dict[str, object]]:
-        input_path = Path(self.settings.input_dir) / f"records-{run_date.isoformat()}.jsonl"
-        return ingest_records(input_path)
+    def _input_path(self, run_date: date) -> Path:
+        return find_input(Path(self.settings.input_dir) / f"records-{run_date.isoformat()}.jsonl")
+
+    def _output_paths(self, run_key: str) -> tuple[Path, Path, Path]:
+        output_root = Path(self.settings.output_dir)
+        compression = self.settings.output_compression
+        return (
+            with_compression_suffix(output_root / "published" / f"{run_key}.jsonl", compression),
+            with_compression_suffix(output_root / "dead-letter" / f"{run_key}.jsonl", compression),
+            output_root / "reports" / f"{run_key}.json",
+        )
+
+    def _publish_chunks(
+        self,
+        ctx: RunContext,
+        *,
+        valid_records: list[dict[str, object]],
+        invalid_records: list[InvalidRecord],
+        delta_records: list[dict[str, object]] | None = None,
+    ) -> list[Callable[[], None]]:
+        # One chunk per output file, report last, so a retry rewrites only the files not yet written.
+        chunks = [
+            lambda: self._write_published(ctx, valid_records),
+            lambda: self._write_dead_letters(ctx, invalid_records),
+        ]
+        if delta_records is not None:
+            chunks.append(lambda: self._write_delta(ctx, delta_records))
+        chunks.append(lambda: self._write_report(ctx, valid_records=valid_records, invalid_records=invalid_records))
+        return chunks
 
-    def _publish_outputs(
+    def _publish_dag(
         self,
+        ctx: RunContext,
         *,
-        run_key: str,
-        run_date: date,
         valid_records: list[dict[str, object]],
         invalid_records: list[InvalidRecord],
-        total_records: int,
+        delta_records: list[dict[str, object]] | None,
     ) -> None:
-        output_root = Path(self.settings.output_dir)
-        publish_path = output_root / "published" / f"{run_key}.jsonl"
-        dead_letter_path = output_root / "dead-letter" / f"{run_key}.jsonl"
-        report_path = output_root / "reports" / f"{run_key}.json"
-
-        write_jsonl(publish_path, valid_records)
-        write_jsonl(
-            dead_letter_path,
-            [
-                {
-                    "record_index": invalid.record_index,
-                    "reason": invalid.reason,
-                    "record": invalid.record,
-                }
-                for invalid in invalid_records
-            ],
+        # Output files and DB stores are independent branches; the report is written only once
+        # all of them succeed.
+        cancelled = threading.Event()
+        batch_size = self.settings.db_batch_size
+        published_records = valid_records if delta_records is None else delta_records
+
+        def branch(step_name: str, fn: Callable[[Session], object], records: int) -> Callable[[], object]:
+            def execute() -> object:
+                # Sessions are not thread-safe, so every branch records its StepRuns on its own.
+                with self.session_factory() as branch_db:
+                    return self._run_step(
+                        branch_db,
+                        ctx,
+                        step_name,
+                        partial(fn, branch_db),
+                        count_records=lambda _: records,
+                        cancelled=cancelled,
+                    )
+
+            return execute
+
+        def chunked_branch(
+            step_name: str,
+            store: Callable[..., None],
+            rows: list,
+            **store_options: object,
+        ) -> Callable[[], object]:
+            def execute() -> object:
+                with self.session_factory() as branch_db:
+                    return self._run_step(
+                        branch_db,
+                        ctx,
+                        step_name,
+                        self._store_chunks(branch_db, store, rows, **store_options),
+                        count_records=lambda _: len(rows),
+                        cancelled=cancelled,
+                    )
+
+            return execute
+
+        steps = [
+            DagStep(
+                "write_published",
+                branch("write_published", lambda _: self._write_published(ctx, valid_records), len(valid_records)),
+            ),
+            DagStep(
+                "write_dead_letters",
+                branch(
+                    "write_dead_letters",
+                    lambda _: self._write_dead_letters(ctx, invalid_records),
+                    len(invalid_records),
+                ),
+            ),
+            DagStep(
+                "store_published_records",
+                chunked_branch(
+                    "store_published_records",
+                    _store_published_chunk,
+                    published_records,
+                    run_id=ctx.run_id,
+                    batch_size=batch_size,
+                ),
+            ),
+            DagStep(
+                "store_dead_letters",
+                chunked_branch(
+                    "store_dead_letters",
+                    _store_dead_letter_chunk,
+                    invalid_records,
+                    run_id=ctx.run_id,
+                    batch_size=batch_size,
+                ),
+            ),
+        ]
+        if delta_records is not None:
+            steps.append(
+                DagStep(
+                    "write_delta",
+                    branch("write_delta", lambda _: self._write_delta(ctx, delta_records), len(delta_records)),
+                )
+            )
+        steps.append(
+            DagStep(
+                "publish_report",
+                branch(
+                    "publish_report",
+                    lambda _: self._write_report(ctx, valid_records=valid_records, invalid_records=invalid_records),
+                    len(valid_records) + len(invalid_records),
+                ),
+                depends_on=tuple(step.name for step in steps),
+            )
         )
-        write_json(
-            report_path,
-            {
-                "run_key": run_key,
-                "run_date": run_date.isoformat(),
-                "total_records": total_records,
-                "valid_records": len(valid_records),
-                "invalid_records": len(invalid_records),
-                "published_output": str(publish_path),
-                "dead_letter_output": str(dead_letter_path),
-            },
+        run_dag(steps, max_workers=self.settings.dag_workers, cancelled=cancelled)
+
+    def _write_published(self, ctx: RunContext, valid_records: list[dict[str, object]]) -> None:
+        layout = self._shard_layout(ctx.run_key)
+        if layout is not None:
+            shards = write_shards(layout, valid_records, workers=self.settings.parallel_workers)
+            layout.write_manifest(ctx.run_key, shards)
+        else:
+            with self._jsonl_writer(self._output_paths(ctx.run_key)[0]) as writer:
+                writer.write_rows(valid_records)
+
+    def _write_dead_letters(self, ctx: RunContext, invalid_records: list[InvalidRecord]) -> None:
+        with self._jsonl_writer(self._output_paths(ctx.run_key)[1]) as writer:
+            writer.write_rows(dead_letter_rows(invalid_records))
+
+    def _write_delta(self, ctx: RunContext, delta_records: list[dict[str, object]]) -> None:
+        with self._jsonl_writer(self._delta_path(ctx.run_key)) as writer:
+            writer.write_rows(delta_records)
+
+    def _write_report(
+        self,
+        ctx: RunContext,
+        *,
+        valid_records: list[dict[str, object]],
+        invalid_records: list[InvalidRecord],
+    ) -> None:
+        counts = RunCounts(ctx.counts.total_records, len(valid_records), len(invalid_records))
+        write_json(self._output_paths(ctx.run_key)[2], self._report_payload(ctx, counts), self.codec)
+
+    @property
+    def _sharded(self) -> bool:
+        return bool(self.settings.shard_field or self.settings.shard_rows)
+
+    def _shard_layout(self, run_key: str) -> ShardLayout | None:
+        if not self._sharded:
+            return None
+        return ShardLayout(
+            Path(self.settings.output_dir) / "published" / run_key,
+            field=self.settings.shard_field,
+            max_rows=self.settings.shard_rows,
+            codec=self.codec,
+            compression=self.settings.output_compression,
+            compression_level=self.settings.compression_level,
         )
 
+    def _jsonl_writer(self, path: Path) -> JsonlWriter:
+        return JsonlWriter(path, self.codec, compression_level=self.settings.compression_level)
+
+    def _delta_path(self, run_key: str) -> Path:
+        delta_path = Path(self.settings.output_dir) / "published" / f"{run_key}.delta.jsonl"
+        return with_compression_suffix(delta_path, self.settings.output_compression)
+
+    def _report_payload(self, ctx: RunContext, counts: RunCounts) -> dict[str, object]:
+        publish_path, dead_letter_path, _ = self._output_paths(ctx.run_key)
+        payload = {
+            "run_key": ctx.run_key,
+            "run_date": ctx.run_date.isoformat(),
+            "total_records": counts.total_records,
+            "valid_records": counts.valid_records,
+            "invalid_records": counts.invalid_records,
+            "published_output": str(publish_path),
+            "dead_letter_output": str(dead_letter_path),
+            **ctx.report_extras,
+        }
+        layout = self._shard_layout(ctx.run_key)
+        if layout is not None:
+            payload["published_output"] = str(layout.root)
+            payload["published_manifest"] = str(layout.manifest_path)
+        return payload
+
     def _report_path(self, run_key: str) -> str:
-        return str(Path(self.settings.output_dir) / "reports" / f"{run_key}.json")
+        return str(self._output_paths(run_key)[2])
 
     def _result_from_run(self, run: PipelineRun, report_path: str, reused_existing_run: bool) -> PipelineResult:
         return PipelineResult(
@@ -206,3 +857,38 @@ class PipelineRunner:
             report_path=report_path,
             reused_existing_run=reused_existing_run,
         )
+
+
+def _record_step_metrics(
+    step_name: str,
+    attempt: int,
+    status: str,
+    seconds: float,
+    records: int | None = None,
+) -> None:
+    STEP_DURATION.observe(seconds, step=step_name, status=status)
+    if attempt > 1:
+        STEP_RETRIES.inc(step=step_name)
+    if records and seconds > 0:
+        STEP_RECORDS_PER_SECOND.set(records / seconds, step=step_name)
+
+
+def _record_validation_metrics(valid: list[dict[str, object]], invalid: list[InvalidRecord]) -> None:
+    # Called once per validated batch or chunk, never per record.
+    RECORDS.inc(len(valid), outcome="valid")
+    RECORDS.inc(len(invalid), outcome="invalid")
+    for reason, count in Counter(record.reason for record in invalid).items():
+        INVALID_RECORDS.inc(count, reason=reason)
+
+
+def _store_published_chunk(db: Session, records: list[dict[str, object]], **options: object) -> None:
+    store_published_records(db, records=records, **options)
+
+
+def _store_dead_letter_chunk(db: Session, invalid_records: list[InvalidRecord], **options: object) -> None:
+    store_dead_letters(db, invalid_records=invalid_records, **options)
+
+
+def _count_split(result: tuple[list[dict[str, object]], list[InvalidRecord]]) -> int:
+    valid, invalid = result
+    return len(valid) + len(invalid)
@@ -0,0 +1,141 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+import cProfile
+import logging
+from pathlib import Path
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+from app.schemas import StepUsage
+
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = frozenset({"cprofile", "tracemalloc"})
+TOP_ALLOCATION_SITES = 25
+
+# cProfile (process-wide via sys.monitoring on 3.12+) and tracemalloc are global, so only one
+# step per process may hold them. Held for the whole profiled step.
+_profile_lock = threading.Lock()
+
+
+def parse_profile_modes(value: str) -> frozenset[str]:
+    modes = frozenset(part.strip().lower() for part in value.split(",") if part.strip())
+    unknown = modes - PROFILE_MODES
+    if unknown:
+        raise ValueError(f"unknown profile mode(s): {', '.join(sorted(unknown))}")
+    return modes
+
+
+def peak_rss_kb() -> int | None:
+    if resource is None:
+        return None
+    # ru_maxrss is reported in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+@contextmanager
+def measure_usage(usage: StepUsage) -> Iterator[StepUsage]:
+    # CPU time is the calling thread's, so concurrent DAG steps are not charged for each other; work
+    # handed to pool workers or helper threads is not included. Peak RSS is process-wide: the delta
+    # also reflects anything else running in the process at the same time.
+    cpu_started = time.thread_time()
+    rss_started = peak_rss_kb()
+    try:
+        yield usage
+    finally:
+        usage.cpu_time_ms = (time.thread_time() - cpu_started) * 1000
+        rss_finished = peak_rss_kb()
+        if rss_started is not None and rss_finished is not None:
+            usage.peak_rss_delta_kb = rss_finished - rss_started
+
+
+class StageClock:
+    def __init__(self, stages: tuple[str, ...]) -> None:
+        self.current = stages[0]
+        self._elapsed = dict.fromkeys(stages, 0.0)
+        self._cpu = dict.fromkeys(stages, 0.0)
+        self._rss_growth = dict.fromkeys(stages, 0)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        self.current = name
+        started = time.perf_counter()
+        cpu_started = time.thread_time()
+        rss_started = peak_rss_kb()
+        try:
+            yield
+        finally:
+            self._elapsed[name] += time.perf_counter() - started
+            self._cpu[name] += time.thread_time() - cpu_started
+            if rss_started is not None:
+                # The peak only grows, so each stage is charged with the growth seen while it ran.
+                self._rss_growth[name] += peak_rss_kb() - rss_started
+
+    def elapsed_ms(self, name: str) -> float:
+        return self._elapsed[name] * 1000
+
+    def usage(self, name: str, records_processed: int | None = None) -> StepUsage:
+        return StepUsage(
+            cpu_time_ms=self._cpu[name] * 1000,
+            peak_rss_delta_kb=self._rss_growth[name] if resource is not None else None,
+            records_processed=records_processed,
+        )
+
+
+class StepProfiler:
+    def __init__(self, modes: frozenset[str], output_dir: Path) -> None:
+        self.modes = modes
+        self.output_dir = output_dir
+
+    @contextmanager
+    def profile(self, run_key: str, label: str) -> Iterator[None]:
+        if not self.modes:
+            yield
+            return
+        if not _profile_lock.acquire(blocking=False):
+            # Another step (DAG branch, backfill or worker thread) is being profiled; waiting would
+            # serialize the concurrent steps, so this one runs unprofiled instead.
+            logger.info("step not profiled, another step holds the profiler", extra={"run_key": run_key, "step": label})
+            yield
+            return
+        try:
+            with self._profile(run_key, label):
+                yield
+        finally:
+            _profile_lock.release()
+
+    @contextmanager
+    def _profile(self, run_key: str, label: str) -> Iterator[None]:
+        target = self.output_dir / run_key / label
+        target.mkdir(parents=True, exist_ok=True)
+
+        profiler = cProfile.Profile() if "cprofile" in self.modes else None
+        started_tracing = "tracemalloc" in self.modes and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(target / "cprofile.prof")
+            if "tracemalloc" in self.modes and tracemalloc.is_tracing():
+                self._write_allocations(target / "tracemalloc.txt")
+                if started_tracing:
+                    tracemalloc.stop()
+
+    def _write_allocations(self, path: Path) -> None:
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f"current_bytes={current} peak_bytes={peak}"]
+        lines.extend(str(stat) for stat in snapshot.statistics("lineno")[:TOP_ALLOCATION_SITES])
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
@@ -0,0 +1,127 @@
+from dataclasses import dataclass
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import shutil
+import uuid
+
+from app.db_models import utc_now
+
+
+logger = logging.getLogger(__name__)
+
+META_FILE = "meta.json"
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    key: str
+    path: Path
+    source_run_id: int
+    total_records: int
+    valid_records: int
+    invalid_records: int
+    files: dict[str, str]
+
+
+def cache_key(input_fingerprint: str, rules_version: str, *variant: str) -> str:
+    return hashlib.sha256(":".join((input_fingerprint, rules_version, *variant)).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def lookup(self, key: str) -> CacheEntry | None:
+        entry_dir = self.root / key
+        try:
+            meta = json.loads((entry_dir / META_FILE).read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if not all((entry_dir / name).exists() for name in meta["files"].values()):
+            return None
+
+        # Touching the metadata file marks the entry as recently used for eviction.
+        os.utime(entry_dir / META_FILE)
+        return CacheEntry(
+            key=key,
+            path=entry_dir,
+            source_run_id=meta["source_run_id"],
+            total_records=meta["total_records"],
+            valid_records=meta["valid_records"],
+            invalid_records=meta["invalid_records"],
+            files=meta["files"],
+        )
+
+    def store(
+        self,
+        key: str,
+        *,
+        source_run_id: int,
+        total_records: int,
+        valid_records: int,
+        invalid_records: int,
+        files: dict[str, Path],
+    ) -> None:
+        entry_dir = self.root / key
+        if entry_dir.exists():
+            return
+
+        staging_dir = self.root / f".staging-{uuid.uuid4().hex}"
+        staging_dir.mkdir(parents=True)
+        try:
+            for name, source in files.items():
+                link_or_copy(source, staging_dir / f"{name}{source.suffix}")
+            meta = {
+                "key": key,
+                "source_run_id": source_run_id,
+                "total_records": total_records,
+                "valid_records": valid_records,
+                "invalid_records": invalid_records,
+                "files": {name: f"{name}{source.suffix}" for name, source in files.items()},
+                "created_at": utc_now().isoformat(),
+            }
+            (staging_dir / META_FILE).write_text(json.dumps(meta, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+            # Renaming the finished directory publishes the entry atomically; a concurrent
+            # writer that got there first wins and this copy is dropped.
+            staging_dir.rename(entry_dir)
+        except OSError:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            if not entry_dir.exists():
+                raise
+        self.evict(keep=key)
+
+    def materialize(self, entry: CacheEntry, name: str, target: Path) -> None:
+        link_or_copy(entry.path / entry.files[name], target)
+
+    def evict(self, *, keep: str | None = None) -> None:
+        entries = []
+        for entry_dir in self.root.iterdir() if self.root.exists() else []:
+            meta_path = entry_dir / META_FILE
+            if entry_dir.name.startswith(".") or not meta_path.exists():
+                continue
+            size = sum(path.stat().st_size for path in entry_dir.iterdir() if path.is_file())
+            entries.append((meta_path.stat().st_mtime, entry_dir, size))
+
+        total = sum(size for _, _, size in entries)
+        for _, entry_dir, size in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            if entry_dir.name == keep:
+                continue
+            logger.info("evicting result cache entry", extra={"cache_key": entry_dir.name, "bytes": size})
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+
+
+def link_or_copy(source: Path, target: Path) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.unlink(missing_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        # Different filesystem (or no hard-link support): fall back to a real copy.
+        shutil.copyfile(source, target)
@@ -1,22 +1,72 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+import json
+import random
+import threading
 import time
-from collections.abc import Callable
+from typing import TypeVar
+
+
+T = TypeVar("T")
 
 
 class RetryExhaustedError(RuntimeError):
     pass
 
 
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_retries: int
+    backoff_seconds: float
+    max_delay_seconds: float = 30.0
+    deadline_seconds: float | None = None
+    jitter: bool = True
+
+    def delay(self, attempt: int, rng: random.Random | None = None) -> float:
+        # Exponential backoff capped at max_delay_seconds; full jitter picks uniformly below the cap
+        # so concurrent runs that failed together do not retry together.
+        cap = min(self.max_delay_seconds, self.backoff_seconds * 2 ** (attempt - 1))
+        if not self.jitter:
+            return cap
+        return (rng or random).uniform(0, cap)
+
+
+POLICY_FIELDS = ("max_retries", "backoff_seconds", "max_delay_seconds", "deadline_seconds", "jitter")
+
+
+def parse_retry_policies(text: str, default: RetryPolicy) -> dict[str, RetryPolicy]:
+    # RETRY_POLICIES is a JSON object of step name -> overrides, e.g.
+    # {"store_published_records": {"max_retries": 5, "deadline_seconds": 120}}.
+    if not text.strip():
+        return {}
+    policies: dict[str, RetryPolicy] = {}
+    for step_name, overrides in json.loads(text).items():
+        unknown = set(overrides) - set(POLICY_FIELDS)
+        if unknown:
+            raise ValueError(f"unknown retry policy fields for '{step_name}': {sorted(unknown)}")
+        values = {name: getattr(default, name) for name in POLICY_FIELDS}
+        values.update(overrides)
+        policies[step_name] = RetryPolicy(**values)
+    return policies
+
+
 def run_with_retries(
-    fn: Callable[[], object],
+    fn: Callable[[], T],
     *,
-    max_retries: int,
-    backoff_seconds: float,
+    policy: RetryPolicy,
     on_attempt_failure: Callable[[int, Exception], None] | None = None,
     should_retry: Callable[[Exception], bool] | None = None,
-) -> object:
+    sleep: Callable[[float], object] = time.sleep,
+) -> T:
+    started = time.monotonic()
     last_error: Exception | None = None
 
-    for attempt in range(1, max_retries + 2):
+    for attempt in range(1, policy.max_retries + 2):
         try:
             return fn()
         except Exception as exc:
@@ -24,9 +74,133 @@ def run_with_retries(
             if on_attempt_failure:
                 on_attempt_failure(attempt, exc)
 
-            retry_allowed = True if should_retry is None else should_retry(exc)
-            if attempt > max_retries or not retry_allowed:
+            delay = _next_delay(policy, attempt, exc, started, should_retry)
+            if delay is None:
                 break
-            time.sleep(backoff_seconds * attempt)
+            sleep(delay)
 
     raise RetryExhaustedError(str(last_error)) from last_error
+
+
+async def run_with_retries_async(
+    fn: Callable[[], Awaitable[T]],
+    *,
+    policy: RetryPolicy,
+    on_attempt_failure: Callable[[int, Exception], None] | None = None,
+    should_retry: Callable[[Exception], bool] | None = None,
+) -> T:
+    # Same policy as run_with_retries, but backoff yields to the event loop instead of blocking it.
+    started = time.monotonic()
+    last_error: Exception | None = None
+
+    for attempt in range(1, policy.max_retries + 2):
+        try:
+            return await fn()
+        except Exception as exc:
+            last_error = exc
+            if on_attempt_failure:
+                on_attempt_failure(attempt, exc)
+
+            delay = _next_delay(policy, attempt, exc, started, should_retry)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+
+    raise RetryExhaustedError(str(last_error)) from last_error
+
+
+def _next_delay(
+    policy: RetryPolicy,
+    attempt: int,
+    exc: Exception,
+    started: float,
+    should_retry: Callable[[Exception], bool] | None,
+) -> float | None:
+    if attempt > policy.max_retries or (should_retry is not None and not should_retry(exc)):
+        return None
+    delay = policy.delay(attempt)
+    if policy.deadline_seconds is not None and time.monotonic() - started + delay > policy.deadline_seconds:
+        # Sleeping would overrun the total deadline, so give up now rather than after the wait.
+        return None
+    return delay
+
+
+class CircuitBreaker:
+    # Closed: calls pass through and consecutive failures are counted. Open (after
+    # failure_threshold failures): calls fail fast with CircuitOpenError for reset_seconds.
+    # Half-open: a single trial call decides whether to close again or reopen.
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int,
+        reset_seconds: float,
+        failure_types: tuple[type[BaseException], ...] = (Exception,),
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failure_types = failure_types
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "open" if self._clock() - self._opened_at < self.reset_seconds else "half_open"
+
+    def call(self, fn: Callable[[], T]) -> T:
+        with self._lock:
+            if self._opened_at is not None:
+                remaining = self.reset_seconds - (self._clock() - self._opened_at)
+                if remaining > 0 or self._trial_running:
+                    raise CircuitOpenError(
+                        f"circuit '{self.name}' is open after {self._failures} consecutive failures"
+                        f" (retry in {max(remaining, 0):.0f}s)"
+                    )
+                self._trial_running = True
+
+        try:
+            result = fn()
+        except self.failure_types:
+            self._record(success=False)
+            raise
+        except BaseException:
+            with self._lock:
+                self._trial_running = False
+            raise
+        self._record(success=True)
+        return result
+
+    def _record(self, *, success: bool) -> None:
+        with self._lock:
+            self._trial_running = False
+            if success:
+                self._failures = 0
+                self._opened_at = None
+                return
+            self._failures += 1
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+
+
+_breakers: dict[tuple[str, tuple[tuple[str, object], ...]], CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str, **options: object) -> CircuitBreaker:
+    # Shared per name and option set for the life of the process, so failures in one run trip the
+    # breaker for the next.
+    key = (name, tuple(sorted(options.items())))
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(name, **options)
+            _breakers[key] = breaker
+        return breaker
@@ -0,0 +1,169 @@
+from collections.abc import Callable
+from functools import lru_cache
+import hashlib
+import json
+from pathlib import Path
+import re
+
+from app.schemas import InvalidRecord
+
+
+Validator = Callable[..., tuple[list[dict[str, object]], list[InvalidRecord]]]
+
+# The hand-written validate_records rules, expressed as a spec. Fields are normalized with
+# str() (+ strip/lower) unless "raw"; rules run in declared order and the first failure wins.
+DEFAULT_RULE_SPEC: dict[str, object] = {
+    "fields": [
+        {"name": "record_key", "default": "", "strip": True},
+        {"name": "full_name", "default": "", "strip": True},
+        {"name": "email", "default": "", "strip": True, "lower": True},
+        {"name": "age", "raw": True},
+        {"name": "source", "default": "unknown"},
+    ],
+    "rules": [
+        {"type": "int", "field": "age", "reason": "age must be an integer"},
+        {"type": "required", "field": "record_key", "reason": "record_key is required"},
+        {"type": "required", "field": "full_name", "reason": "full_name is required"},
+        {"type": "contains", "field": "email", "values": ["@", "."], "reason": "email format is invalid"},
+        {"type": "range", "field": "age", "min": 18, "max": 120, "reason": "age must be between 18 and 120"},
+    ],
+    "derived": [
+        {
+            "name": "age_group",
+            "field": "age",
+            "buckets": [{"max": 34, "value": "18-34"}, {"max": 54, "value": "35-54"}],
+            "default": "55+",
+        }
+    ],
+    "output": ["record_key", "full_name", "email", "age", "age_group", "source"],
+}
+
+RULE_TYPES = ("int", "float", "required", "contains", "regex", "range")
+
+
+class RuleSpecError(ValueError):
+    pass
+
+
+def load_rule_spec(path: str | Path | None = None) -> dict[str, object]:
+    if not path:
+        return DEFAULT_RULE_SPEC
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def canonical_spec(spec: dict[str, object]) -> str:
+    return json.dumps(spec, sort_keys=True, separators=(",", ":"))
+
+
+def spec_hash(spec: dict[str, object]) -> str:
+    return hashlib.sha256(canonical_spec(spec).encode("utf-8")).hexdigest()
+
+
+def compile_rules(spec: dict[str, object]) -> Validator:
+    return _compile_canonical(canonical_spec(spec))
+
+
+@lru_cache(maxsize=32)
+def _compile_canonical(spec_text: str) -> Validator:
+    # Keyed by the canonical JSON text, so each distinct spec is generated and compiled once per process.
+    source, constants = generate_source(json.loads(spec_text))
+    namespace: dict[str, object] = {"InvalidRecord": InvalidRecord, **constants}
+    code = compile(source, f"<rules {hashlib.sha256(spec_text.encode('utf-8')).hexdigest()[:12]}>", "exec")
+    exec(code, namespace)
+    validator = namespace["validate"]
+    validator.__source__ = source
+    return validator
+
+
+def generate_source(spec: dict[str, object]) -> tuple[str, dict[str, object]]:
+    fields = {field["name"]: field for field in spec.get("fields", [])}
+    variables = {name: f"f{position}" for position, name in enumerate(fields)}
+    constants: dict[str, object] = {}
+    loaded: set[str] = set()
+
+    lines = [
+        "def validate(records, *, start_index=0):",
+        "    valid = []",
+        "    invalid = []",
+        "    append_valid = valid.append",
+        "    append_invalid = invalid.append",
+        "    for index, record in enumerate(records, start_index):",
+        "        get = record.get",
+    ]
+
+    def variable(name: str) -> str:
+        if name not in fields:
+            raise RuleSpecError(f"rule references undeclared field: {name}")
+        if name not in loaded:
+            # Fields are normalized right before their first use so failing records skip the rest.
+            lines.append(f"        {variables[name]} = {_field_expression(fields[name])}")
+            loaded.add(name)
+        return variables[name]
+
+    def reject(reason: str, indent: str = " " * 12) -> list[str]:
+        return [f"{indent}append_invalid(InvalidRecord(index, record, {reason!r}))", f"{indent}continue"]
+
+    for position, rule in enumerate(spec.get("rules", [])):
+        rule_type = rule.get("type")
+        reason = rule.get("reason") or f"{rule['field']} failed {rule_type}"
+        if rule_type in ("int", "float") and rule["field"] in fields and rule["field"] not in loaded:
+            # Coerce straight from the record instead of binding the raw value first.
+            name = variables[rule["field"]]
+            loaded.add(rule["field"])
+            value = _field_expression(fields[rule["field"]])
+        else:
+            name = variable(rule["field"])
+            value = name
+        if rule_type in ("int", "float"):
+            lines += [
+                "        try:",
+                f"            {name} = {rule_type}({value})",
+                "        except (TypeError, ValueError):",
+                *reject(reason, " " * 12),
+            ]
+        elif rule_type == "required":
+            lines += [f"        if not {name}:", *reject(reason)]
+        elif rule_type == "contains":
+            missing = " or ".join(f"{value!r} not in {name}" for value in rule["values"])
+            lines += [f"        if {missing}:", *reject(reason)]
+        elif rule_type == "regex":
+            constant = f"_match_{position}"
+            constants[constant] = re.compile(rule["pattern"]).search
+            lines += [f"        if {constant}({name}) is None:", *reject(reason)]
+        elif rule_type == "range":
+            checks = []
+            if rule.get("min") is not None:
+                checks.append(f"{name} < {rule['min']!r}")
+            if rule.get("max") is not None:
+                checks.append(f"{name} > {rule['max']!r}")
+            if checks:
+                lines += [f"        if {' or '.join(checks)}:", *reject(reason)]
+        else:
+            raise RuleSpecError(f"unknown rule type: {rule_type!r} (expected one of {', '.join(RULE_TYPES)})")
+
+    for derived in spec.get("derived", []):
+        source = variable(derived["field"])
+        expression = repr(derived["default"])
+        for bucket in reversed(derived["buckets"]):
+            expression = f"{bucket['value']!r} if {source} <= {bucket['max']!r} else {expression}"
+        target = f"d_{len(variables)}"
+        variables[derived["name"]] = target
+        fields[derived["name"]] = {"name": derived["name"]}
+        loaded.add(derived["name"])
+        lines.append(f"        {target} = {expression}")
+
+    output = ", ".join(f"{name!r}: {variable(name)}" for name in spec.get("output", list(fields)))
+    lines += [f"        append_valid({{{output}}})", "    return valid, invalid", ""]
+    return "\n".join(lines), constants
+
+
+def _field_expression(field: dict[str, object]) -> str:
+    name = field["name"]
+    if field.get("raw"):
+        return f"get({name!r})" if "default" not in field else f"get({name!r}, {field['default']!r})"
+    expression = f"str(get({name!r}, {field.get('default', '')!r}))"
+    if field.get("strip"):
+        expression += ".strip()"
+    if field.get("lower"):
+        expression += ".lower()"
+    return expression
@@ -1,10 +1,29 @@
-from datetime import UTC, datetime
-from sqlalchemy import delete, select
+from collections.abc import Iterable
+from datetime import UTC, date, datetime, timedelta
+import time
+
+from sqlalchemy import Insert, Table, and_, delete, insert, literal, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.db_models import DeadLetterRecord, PipelineRun, PublishedRecord, StepRun
-from app.schemas import InvalidRecord
+from app.db_models import (
+    CurrentRecord,
+    DeadLetterRecord,
+    PipelineRun,
+    PublishedRecord,
+    RecordFingerprint,
+    RunQueueItem,
+    StepCheckpoint,
+    StepRun,
+)
+from app.metrics import DB_BATCH_DURATION
+from app.schemas import InvalidRecord, StepUsage
+from app.step_logic import iter_chunks
+
+
+DEFAULT_DB_BATCH_SIZE = 5_000
 
 
 def utc_now() -> datetime:
@@ -16,6 +35,10 @@ def get_run_by_key(db: Session, run_key: str) -> PipelineRun | None:
     return db.execute(stmt).scalar_one_or_none()
 
 
+def get_run(db: Session, run_id: int) -> PipelineRun | None:
+    return db.get(PipelineRun, run_id)
+
+
 def create_or_get_run(db: Session, *, run_key: str, run_date, trigger_source: str) -> tuple[PipelineRun, bool]:
     run = PipelineRun(run_key=run_key, run_date=run_date, trigger_source=trigger_source, status="queued")
     db.add(run)
@@ -33,6 +56,12 @@ def create_or_get_run(db: Session, *, run_key: str, run_date, trigger_source: st
     return run, True
 
 
+def clear_run_outputs(db: Session, run_id: int) -> None:
+    db.execute(delete(DeadLetterRecord).where(DeadLetterRecord.run_id == run_id))
+    db.execute(delete(PublishedRecord).where(PublishedRecord.run_id == run_id))
+    db.commit()
+
+
 def reset_failed_run_state(db: Session, run: PipelineRun) -> None:
     db.execute(delete(StepRun).where(StepRun.run_id == run.id))
     db.execute(delete(DeadLetterRecord).where(DeadLetterRecord.run_id == run.id))
@@ -97,45 +126,431 @@ def create_step_attempt(db: Session, *, run_id: int, step_name: str, attempt: in
     return step
 
 
-def finish_step_success(db: Session, step: StepRun) -> None:
+def record_restored_step(
+    db: Session,
+    *,
+    run_id: int,
+    step_name: str,
+    attempt: int,
+    records_processed: int,
+    duration_ms: float = 0.0,
+) -> StepRun:
+    now = utc_now()
+    step = StepRun(
+        run_id=run_id,
+        step_name=step_name,
+        attempt=attempt,
+        status="restored",
+        started_at=now,
+        completed_at=now,
+        duration_ms=duration_ms,
+        records_processed=records_processed,
+    )
+    db.add(step)
+    db.commit()
+    return step
+
+
+def finish_step_success(
+    db: Session,
+    step: StepRun,
+    *,
+    duration_ms: float | None = None,
+    usage: StepUsage | None = None,
+) -> None:
     finished_at = utc_now()
     step.status = "succeeded"
     step.completed_at = finished_at
-    step.duration_ms = (finished_at - step.started_at).total_seconds() * 1000
+    step.duration_ms = _step_duration_ms(step, finished_at, duration_ms)
+    _apply_step_usage(step, usage)
     step.error = None
     db.commit()
 
 
-def finish_step_failure(db: Session, step: StepRun, error: str) -> None:
+def finish_step_failure(
+    db: Session,
+    step: StepRun,
+    error: str,
+    *,
+    duration_ms: float | None = None,
+    usage: StepUsage | None = None,
+) -> None:
     finished_at = utc_now()
     step.status = "failed"
     step.completed_at = finished_at
-    step.duration_ms = (finished_at - step.started_at).total_seconds() * 1000
+    step.duration_ms = _step_duration_ms(step, finished_at, duration_ms)
+    _apply_step_usage(step, usage)
     step.error = error
     db.commit()
 
 
-def store_dead_letters(db: Session, *, run_id: int, invalid_records: list[InvalidRecord]) -> None:
-    for invalid in invalid_records:
-        db.add(
-            DeadLetterRecord(
-                run_id=run_id,
-                record_index=invalid.record_index,
-                raw_record=str(invalid.record),
-                reason=invalid.reason,
+def record_step_chunks(db: Session, step: StepRun, *, total: int, completed: int, skipped: int) -> None:
+    step.chunks_total = total
+    step.chunks_completed = completed
+    step.chunks_skipped = skipped
+    db.commit()
+
+
+def _apply_step_usage(step: StepRun, usage: StepUsage | None) -> None:
+    if usage is None:
+        return
+    step.cpu_time_ms = usage.cpu_time_ms
+    step.peak_rss_delta_kb = usage.peak_rss_delta_kb
+    step.records_processed = usage.records_processed
+
+
+def _step_duration_ms(step: StepRun, finished_at: datetime, duration_ms: float | None) -> float:
+    # Streamed stages interleave, so callers pass the time actually spent in the stage.
+    if duration_ms is not None:
+        return duration_ms
+    return (finished_at - step.started_at).total_seconds() * 1000
+
+
+def get_step_checkpoint(db: Session, *, run_id: int, step_name: str) -> StepCheckpoint | None:
+    stmt = select(StepCheckpoint).where(StepCheckpoint.run_id == run_id, StepCheckpoint.step_name == step_name)
+    return db.execute(stmt).scalar_one_or_none()
+
+
+def list_step_checkpoints(db: Session, run_id: int) -> list[StepCheckpoint]:
+    stmt = select(StepCheckpoint).where(StepCheckpoint.run_id == run_id)
+    return list(db.execute(stmt).scalars().all())
+
+
+def save_step_checkpoint(
+    db: Session,
+    *,
+    run_id: int,
+    step_name: str,
+    path: str,
+    input_fingerprint: str,
+    rules_version: str,
+    record_count: int,
+) -> StepCheckpoint:
+    db.execute(delete(StepCheckpoint).where(StepCheckpoint.run_id == run_id, StepCheckpoint.step_name == step_name))
+    checkpoint = StepCheckpoint(
+        run_id=run_id,
+        step_name=step_name,
+        path=path,
+        input_fingerprint=input_fingerprint,
+        rules_version=rules_version,
+        record_count=record_count,
+        created_at=utc_now(),
+    )
+    db.add(checkpoint)
+    db.commit()
+    return checkpoint
+
+
+def delete_step_checkpoints(db: Session, run_id: int) -> None:
+    db.execute(delete(StepCheckpoint).where(StepCheckpoint.run_id == run_id))
+    db.commit()
+
+
+def store_dead_letters(
+    db: Session,
+    *,
+    run_id: int,
+    invalid_records: Iterable[InvalidRecord],
+    batch_size: int = DEFAULT_DB_BATCH_SIZE,
+) -> None:
+    rows = (
+        {
+            "run_id": run_id,
+            "record_index": invalid.record_index,
+            "raw_record": str(invalid.record),
+            "reason": invalid.reason,
+        }
+        for invalid in invalid_records
+    )
+    _bulk_insert(db, DeadLetterRecord.__table__, rows, batch_size=batch_size)
+    db.commit()
+
+
+def store_published_records(
+    db: Session,
+    *,
+    run_id: int,
+    records: Iterable[dict[str, object]],
+    batch_size: int = DEFAULT_DB_BATCH_SIZE,
+) -> None:
+    rows = (
+        {"run_id": run_id, "record_key": str(record["record_key"]), "payload": str(record)}
+        for record in records
+    )
+    # ON CONFLICT DO NOTHING skips keys already stored when publish is retried.
+    _bulk_insert(
+        db,
+        PublishedRecord.__table__,
+        rows,
+        batch_size=batch_size,
+        conflict_columns=("run_id", "record_key"),
+    )
+    db.commit()
+
+
+def get_current_record(db: Session, record_key: str) -> CurrentRecord | None:
+    stmt = select(CurrentRecord).where(CurrentRecord.record_key == record_key)
+    return db.execute(stmt).scalar_one_or_none()
+
+
+def refresh_current_records(db: Session, *, run_id: int) -> None:
+    # Upserts straight from the run's published rows: they are already de-duplicated per key
+    # (a single statement may not touch a key twice) and never round-trip through Python.
+    published = PublishedRecord.__table__
+    source = (
+        select(published.c.record_key, published.c.payload, published.c.run_id, literal(utc_now()))
+        .where(published.c.run_id == run_id)
+        .order_by(published.c.id)
+    )
+    run_date = db.execute(select(PipelineRun.run_date).where(PipelineRun.id == run_id)).scalar_one()
+    stmt = _current_records_upsert(db, run_id=run_id, run_date=run_date).from_select(
+        ["record_key", "payload", "run_id", "updated_at"], source
+    )
+    db.execute(stmt)
+    db.commit()
+
+
+def delete_current_records(db: Session, record_keys: Iterable[str], batch_size: int = DEFAULT_DB_BATCH_SIZE) -> None:
+    for batch in iter_chunks(record_keys, batch_size):
+        db.execute(delete(CurrentRecord).where(CurrentRecord.record_key.in_(batch)))
+    db.commit()
+
+
+def load_record_fingerprints(db: Session) -> dict[str, str]:
+    rows = db.execute(select(RecordFingerprint.record_key, RecordFingerprint.fingerprint))
+    return {record_key: fingerprint for record_key, fingerprint in rows}
+
+
+def apply_record_fingerprints(
+    db: Session,
+    *,
+    run_id: int,
+    changed: dict[str, str],
+    deleted: Iterable[str],
+    batch_size: int = DEFAULT_DB_BATCH_SIZE,
+) -> None:
+    # Replace changed keys with delete + insert so the same batched paths work on every dialect.
+    for batch in iter_chunks([*changed, *deleted], batch_size):
+        db.execute(delete(RecordFingerprint).where(RecordFingerprint.record_key.in_(batch)))
+    rows = (
+        {"record_key": record_key, "fingerprint": fingerprint, "run_id": run_id}
+        for record_key, fingerprint in changed.items()
+    )
+    _bulk_insert(db, RecordFingerprint.__table__, rows, batch_size=batch_size)
+    db.commit()
+
+
+def copy_run_outputs(db: Session, *, source_run_id: int, target_run_id: int) -> None:
+    # Server-side INSERT ... SELECT keeps payloads byte-identical without loading rows into Python.
+    published = PublishedRecord.__table__
+    dead_letters = DeadLetterRecord.__table__
+    db.execute(
+        insert(published).from_select(
+            ["run_id", "record_key", "payload"],
+            select(literal(target_run_id), published.c.record_key, published.c.payload)
+            .where(published.c.run_id == source_run_id)
+            .order_by(published.c.id),
+        )
+    )
+    db.execute(
+        insert(dead_letters).from_select(
+            ["run_id", "record_index", "raw_record", "reason"],
+            select(
+                literal(target_run_id),
+                dead_letters.c.record_index,
+                dead_letters.c.raw_record,
+                dead_letters.c.reason,
             )
+            .where(dead_letters.c.run_id == source_run_id)
+            .order_by(dead_letters.c.id),
+        )
+    )
+    db.commit()
+
+
+def enqueue_run(db: Session, *, run_key: str, run_date, trigger_source: str) -> tuple[RunQueueItem, bool]:
+    item = RunQueueItem(run_key=run_key, run_date=run_date, trigger_source=trigger_source, status="queued")
+    db.add(item)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Unique run_key makes enqueueing idempotent across scheduler replicas.
+        db.rollback()
+        existing = db.execute(select(RunQueueItem).where(RunQueueItem.run_key == run_key)).scalar_one()
+        if existing.status != "failed":
+            return existing, False
+        existing.status = "queued"
+        existing.attempts = 0
+        existing.error = None
+        existing.finished_at = None
+        db.commit()
+        return existing, True
+
+    db.refresh(item)
+    return item, True
+
+
+def get_queue_item(db: Session, run_key: str) -> RunQueueItem | None:
+    return db.execute(select(RunQueueItem).where(RunQueueItem.run_key == run_key)).scalar_one_or_none()
+
+
+def claim_queued_run(db: Session, *, worker_id: str, lease_seconds: float) -> RunQueueItem | None:
+    now = utc_now()
+    claimable = or_(
+        RunQueueItem.status == "queued",
+        and_(RunQueueItem.status == "leased", RunQueueItem.lease_expires_at < now),
+    )
+    stmt = select(RunQueueItem.id).where(claimable).order_by(RunQueueItem.id).limit(1)
+    if db.get_bind().dialect.name == "postgresql":
+        # Concurrent workers skip rows another transaction is claiming instead of queueing behind it.
+        stmt = stmt.with_for_update(skip_locked=True)
+    item_id = db.execute(stmt).scalar_one_or_none()
+    if item_id is None:
+        db.rollback()
+        return None
+
+    # Conditional update: on SQLite (no row locks) only one claimer sees rowcount 1.
+    claimed = db.execute(
+        update(RunQueueItem)
+        .where(RunQueueItem.id == item_id, claimable)
+        .values(
+            status="leased",
+            attempts=RunQueueItem.attempts + 1,
+            lease_owner=worker_id,
+            lease_expires_at=now + timedelta(seconds=lease_seconds),
+            heartbeat_at=now,
         )
+    )
+    if claimed.rowcount != 1:
+        db.rollback()
+        return None
     db.commit()
+    return db.get(RunQueueItem, item_id, populate_existing=True)
+
 
+def heartbeat_run_lease(db: Session, *, item_id: int, worker_id: str, lease_seconds: float) -> bool:
+    now = utc_now()
+    renewed = db.execute(
+        update(RunQueueItem)
+        .where(RunQueueItem.id == item_id, RunQueueItem.lease_owner == worker_id, RunQueueItem.status == "leased")
+        .values(heartbeat_at=now, lease_expires_at=now + timedelta(seconds=lease_seconds))
+    )
+    db.commit()
+    return renewed.rowcount == 1
 
-def store_published_records(db: Session, *, run_id: int, records: list[dict[str, object]]) -> None:
-    existing_stmt = select(PublishedRecord.record_key).where(PublishedRecord.run_id == run_id)
-    existing_keys = set(db.execute(existing_stmt).scalars().all())
 
-    for record in records:
-        record_key = str(record["record_key"])
-        # Skip duplicates when publish is retried.
-        if record_key in existing_keys:
-            continue
-        db.add(PublishedRecord(run_id=run_id, record_key=record_key, payload=str(record)))
+def finish_queued_run(
+    db: Session,
+    *,
+    item_id: int,
+    worker_id: str,
+    status: str,
+    run_id: int | None = None,
+    error: str | None = None,
+) -> bool:
+    finished = db.execute(
+        update(RunQueueItem)
+        .where(RunQueueItem.id == item_id, RunQueueItem.lease_owner == worker_id)
+        .values(
+            status=status,
+            run_id=run_id,
+            error=error,
+            finished_at=utc_now(),
+            lease_owner=None,
+            lease_expires_at=None,
+        )
+    )
     db.commit()
+    return finished.rowcount == 1
+
+
+def _bulk_insert(
+    db: Session,
+    table: Table,
+    rows: Iterable[dict[str, object]],
+    *,
+    batch_size: int,
+    conflict_columns: tuple[str, ...] = (),
+) -> None:
+    dialect = db.get_bind().dialect
+    if dialect.name == "postgresql" and dialect.driver == "psycopg":
+        _copy_rows(db, table, rows, batch_size=batch_size, conflict_columns=conflict_columns)
+        return
+
+    stmt = _insert_statement(dialect.name, table, conflict_columns)
+    for batch in iter_chunks(rows, batch_size):
+        # A list of parameter sets runs as one executemany / multi-row VALUES insert.
+        started = time.perf_counter()
+        db.execute(stmt, batch)
+        DB_BATCH_DURATION.observe(time.perf_counter() - started, table=table.name)
+
+
+def _current_records_upsert(db: Session, *, run_id: int, run_date: date) -> Insert:
+    table = CurrentRecord.__table__
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        stmt = postgresql_insert(table)
+    elif dialect_name == "sqlite":
+        stmt = sqlite_insert(table)
+    else:
+        raise NotImplementedError(f"current record upserts are not supported on {dialect_name}")
+    # Backfills and replays can publish an older run after a newer one; a stored row is only
+    # replaced by a run that is at least as recent (run_date first, then run id).
+    not_newer = select(PipelineRun.id).where(
+        or_(PipelineRun.run_date < run_date, and_(PipelineRun.run_date == run_date, PipelineRun.id <= run_id))
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=["record_key"],
+        set_={"payload": stmt.excluded.payload, "run_id": stmt.excluded.run_id, "updated_at": stmt.excluded.updated_at},
+        where=table.c.run_id.in_(not_newer),
+    )
+
+
+def _insert_statement(dialect_name: str, table: Table, conflict_columns: tuple[str, ...]) -> Insert:
+    if not conflict_columns:
+        return insert(table)
+    if dialect_name == "postgresql":
+        return postgresql_insert(table).on_conflict_do_nothing(index_elements=list(conflict_columns))
+    if dialect_name == "sqlite":
+        return sqlite_insert(table).on_conflict_do_nothing(index_elements=list(conflict_columns))
+    raise NotImplementedError(f"conflict-skipping bulk insert is not supported on {dialect_name}")
+
+
+def _copy_rows(
+    db: Session,
+    table: Table,
+    rows: Iterable[dict[str, object]],
+    *,
+    batch_size: int,
+    conflict_columns: tuple[str, ...],
+) -> None:
+    columns = [column.name for column in table.columns if not column.primary_key]
+    column_list = ", ".join(columns)
+    primary_key = ", ".join(column.name for column in table.primary_key.columns)
+    cursor = db.connection().connection.driver_connection.cursor()
+    try:
+        target = table.name
+        if conflict_columns:
+            # COPY cannot skip conflicts, so stage rows in a temp table and merge from there.
+            target = f"_stage_{table.name}"
+            cursor.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS {target} "
+                f"(LIKE {table.name} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+            )
+        # One COPY per DB_BATCH_SIZE rows, like the INSERT path: bounds the staged rows and
+        # gives DB_BATCH_DURATION comparable samples.
+        for batch in iter_chunks(rows, batch_size):
+            started = time.perf_counter()
+            with cursor.copy(f"COPY {target} ({column_list}) FROM STDIN") as copy:
+                for row in batch:
+                    copy.write_row([row[column] for column in columns])
+            if conflict_columns:
+                # The staged primary key comes from the serial default, so it follows COPY order.
+                cursor.execute(
+                    f"INSERT INTO {table.name} ({column_list}) SELECT {column_list} FROM {target} "
+                    f"ORDER BY {primary_key} ON CONFLICT ({', '.join(conflict_columns)}) DO NOTHING"
+                )
+                cursor.execute(f"TRUNCATE {target}")
+            DB_BATCH_DURATION.observe(time.perf_counter() - started, table=table.name)
+    finally:
+        cursor.close()
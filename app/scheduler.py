@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session, sessionmaker
 
 from app.config import Settings
 from app.pipeline import PipelineRunner
+from app.run_store import enqueue_run
 
 
 logger = logging.getLogger(__name__)
@@ -15,6 +16,13 @@ def _run_daily_pipeline(settings: Settings, session_factory: sessionmaker[Sessio
     run_date = datetime.now(UTC).date()
     run_key = f"scheduled-{run_date.isoformat()}"
 
+    if settings.run_queue:
+        # Workers execute the run; every scheduler replica enqueues the same key, which dedupes.
+        with session_factory() as db:
+            _, queued = enqueue_run(db, run_key=run_key, run_date=run_date, trigger_source="scheduled")
+        logger.info("scheduled pipeline run enqueued", extra={"run_key": run_key, "newly_queued": queued})
+        return
+
     runner = PipelineRunner(settings, session_factory)
     result = runner.run(run_date=run_date, run_key=run_key, trigger_source="scheduled")
     if result.status == "failed":
@@ -21,3 +21,52 @@ class PipelineResult:
     invalid_records: int
     report_path: str | None
     reused_existing_run: bool
+
+
+@dataclass(frozen=True)
+class DryRunResult:
+    input_path: str
+    total_records: int
+    valid_records: int
+    invalid_records: int
+    reasons: dict[str, int]
+    dead_letter_path: str | None
+    seconds: float
+
+
+@dataclass
+class RunCounts:
+    total_records: int = 0
+    valid_records: int = 0
+    invalid_records: int = 0
+
+
+@dataclass(frozen=True)
+class RecordRange:
+    start_index: int
+    start_byte: int
+    end_byte: int
+
+
+@dataclass
+class StepUsage:
+    cpu_time_ms: float = 0.0
+    peak_rss_delta_kb: int | None = None
+    records_processed: int | None = None
+
+
+@dataclass
+class DeltaCounts:
+    new: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+
+
+@dataclass(frozen=True)
+class ShardInfo:
+    path: str
+    partition: str | None
+    rows: int
+    bytes: int
+    sha256: str
@@ -0,0 +1,154 @@
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+import os
+from pathlib import Path
+import shutil
+from urllib.parse import quote
+
+from app.codec import JsonCodec
+from app.compression import with_compression_suffix
+from app.fingerprints import file_sha256
+from app.schemas import ShardInfo
+from app.step_logic import JsonlWriter, iter_chunks, write_json
+
+
+MANIFEST_FILE = "manifest.json"
+
+
+class ShardLayout:
+    def __init__(
+        self,
+        root: Path,
+        *,
+        field: str,
+        max_rows: int,
+        codec: JsonCodec,
+        compression: str = "none",
+        compression_level: int | None = None,
+    ) -> None:
+        self.root = root
+        self.field = field
+        self.max_rows = max_rows
+        self.codec = codec
+        self.compression = compression
+        self.compression_level = compression_level
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / MANIFEST_FILE
+
+    def partition(self, row: dict[str, object]) -> str | None:
+        if not self.field:
+            return None
+        return str(row.get(self.field, ""))
+
+    def shard_path(self, partition: str | None, part: int) -> Path:
+        directory = self.root if partition is None else self.root / f"{self.field}={quote(partition, safe='')}"
+        return with_compression_suffix(directory / f"part-{part:05d}.jsonl", self.compression)
+
+    def open_shard(self, partition: str | None, part: int) -> JsonlWriter:
+        return JsonlWriter(self.shard_path(partition, part), self.codec, compression_level=self.compression_level)
+
+    def reset(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+        self.root.mkdir(parents=True)
+
+    def describe(self, partition: str | None, path: Path, rows: int) -> ShardInfo:
+        return ShardInfo(
+            path=path.relative_to(self.root).as_posix(),
+            partition=partition,
+            rows=rows,
+            bytes=path.stat().st_size,
+            sha256=file_sha256(path),
+        )
+
+    def write_manifest(self, run_key: str, shards: list[ShardInfo]) -> Path:
+        shards = sorted(shards, key=lambda shard: shard.path)
+        manifest = {
+            "run_key": run_key,
+            "shard_field": self.field or None,
+            "shard_rows": self.max_rows or None,
+            "total_rows": sum(shard.rows for shard in shards),
+            "shards": [
+                {
+                    "path": shard.path,
+                    "partition": shard.partition,
+                    "rows": shard.rows,
+                    "bytes": shard.bytes,
+                    "sha256": shard.sha256,
+                }
+                for shard in shards
+            ],
+        }
+        write_json(self.manifest_path, manifest, self.codec)
+        return self.manifest_path
+
+
+def write_shards(layout: ShardLayout, rows: Iterable[dict[str, object]], *, workers: int = 0) -> list[ShardInfo]:
+    layout.reset()
+    partitions: dict[str | None, list[dict[str, object]]] = {}
+    for row in rows:
+        partitions.setdefault(layout.partition(row), []).append(row)
+
+    jobs = [
+        (partition, part, shard_rows)
+        for partition, partition_rows in partitions.items()
+        for part, shard_rows in enumerate(iter_chunks(partition_rows, layout.max_rows or len(partition_rows)))
+    ]
+
+    def write_one(job: tuple[str | None, int, list[dict[str, object]]]) -> ShardInfo:
+        partition, part, shard_rows = job
+        with layout.open_shard(partition, part) as writer:
+            writer.write_rows(shard_rows)
+        return layout.describe(partition, writer.path, writer.rows_written)
+
+    # Threads overlap file I/O and compression (zlib/zstd release the GIL) across shards.
+    max_workers = max(1, min(len(jobs), workers or os.cpu_count() or 1))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="shard") as pool:
+        return list(pool.map(write_one, jobs))
+
+
+class ShardedWriter:
+    # Streaming counterpart of write_shards: rows arrive chunk by chunk and shards roll over
+    # at max_rows, producing the same files and manifest as the batch path.
+    def __init__(self, layout: ShardLayout) -> None:
+        self.layout = layout
+        self.shards: list[ShardInfo] = []
+        self._open: dict[str | None, tuple[int, JsonlWriter]] = {}
+        layout.reset()
+
+    def write_rows(self, rows: Iterable[dict[str, object]]) -> None:
+        partitions: dict[str | None, list[dict[str, object]]] = {}
+        for row in rows:
+            partitions.setdefault(self.layout.partition(row), []).append(row)
+
+        max_rows = self.layout.max_rows
+        for partition, partition_rows in partitions.items():
+            part, writer = self._open.get(partition) or self._start(partition, 0)
+            start = 0
+            while start < len(partition_rows):
+                if max_rows and writer.rows_written >= max_rows:
+                    self._finish(partition, writer)
+                    part, writer = self._start(partition, part + 1)
+                end = start + max_rows - writer.rows_written if max_rows else len(partition_rows)
+                writer.write_rows(partition_rows[start:end])
+                start = end
+
+    def close(self) -> None:
+        for partition, (_, writer) in list(self._open.items()):
+            self._finish(partition, writer)
+        self._open.clear()
+
+    def __enter__(self) -> "ShardedWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _start(self, partition: str | None, part: int) -> tuple[int, JsonlWriter]:
+        self._open[partition] = (part, self.layout.open_shard(partition, part))
+        return self._open[partition]
+
+    def _finish(self, partition: str | None, writer: JsonlWriter) -> None:
+        writer.close()
+        self.shards.append(self.layout.describe(partition, writer.path, writer.rows_written))
@@ -1,21 +1,57 @@
-import json
+from collections.abc import Iterable, Iterator
+from itertools import islice
 from pathlib import Path
+from typing import BinaryIO, TypeVar
 
+from app.codec import JsonCodec, get_codec
+from app.compression import is_compressed, open_read, open_write
+from app.line_index import iter_record_range, load_line_index
 from app.schemas import InvalidRecord
 
 
-def ingest_records(input_path: Path) -> list[dict[str, object]]:
+T = TypeVar("T")
+
+
+def iter_records(
+    input_path: Path,
+    codec: JsonCodec | None = None,
+    *,
+    start_index: int = 0,
+) -> Iterator[dict[str, object]]:
     if not input_path.exists():
         raise FileNotFoundError(f"input file not found: {input_path}")
 
-    records: list[dict[str, object]] = []
-    with input_path.open("r", encoding="utf-8") as infile:
-        for line in infile:
-            line = line.strip()
-            if not line:
-                continue
-            records.append(json.loads(line))
-    return records
+    if is_compressed(input_path):
+        # Compressed inputs cannot be mapped or seeked, so decompress as a stream.
+        loads = (codec or get_codec()).loads
+        with open_read(input_path) as infile:
+            lines = (line.strip() for line in infile)
+            for line in islice((line for line in lines if line), start_index, None):
+                yield loads(line)
+        return
+
+    start_byte = 0
+    if start_index:
+        start_byte = load_line_index(input_path).byte_offset(start_index)
+    yield from iter_record_range(input_path, start_byte, codec=codec)
+
+
+def ingest_records(input_path: Path, codec: JsonCodec | None = None) -> list[dict[str, object]]:
+    return list(iter_records(input_path, codec))
+
+
+def iter_chunks(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    if size < 1:
+        raise ValueError("chunk size must be at least 1")
+
+    chunk: list[T] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
 
 
 def transform_records(records: list[dict[str, object]]) -> list[dict[str, object]]:
@@ -33,11 +69,16 @@ def transform_records(records: list[dict[str, object]]) -> list[dict[str, object
     return transformed
 
 
-def validate_records(records: list[dict[str, object]]) -> tuple[list[dict[str, object]], list[InvalidRecord]]:
+def validate_records(
+    records: list[dict[str, object]],
+    *,
+    start_index: int = 0,
+) -> tuple[list[dict[str, object]], list[InvalidRecord]]:
     valid: list[dict[str, object]] = []
     invalid: list[InvalidRecord] = []
 
-    for index, record in enumerate(records):
+    # start_index keeps record_index global when validating one chunk of a larger input.
+    for index, record in enumerate(records, start=start_index):
         record_key = str(record.get("record_key", "")).strip()
         full_name = str(record.get("full_name", "")).strip()
         email = str(record.get("email", "")).strip().lower()
@@ -81,16 +122,112 @@ def validate_records(records: list[dict[str, object]]) -> tuple[list[dict[str, o
     return valid, invalid
 
 
-def write_jsonl(path: Path, rows: list[dict[str, object]]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as outfile:
+def transform_validate_records(
+    records: list[dict[str, object]],
+    *,
+    start_index: int = 0,
+) -> tuple[list[dict[str, object]], list[InvalidRecord]]:
+    # Same result as validate_records(transform_records(records)), normalizing each field once.
+    valid: list[dict[str, object]] = []
+    invalid: list[InvalidRecord] = []
+
+    for index, record in enumerate(records, start=start_index):
+        record_key = str(record.get("record_key", "")).strip()
+        full_name = str(record.get("full_name", "")).strip()
+        email = str(record.get("email", "")).strip().lower()
+        age_raw = record.get("age")
+        source = str(record.get("source", "unknown")).strip().lower()
+
+        try:
+            age_value = int(age_raw)
+        except (TypeError, ValueError):
+            reason = "age must be an integer"
+        else:
+            if not record_key:
+                reason = "record_key is required"
+            elif not full_name:
+                reason = "full_name is required"
+            elif "@" not in email or "." not in email:
+                reason = "email format is invalid"
+            elif age_value < 18 or age_value > 120:
+                reason = "age must be between 18 and 120"
+            else:
+                valid.append(
+                    {
+                        "record_key": record_key,
+                        "full_name": full_name,
+                        "email": email,
+                        "age": age_value,
+                        "age_group": "18-34" if age_value <= 34 else "35-54" if age_value <= 54 else "55+",
+                        "source": source,
+                    }
+                )
+                continue
+
+        normalized = {
+            "record_key": record_key,
+            "full_name": full_name,
+            "email": email,
+            "age": age_raw,
+            "source": source,
+        }
+        invalid.append(InvalidRecord(index, normalized, reason))
+
+    return valid, invalid
+
+
+def dead_letter_rows(invalid_records: Iterable[InvalidRecord]) -> list[dict[str, object]]:
+    return [
+        {
+            "record_index": invalid.record_index,
+            "reason": invalid.reason,
+            "record": invalid.record,
+        }
+        for invalid in invalid_records
+    ]
+
+
+class JsonlWriter:
+    def __init__(self, path: Path, codec: JsonCodec | None = None, *, compression_level: int | None = None) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.rows_written = 0
+        self._dumps_line = (codec or get_codec()).dumps_line
+        # Outputs may be hard links into the result cache; unlinking first keeps the cached copy intact.
+        path.unlink(missing_ok=True)
+        # The file suffix (.gz, .zst) picks the compression.
+        self._outfile: BinaryIO = open_write(path, compression_level)
+
+    def write_rows(self, rows: Iterable[dict[str, object]]) -> None:
+        dumps_line = self._dumps_line
+        count = 0
         for row in rows:
-            outfile.write(json.dumps(row, sort_keys=True))
-            outfile.write("\n")
+            self._outfile.write(dumps_line(row))
+            count += 1
+        self.rows_written += count
+
+    def close(self) -> None:
+        self._outfile.close()
+
+    def __enter__(self) -> "JsonlWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def write_jsonl(
+    path: Path,
+    rows: Iterable[dict[str, object]],
+    codec: JsonCodec | None = None,
+    *,
+    compression_level: int | None = None,
+) -> None:
+    with JsonlWriter(path, codec, compression_level=compression_level) as writer:
+        writer.write_rows(rows)
 
 
-def write_json(path: Path, payload: dict[str, object]) -> None:
+def write_json(path: Path, payload: dict[str, object], codec: JsonCodec | None = None) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as outfile:
-        json.dump(payload, outfile, indent=2, sort_keys=True)
-        outfile.write("\n")
+    path.unlink(missing_ok=True)
+    path.write_bytes((codec or get_codec()).dumps_document(payload))
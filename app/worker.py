@@ -0,0 +1,177 @@
+from datetime import date
+import logging
+import os
+import socket
+import threading
+from uuid import uuid4
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import Settings
+from app.pipeline import PipelineRunner
+from app.run_store import (
+    claim_queued_run,
+    finish_queued_run,
+    get_run_by_key,
+    heartbeat_run_lease,
+    mark_run_failed,
+)
+from app.schemas import PipelineResult
+
+
+logger = logging.getLogger(__name__)
+
+
+class RunWorker:
+    # Claims runs from the run_queue table and executes them. Any number of workers (threads in
+    # this process via `concurrency`, or other processes and nodes) can share one queue.
+    def __init__(
+        self,
+        settings: Settings,
+        session_factory: sessionmaker[Session],
+        *,
+        concurrency: int = 1,
+        worker_id: str | None = None,
+    ) -> None:
+        self.settings = settings
+        self.session_factory = session_factory
+        self.concurrency = max(1, concurrency)
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:8]}"
+        self.runner = PipelineRunner(settings, session_factory)
+        self.stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+    def run_forever(self) -> None:
+        logger.info("worker started", extra={"worker_id": self.worker_id, "concurrency": self.concurrency})
+        slots = [
+            threading.Thread(target=self._slot_loop, args=(slot,), name=f"worker-{slot}", daemon=True)
+            for slot in range(self.concurrency)
+        ]
+        for slot in slots:
+            slot.start()
+        try:
+            while any(slot.is_alive() for slot in slots):
+                for slot in slots:
+                    slot.join(timeout=1)
+        except KeyboardInterrupt:
+            self.stop()
+            for slot in slots:
+                slot.join()
+
+    def drain(self) -> list[PipelineResult]:
+        # Processes queued runs until none are claimable, then returns.
+        results: list[PipelineResult] = []
+        lock = threading.Lock()
+
+        def slot_loop(slot: int) -> None:
+            while not self.stop_event.is_set():
+                result = self.process_next(slot)
+                if result is None:
+                    return
+                with lock:
+                    results.append(result)
+
+        slots = [threading.Thread(target=slot_loop, args=(slot,)) for slot in range(self.concurrency)]
+        for slot in slots:
+            slot.start()
+        for slot in slots:
+            slot.join()
+        return sorted(results, key=lambda result: result.run_date)
+
+    def process_next(self, slot: int = 0) -> PipelineResult | None:
+        # Returns the result of the next run this slot completes, or None once nothing is claimable.
+        owner = f"{self.worker_id}/{slot}"
+        while True:
+            with self.session_factory() as db:
+                item = claim_queued_run(db, worker_id=owner, lease_seconds=self.settings.queue_lease_seconds)
+                if item is None:
+                    return None
+                item_id, run_key, run_date = item.id, item.run_key, item.run_date
+                trigger_source, attempts = item.trigger_source, item.attempts
+
+            logger.info("claimed queued run", extra={"run_key": run_key, "worker_id": owner, "attempt": attempts})
+            if attempts > self.settings.queue_max_attempts:
+                with self.session_factory() as db:
+                    error = f"lease expired {attempts - 1} times without the run finishing"
+                    self._fail_abandoned_run(db, run_key, error)
+                    finish_queued_run(db, item_id=item_id, worker_id=owner, status="failed", error=error)
+                continue
+
+            result = self._execute(item_id, owner, run_key, run_date, trigger_source, abandoned=attempts > 1)
+            if result is not None:
+                return result
+
+    def _execute(
+        self,
+        item_id: int,
+        owner: str,
+        run_key: str,
+        run_date: date,
+        trigger_source: str,
+        *,
+        abandoned: bool,
+    ) -> PipelineResult | None:
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat_loop,
+            args=(item_id, owner, stop_heartbeat),
+            name=f"heartbeat-{owner}",
+            daemon=True,
+        )
+        heartbeat.start()
+        try:
+            if abandoned:
+                with self.session_factory() as db:
+                    # The previous owner died mid-run; let the runner retry it like any failed run.
+                    self._fail_abandoned_run(db, run_key, "worker lease expired")
+            result = self.runner.run(run_date=run_date, run_key=run_key, trigger_source=trigger_source)
+        except Exception as exc:
+            logger.exception("queued run crashed", extra={"run_key": run_key})
+            result, status, error = None, "failed", str(exc)
+        else:
+            status, error = ("done" if result.status == "succeeded" else "failed"), None
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+
+        with self.session_factory() as db:
+            finished = finish_queued_run(
+                db,
+                item_id=item_id,
+                worker_id=owner,
+                status=status,
+                run_id=result.run_id if result is not None else None,
+                error=error,
+            )
+        if not finished:
+            logger.warning("queue lease was lost before the run finished", extra={"run_key": run_key})
+        return result
+
+    def _slot_loop(self, slot: int) -> None:
+        while not self.stop_event.is_set():
+            try:
+                result = self.process_next(slot)
+            except Exception:
+                logger.exception("worker slot failed to claim a run", extra={"worker_id": self.worker_id})
+                result = None
+            if result is None:
+                self.stop_event.wait(self.settings.queue_poll_seconds)
+
+    def _heartbeat_loop(self, item_id: int, owner: str, stop: threading.Event) -> None:
+        lease_seconds = self.settings.queue_lease_seconds
+        while not stop.wait(lease_seconds / 3):
+            try:
+                with self.session_factory() as db:
+                    if not heartbeat_run_lease(db, item_id=item_id, worker_id=owner, lease_seconds=lease_seconds):
+                        logger.warning("queue lease lost", extra={"worker_id": owner, "item_id": item_id})
+                        return
+            except Exception:
+                # A missed heartbeat is survivable until the lease actually expires.
+                logger.warning("queue heartbeat failed", exc_info=True, extra={"worker_id": owner})
+
+    def _fail_abandoned_run(self, db: Session, run_key: str, error: str) -> None:
+        run = get_run_by_key(db, run_key)
+        if run is not None and run.status == "running":
+            mark_run_failed(db, run, error=error)
@@ -0,0 +1,162 @@
+import argparse
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import date
+import json
+from pathlib import Path
+import sys
+import tempfile
+import time
+import uuid
+
+from app.database import build_session_factory
+from app.profiling import measure_usage
+from app.run_store import create_or_get_run, store_dead_letters, store_published_records
+from app.schemas import StepUsage
+from app.step_logic import dead_letter_rows, ingest_records, transform_records, validate_records, write_jsonl
+from benchmarks.synthetic import SyntheticSpec, write_synthetic_file
+
+
+@dataclass(frozen=True)
+class StageResult:
+    stage: str
+    records: int
+    seconds: float
+    records_per_sec: float
+    peak_rss_delta_kb: int | None
+
+
+def run_benchmark(spec: SyntheticSpec, workdir: Path, *, db_batch_size: int = 5_000) -> list[StageResult]:
+    input_path = write_synthetic_file(workdir / "records-bench.jsonl", spec)
+    results: list[StageResult] = []
+
+    def timed(stage: str, records: int, fn: Callable[[], object]) -> object:
+        usage = StepUsage()
+        started = time.perf_counter()
+        with measure_usage(usage):
+            result = fn()
+        seconds = time.perf_counter() - started
+        results.append(
+            StageResult(
+                stage=stage,
+                records=records,
+                seconds=seconds,
+                records_per_sec=records / seconds if seconds > 0 else float("inf"),
+                peak_rss_delta_kb=usage.peak_rss_delta_kb,
+            )
+        )
+        return result
+
+    ingested = timed("ingest", spec.records, lambda: ingest_records(input_path))
+    transformed = timed("transform", len(ingested), lambda: transform_records(ingested))
+    valid, invalid = timed("validate", len(transformed), lambda: validate_records(transformed))
+
+    def publish() -> None:
+        write_jsonl(workdir / "published.jsonl", valid)
+        write_jsonl(workdir / "dead-letter.jsonl", dead_letter_rows(invalid))
+
+    timed("publish", len(valid) + len(invalid), publish)
+
+    # A fresh database per invocation: reusing one (and its run_key) with the same --workdir would
+    # time ON CONFLICT skips instead of inserts. The name is unique because engines are cached by URL.
+    for stale in workdir.glob("bench-*.db"):
+        stale.unlink()
+    session_factory = build_session_factory(f"sqlite:///{workdir / f'bench-{uuid.uuid4().hex}.db'}")
+    with session_factory() as db:
+        run, _ = create_or_get_run(db, run_key="bench", run_date=date.today(), trigger_source="manual")
+        timed(
+            "store_published_records",
+            len(valid),
+            lambda: store_published_records(db, run_id=run.id, records=valid, batch_size=db_batch_size),
+        )
+        timed(
+            "store_dead_letters",
+            len(invalid),
+            lambda: store_dead_letters(db, run_id=run.id, invalid_records=invalid, batch_size=db_batch_size),
+        )
+    session_factory.kw["bind"].dispose()
+    return results
+
+
+def find_regressions(
+    results: list[StageResult],
+    baseline: dict[str, dict[str, float]],
+    *,
+    max_regression_pct: float,
+) -> list[str]:
+    regressions: list[str] = []
+    for result in results:
+        expected = baseline.get(result.stage)
+        if expected is None:
+            continue
+        floor = expected["records_per_sec"] * (1 - max_regression_pct / 100)
+        if result.records_per_sec < floor:
+            drop = 100 * (1 - result.records_per_sec / expected["records_per_sec"])
+            regressions.append(
+                f"{result.stage}: {result.records_per_sec:,.0f} rec/s is {drop:.1f}% below baseline "
+                f"{expected['records_per_sec']:,.0f} rec/s"
+            )
+    return regressions
+
+
+def format_table(results: list[StageResult]) -> str:
+    lines = [f"{'stage':<26}{'records':>12}{'seconds':>10}{'rec/s':>14}{'peak rss +KiB':>16}"]
+    for result in results:
+        rss = "-" if result.peak_rss_delta_kb is None else str(result.peak_rss_delta_kb)
+        lines.append(
+            f"{result.stage:<26}{result.records:>12}{result.seconds:>10.3f}{result.records_per_sec:>14,.0f}{rss:>16}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark pipeline stages on synthetic input")
+    parser.add_argument("--records", type=int, default=100_000, help="synthetic records to generate (10k-10M)")
+    parser.add_argument("--invalid-rate", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db-batch-size", type=int, default=5_000)
+    parser.add_argument("--workdir", type=Path, help="keep generated files here instead of a temp dir")
+    parser.add_argument("--baseline", type=Path, help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", type=Path, help="write this run's results as a baseline")
+    parser.add_argument(
+        "--max-regression-pct",
+        type=float,
+        default=10.0,
+        help="fail when a stage is this much slower than the baseline",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    spec = SyntheticSpec(records=args.records, invalid_rate=args.invalid_rate, seed=args.seed)
+
+    if args.workdir:
+        args.workdir.mkdir(parents=True, exist_ok=True)
+        results = run_benchmark(spec, args.workdir, db_batch_size=args.db_batch_size)
+    else:
+        with tempfile.TemporaryDirectory(prefix="flowledger-bench-") as tmp:
+            results = run_benchmark(spec, Path(tmp), db_batch_size=args.db_batch_size)
+
+    print(format_table(results))
+
+    if args.save_baseline:
+        args.save_baseline.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "spec": {"records": spec.records, "invalid_rate": spec.invalid_rate, "seed": spec.seed},
+            "stages": {result.stage: asdict(result) for result in results},
+        }
+        args.save_baseline.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = find_regressions(results, baseline["stages"], max_regression_pct=args.max_regression_pct)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+import subprocess
+import sys
+
+
+ROOT = Path(__file__).resolve().parents[1]
+STARTUP_BUDGET_MS = 150.0
+COMMANDS = {
+    "version": ["-m", "app.main", "--version"],
+    "import": ["-c", "import app.main"],
+}
+# Only the subcommands that need them may pay for these.
+HEAVY_MODULES = ("sqlalchemy", "apscheduler", "dotenv", "app.pipeline")
+
+
+@dataclass(frozen=True)
+class ImportProfile:
+    command: str
+    total_ms: float
+    cumulative_ms: dict[str, float]
+
+    def heavy_modules(self) -> list[str]:
+        return [name for name in HEAVY_MODULES if name in self.cumulative_ms]
+
+    def slowest(self, count: int) -> list[tuple[str, float]]:
+        return sorted(self.cumulative_ms.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+def parse_importtime(command: str, stderr: str) -> ImportProfile:
+    total_us = 0
+    cumulative: dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|", 2)
+        total_us += int(self_us)
+        cumulative[name.strip()] = int(cumulative_us) / 1000
+    return ImportProfile(command=command, total_ms=total_us / 1000, cumulative_ms=cumulative)
+
+
+def profile_startup(command: str, *, repeat: int = 3) -> ImportProfile:
+    # Best of `repeat`: the first run may still be compiling .pyc files.
+    profiles = []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", *COMMANDS[command]],
+            cwd=ROOT,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        profiles.append(parse_importtime(command, proc.stderr))
+    return min(profiles, key=lambda profile: profile.total_ms)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure CLI import time with python -X importtime")
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS, help="Fail above this import time")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list per command")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per command; the fastest is reported")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    failures = []
+    for command in COMMANDS:
+        profile = profile_startup(command, repeat=args.repeat)
+        print(f"{command}: {profile.total_ms:.1f} ms ({len(profile.cumulative_ms)} modules)")
+        for name, cumulative_ms in profile.slowest(args.top):
+            print(f"  {cumulative_ms:8.1f} ms  {name}")
+        if profile.total_ms > args.budget_ms:
+            failures.append(f"{command}: {profile.total_ms:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+        for name in profile.heavy_modules():
+            failures.append(f"{command}: imports {name}")
+    for failure in failures:
+        print(f"OVER BUDGET {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+import argparse
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+import json
+from pathlib import Path
+import random
+
+
+FIRST_NAMES = ("Ada", "Grace", "Alan", "Edsger", "Barbara", "Donald", "Margaret", "Ken", "Frances", "Dennis")
+LAST_NAMES = ("Lovelace", "Hopper", "Turing", "Dijkstra", "Liskov", "Knuth", "Hamilton", "Thompson", "Allen", "Ritchie")
+DOMAINS = ("example.com", "example.org", "mail.test", "corp.example")
+
+# Each invalid record breaks exactly one rule, in the order validate_records checks them.
+INVALID_KINDS = ("age_not_integer", "missing_record_key", "missing_full_name", "bad_email", "age_out_of_range")
+
+
+@dataclass(frozen=True)
+class SyntheticSpec:
+    records: int
+    invalid_rate: float = 0.1
+    seed: int = 42
+    source_weights: dict[str, float] = field(default_factory=lambda: {"web": 0.6, "partner": 0.3, "import": 0.1})
+    age_range: tuple[int, int] = (18, 95)
+    age_as_string_rate: float = 0.2
+    noisy_whitespace_rate: float = 0.3
+
+
+def generate_records(spec: SyntheticSpec) -> Iterator[dict[str, object]]:
+    rng = random.Random(spec.seed)
+    sources = list(spec.source_weights)
+    weights = list(spec.source_weights.values())
+
+    for index in range(spec.records):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        age: object = rng.randint(*spec.age_range)
+        if rng.random() < spec.age_as_string_rate:
+            age = str(age)
+        record: dict[str, object] = {
+            "record_key": f"u-{index:09d}",
+            "full_name": f"{first} {last}",
+            "email": f"{first}.{last}{index}@{rng.choice(DOMAINS)}".lower(),
+            "age": age,
+            "source": rng.choices(sources, weights)[0],
+        }
+        if rng.random() < spec.noisy_whitespace_rate:
+            record["email"] = f"  {str(record['email']).upper()} "
+            record["source"] = f" {str(record['source']).upper()}"
+        if rng.random() < spec.invalid_rate:
+            _break_record(record, rng.choice(INVALID_KINDS), rng)
+        yield record
+
+
+def write_synthetic_file(path: Path, spec: SyntheticSpec) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    encoder = json.JSONEncoder()
+    with path.open("w", encoding="utf-8") as outfile:
+        for record in generate_records(spec):
+            outfile.write(encoder.encode(record))
+            outfile.write("\n")
+    return path
+
+
+def _break_record(record: dict[str, object], kind: str, rng: random.Random) -> None:
+    if kind == "age_not_integer":
+        record["age"] = rng.choice(["unknown", None, "4x"])
+    elif kind == "missing_record_key":
+        record["record_key"] = "  "
+    elif kind == "missing_full_name":
+        record["full_name"] = ""
+    elif kind == "bad_email":
+        record["email"] = "not-an-email"
+    else:
+        record["age"] = rng.choice([rng.randint(0, 17), rng.randint(121, 150)])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic records JSONL file")
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--records", type=int, default=10_000)
+    parser.add_argument("--invalid-rate", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    spec = SyntheticSpec(records=args.records, invalid_rate=args.invalid_rate, seed=args.seed)
+    write_synthetic_file(args.output, spec)
+
+
+if __name__ == "__main__":
+    main()
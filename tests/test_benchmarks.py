@@ -0,0 +1,111 @@
+from pathlib import Path
+import subprocess
+import sys
+
+from sqlalchemy import func, select
+
+from app import __version__
+from app.database import build_session_factory
+from app.db_models import DeadLetterRecord, PublishedRecord
+from app.step_logic import transform_records, validate_records
+from benchmarks.run_benchmarks import StageResult, find_regressions, main, run_benchmark
+from benchmarks.startup import parse_importtime, profile_startup
+from benchmarks.synthetic import SyntheticSpec, generate_records
+
+
+def test_synthetic_generator_is_deterministic_and_honours_invalid_rate() -> None:
+    spec = SyntheticSpec(records=2_000, invalid_rate=0.25, seed=7)
+
+    first = list(generate_records(spec))
+    assert first == list(generate_records(spec))
+    assert first != list(generate_records(SyntheticSpec(records=2_000, invalid_rate=0.25, seed=8)))
+
+    _, invalid = validate_records(transform_records(first))
+    assert 0.2 < len(invalid) / len(first) < 0.3
+
+
+def test_find_regressions_uses_percentage_threshold() -> None:
+    results = [
+        StageResult("ingest", 1_000, 1.0, 850.0, None),
+        StageResult("transform", 1_000, 1.0, 950.0, None),
+    ]
+    baseline = {"ingest": {"records_per_sec": 1_000.0}, "transform": {"records_per_sec": 1_000.0}}
+
+    regressions = find_regressions(results, baseline, max_regression_pct=10)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith("ingest:")
+
+
+def test_benchmark_cli_saves_baseline_and_compares(tmp_path: Path, capsys) -> None:
+    baseline = tmp_path / "baseline.json"
+
+    assert main(["--records", "200", "--workdir", str(tmp_path / "work"), "--save-baseline", str(baseline)]) == 0
+    output = capsys.readouterr().out
+    for stage in ("ingest", "transform", "validate", "publish", "store_published_records", "store_dead_letters"):
+        assert stage in output
+
+    assert main(["--records", "200", "--baseline", str(baseline), "--max-regression-pct", "100"]) == 0
+
+
+def test_benchmark_reruns_in_the_same_workdir_insert_again(tmp_path: Path) -> None:
+    spec = SyntheticSpec(records=300, invalid_rate=0.2, seed=3)
+
+    first = run_benchmark(spec, tmp_path)
+    second = run_benchmark(spec, tmp_path)
+
+    databases = list(tmp_path.glob("bench-*.db"))
+    assert len(databases) == 1
+    session_factory = build_session_factory(f"sqlite:///{databases[0]}")
+    with session_factory() as db:
+        published = db.execute(select(func.count()).select_from(PublishedRecord)).scalar_one()
+        dead_letters = db.execute(select(func.count()).select_from(DeadLetterRecord)).scalar_one()
+    stored = {result.stage: result.records for result in second}
+    assert (published, dead_letters) == (stored["store_published_records"], stored["store_dead_letters"])
+    assert [result.records for result in first] == [result.records for result in second]
+
+
+def test_parse_importtime_sums_self_time() -> None:
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       200 |        200 |   re\n"
+        "import time:      1000 |       1200 | app.main\n"
+    )
+
+    profile = parse_importtime("import", stderr)
+
+    assert profile.total_ms == 1.2
+    assert profile.slowest(1) == [("app.main", 1.2)]
+    assert profile.heavy_modules() == []
+
+
+def test_cli_startup_skips_heavy_modules() -> None:
+    # Deterministic half of the startup benchmark; the time budget is enforced by benchmarks/startup.py.
+    for command in ("version", "import"):
+        assert profile_startup(command, repeat=1).heavy_modules() == [], command
+
+
+def test_version_flag_and_command_paths_skip_unneeded_imports() -> None:
+    cwd = Path(__file__).resolve().parents[1]
+    version = subprocess.run(
+        [sys.executable, "-m", "app.main", "--version"], cwd=cwd, check=False, capture_output=True, text=True
+    )
+    assert (version.returncode, version.stdout.strip()) == (0, f"flowledger {__version__}")
+
+    probe = subprocess.run(
+        [sys.executable, "-c", "import sys, app.main, app.pipeline, app.worker; print('apscheduler' in sys.modules)"],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    assert probe.stdout.strip() == "False"
+
+    dry_run = subprocess.run(
+        [sys.executable, "-c", "import sys, app.dry_run; print('sqlalchemy' in sys.modules)"],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    assert dry_run.stdout.strip() == "False"
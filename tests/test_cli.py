@@ -1,4 +1,5 @@
 from datetime import date
+import gzip
 import json
 import os
 from pathlib import Path
@@ -44,6 +45,7 @@ def test_cli_returns_zero_on_success(tmp_path: Path) -> None:
         outfile.write("\n")
 
     env = _base_env(tmp_path)
+    env["METRICS_TEXTFILE"] = str(tmp_path / "textfile" / "flowledger.prom")
     proc = subprocess.run(
         [
             sys.executable,
@@ -66,3 +68,138 @@ def test_cli_returns_zero_on_success(tmp_path: Path) -> None:
 
     assert proc.returncode == 0
     assert "status=succeeded" in proc.stdout
+    metrics = (tmp_path / "textfile" / "flowledger.prom").read_text(encoding="utf-8")
+    assert 'flowledger_runs_total{status="succeeded"} 1' in metrics
+
+
+def test_cli_backfill_runs_date_range_and_reuses_succeeded_runs(tmp_path: Path) -> None:
+    input_dir = tmp_path / "data" / "input"
+    input_dir.mkdir(parents=True, exist_ok=True)
+    for day in ("2026-03-01", "2026-03-02", "2026-03-03"):
+        with (input_dir / f"records-{day}.jsonl").open("w", encoding="utf-8") as outfile:
+            outfile.write(json.dumps({"record_key": day, "full_name": "Ada", "email": "ada@example.com", "age": 31}))
+            outfile.write("\n")
+
+    command = [
+        sys.executable,
+        "-m",
+        "app.main",
+        "backfill",
+        "--from",
+        "2026-03-01",
+        "--to",
+        "2026-03-03",
+        "--workers",
+        "2",
+    ]
+    env = _base_env(tmp_path)
+    cwd = Path(__file__).resolve().parents[1]
+
+    first = subprocess.run(command, cwd=cwd, env=env, check=False, capture_output=True, text=True)
+    assert first.returncode == 0, first.stderr
+    assert "[3/3]" in first.stdout
+    assert "runs=3 succeeded=3 failed=0 reused=0" in first.stdout
+
+    second = subprocess.run(command, cwd=cwd, env=env, check=False, capture_output=True, text=True)
+    assert second.returncode == 0, second.stderr
+    assert "runs=3 succeeded=3 failed=0 reused=3" in second.stdout
+
+
+def test_cli_enqueue_and_worker_drain(tmp_path: Path) -> None:
+    input_dir = tmp_path / "data" / "input"
+    input_dir.mkdir(parents=True, exist_ok=True)
+    with (input_dir / "records-2026-03-05.jsonl").open("w", encoding="utf-8") as outfile:
+        outfile.write(json.dumps({"record_key": "1", "full_name": "Ada", "email": "ada@example.com", "age": 31}))
+        outfile.write("\n")
+
+    env = _base_env(tmp_path)
+    cwd = Path(__file__).resolve().parents[1]
+    enqueue = [sys.executable, "-m", "app.main", "enqueue", "--run-date", "2026-03-05", "--run-key", "queued-03-05"]
+
+    first = subprocess.run(enqueue, cwd=cwd, env=env, check=False, capture_output=True, text=True)
+    second = subprocess.run(enqueue, cwd=cwd, env=env, check=False, capture_output=True, text=True)
+    assert "queued=True run_key=queued-03-05 status=queued" in first.stdout, first.stderr
+    assert "queued=False" in second.stdout
+
+    worker = subprocess.run(
+        [sys.executable, "-m", "app.main", "worker", "--concurrency", "2", "--drain"],
+        cwd=cwd,
+        env=env,
+        check=False,
+        capture_output=True,
+        text=True,
+    )
+    assert worker.returncode == 0, worker.stderr
+    assert "runs=1 succeeded=1 failed=0 reused=0" in worker.stdout
+
+
+def test_cli_dry_run_validates_without_a_database(tmp_path: Path) -> None:
+    input_dir = tmp_path / "data" / "input"
+    input_dir.mkdir(parents=True, exist_ok=True)
+    with (input_dir / "records-2026-03-06.jsonl").open("w", encoding="utf-8") as outfile:
+        outfile.write(json.dumps({"record_key": "1", "full_name": "Ada", "email": "ada@example.com", "age": 31}) + "\n")
+        outfile.write(json.dumps({"record_key": "2", "full_name": "Bob", "email": "bad", "age": 31}) + "\n")
+
+    env = _base_env(tmp_path)
+    cwd = Path(__file__).resolve().parents[1]
+    dry_run = subprocess.run(
+        [sys.executable, "-m", "app.main", "run", "--run-date", "2026-03-06", "--dry-run"],
+        cwd=cwd,
+        env=env,
+        check=False,
+        capture_output=True,
+        text=True,
+    )
+    assert dry_run.returncode == 0, dry_run.stderr
+    assert "total=2 valid=1 invalid=1" in dry_run.stdout
+
+    dead_letter = tmp_path / "dead.jsonl"
+    validate = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "app.main",
+            "validate-file",
+            str(input_dir / "records-2026-03-06.jsonl"),
+            "--dead-letter",
+            str(dead_letter),
+        ],
+        cwd=cwd,
+        env=env,
+        check=False,
+        capture_output=True,
+        text=True,
+    )
+    assert validate.returncode == 0, validate.stderr
+    assert "email format is invalid" in validate.stdout
+    assert json.loads(dead_letter.read_text(encoding="utf-8"))["record_index"] == 1
+    assert not (tmp_path / "cli.db").exists()
+    assert not (tmp_path / "outputs").exists()
+
+
+def test_cli_validate_file_reports_bad_input_in_one_line(tmp_path: Path) -> None:
+    malformed = tmp_path / "malformed.jsonl"
+    malformed.write_text('{"record_key": "1"}\n{not json\n', encoding="utf-8")
+    bad_utf8 = tmp_path / "bad-utf8.jsonl"
+    bad_utf8.write_bytes(b'{"record_key": "\xff"}\n')
+    not_object = tmp_path / "not-object.jsonl"
+    not_object.write_text('{"record_key": "1"}\n[1, 2]\n', encoding="utf-8")
+    truncated = tmp_path / "truncated.jsonl.gz"
+    truncated.write_bytes(gzip.compress(b'{"record_key": "1"}\n' * 100)[:-12])
+    # Fails either way: zstandard missing, or the frame is garbage.
+    corrupt_zstd = tmp_path / "corrupt.jsonl.zst"
+    corrupt_zstd.write_bytes(b"not a zstd frame\n")
+    cwd = Path(__file__).resolve().parents[1]
+
+    for path in (tmp_path / "missing.jsonl", malformed, bad_utf8, not_object, truncated, corrupt_zstd):
+        proc = subprocess.run(
+            [sys.executable, "-m", "app.main", "validate-file", str(path)],
+            cwd=cwd,
+            env=_base_env(tmp_path),
+            check=False,
+            capture_output=True,
+            text=True,
+        )
+        assert proc.returncode == 1, path
+        assert proc.stderr.startswith(f"dry run failed: {path}"), proc.stderr
+        assert len(proc.stderr.splitlines()) == 1, proc.stderr
@@ -0,0 +1,32 @@
+import json
+
+import pytest
+
+from app.codec import StdlibCodec, get_codec
+
+
+ROWS = [
+    {"record_key": "u-1", "full_name": "Zoë Ångström", "age": 33, "tags": ["a", "b"], "nested": {"z": 1, "a": None}},
+    {"b": 1.5, "a": True},
+]
+
+
+@pytest.mark.parametrize("name", ["json", "orjson"])
+def test_codec_output_matches_legacy_json_dumps(name: str) -> None:
+    if name == "orjson":
+        pytest.importorskip("orjson")
+    codec = get_codec(name)
+
+    for row in ROWS:
+        assert codec.dumps_line(row) == (json.dumps(row, sort_keys=True) + "\n").encode("utf-8")
+        assert codec.loads(codec.dumps_line(row).strip()) == row
+
+    payload = {"run_key": "k", "total_records": 2}
+    assert codec.dumps_document(payload) == (json.dumps(payload, indent=2, sort_keys=True) + "\n").encode("utf-8")
+
+
+def test_codec_decode_errors_are_json_decode_errors() -> None:
+    with pytest.raises(json.JSONDecodeError):
+        get_codec().loads(b"{not json")
+    with pytest.raises(json.JSONDecodeError):
+        StdlibCodec().loads(b"{not json")
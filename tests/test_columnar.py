@@ -0,0 +1,53 @@
+import pytest
+
+from app.parallel import ChunkExecutor
+from app.step_logic import transform_records, transform_validate_records, validate_records
+from benchmarks.synthetic import SyntheticSpec, generate_records
+
+
+np = pytest.importorskip("numpy")
+
+from app.columnar import transform_validate_records_columnar, validate_records_columnar  # noqa: E402
+
+
+EDGE_AGES = [
+    30, "30", " 41 ", "+25", "-3", "2_5", "٣٠", "²", "3.5", 3.9, True, None, "", "abc", "30\x00",
+    10**30, -(10**30), "1" * 25, 17, 121, 18, 120, "0018", 34, 35, 54, 55,
+]
+
+
+def edge_records() -> list[dict[str, object]]:
+    records = [
+        {"record_key": f"k{index}", "full_name": "Ada", "email": "ada@example.com", "age": age, "source": "web"}
+        for index, age in enumerate(EDGE_AGES)
+    ]
+    records += [
+        {"record_key": " ", "full_name": "", "email": "bad", "age": "x"},
+        {"record_key": "\x00", "full_name": "Ada", "email": " ADA@EXAMPLE.COM ", "age": 40},
+        {"record_key": "k", "full_name": "", "email": "nodot@example", "age": 40},
+        {"record_key": "k", "full_name": "Ada", "email": "no-at.example.com", "age": 10},
+        {},
+    ]
+    return records
+
+
+def test_columnar_validation_matches_scalar_on_edge_cases() -> None:
+    records = edge_records()
+
+    assert validate_records_columnar(records, start_index=7) == validate_records(records, start_index=7)
+    assert transform_validate_records_columnar(records) == transform_validate_records(records)
+
+
+def test_columnar_validation_matches_scalar_on_synthetic_input() -> None:
+    records = transform_records(list(generate_records(SyntheticSpec(records=5_000, invalid_rate=0.3))))
+
+    columnar = validate_records_columnar(records)
+
+    assert columnar == validate_records(records)
+    assert all(type(row["age"]) is int and type(row["age_group"]) is str for row in columnar[0])
+
+
+def test_chunk_executor_uses_numpy_engine_in_workers() -> None:
+    records = edge_records() * 3
+    with ChunkExecutor(2, 10, validation_engine="numpy") as executor:
+        assert executor.validate(records, start_index=4) == validate_records(records, start_index=4)
@@ -0,0 +1,42 @@
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+
+from app.compression import find_input
+from app.step_logic import iter_records, write_jsonl
+
+
+ROWS = [{"record_key": str(index), "age": index} for index in range(5)]
+
+
+def test_gzip_input_streams_like_plain_jsonl(tmp_path: Path) -> None:
+    lines = "".join(json.dumps(row) + "\n\n" for row in ROWS).encode("utf-8")
+    plain = tmp_path / "records-plain.jsonl"
+    plain.write_bytes(lines)
+    compressed = tmp_path / "records-2026-03-04.jsonl.gz"
+    compressed.write_bytes(gzip.compress(lines))
+
+    assert list(iter_records(compressed)) == list(iter_records(plain)) == ROWS
+    assert list(iter_records(compressed, start_index=3)) == ROWS[3:]
+    assert find_input(tmp_path / "records-2026-03-04.jsonl") == compressed
+
+
+def test_write_jsonl_compresses_by_suffix(tmp_path: Path) -> None:
+    plain = tmp_path / "out.jsonl"
+    compressed = tmp_path / "out.jsonl.gz"
+    write_jsonl(plain, ROWS)
+    write_jsonl(compressed, ROWS, compression_level=1)
+
+    assert gzip.decompress(compressed.read_bytes()) == plain.read_bytes()
+    assert list(iter_records(compressed)) == ROWS
+
+
+def test_zstd_round_trip(tmp_path: Path) -> None:
+    pytest.importorskip("zstandard")
+    path = tmp_path / "out.jsonl.zst"
+
+    write_jsonl(path, ROWS)
+
+    assert list(iter_records(path)) == ROWS
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+from app.chunks import ChunkTracker
+from app.dag import DagStep, StepCancelledError, check_dag, run_dag
+
+
+def test_independent_steps_run_concurrently_and_dependents_wait() -> None:
+    barrier = threading.Barrier(2, timeout=5)
+    order = []
+
+    def branch(name: str):
+        def fn():
+            barrier.wait()
+            order.append(name)
+            return name
+
+        return fn
+
+    results = run_dag(
+        [
+            DagStep("a", branch("a")),
+            DagStep("b", branch("b")),
+            DagStep("join", lambda: order.append("join") or "done", depends_on=("a", "b")),
+        ],
+        max_workers=2,
+    )
+
+    assert results == {"a": "a", "b": "b", "join": "done"}
+    assert order[-1] == "join"
+
+
+def test_failure_cancels_siblings_and_skips_dependents() -> None:
+    cancelled = threading.Event()
+    started = threading.Event()
+    ran = []
+
+    def slow():
+        started.wait(5)
+        # Cooperative cancellation: siblings check the event between units of work.
+        assert cancelled.wait(5)
+        ran.append("slow")
+
+    def fail():
+        started.set()
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        run_dag(
+            [
+                DagStep("slow", slow),
+                DagStep("fail", fail),
+                DagStep("after", lambda: ran.append("after"), depends_on=("slow",)),
+            ],
+            max_workers=2,
+            cancelled=cancelled,
+        )
+
+    assert cancelled.is_set()
+    assert ran == ["slow"]
+
+
+def test_steps_not_yet_started_are_not_run_after_a_failure() -> None:
+    ran = []
+
+    def fail():
+        time.sleep(0.01)
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        run_dag(
+            [DagStep("fail", fail), DagStep("queued", lambda: ran.append("queued"), depends_on=("fail",))],
+            max_workers=1,
+        )
+
+    assert ran == []
+
+
+@pytest.mark.parametrize(
+    ("steps", "message"),
+    [
+        ([DagStep("a", print), DagStep("a", print)], "duplicate"),
+        ([DagStep("a", print, depends_on=("missing",))], "unknown"),
+        ([DagStep("a", print, depends_on=("b",)), DagStep("b", print, depends_on=("a",))], "cycle"),
+    ],
+)
+def test_invalid_graphs_are_rejected(steps: list[DagStep], message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        check_dag(steps)
+
+
+def test_chunk_tracker_stops_between_chunks_once_cancelled() -> None:
+    cancelled = threading.Event()
+    ran = []
+    tracker = ChunkTracker([lambda: ran.append(0), lambda: (ran.append(1), cancelled.set()), lambda: ran.append(2)])
+
+    with pytest.raises(StepCancelledError, match="after 2 of 3 chunks"):
+        tracker.run(cancelled=cancelled)
+
+    assert ran == [0, 1]
+    assert tracker.completed == {0, 1}
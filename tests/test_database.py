@@ -0,0 +1,83 @@
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import create_engine, inspect, select, text
+from sqlalchemy.orm import Session
+
+from app.database import _store_schema_version, build_session_factory, get_engine
+from app.db_models import SCHEMA_VERSION, Base, SchemaVersion
+from app.run_store import create_or_get_run, create_step_attempt, record_step_chunks
+
+
+def test_engine_is_reused_and_schema_created_once(tmp_path: Path, monkeypatch) -> None:
+    database_url = f"sqlite:///{tmp_path / 'schema.db'}"
+    calls = []
+    original_create_all = Base.metadata.create_all
+    monkeypatch.setattr(Base.metadata, "create_all", lambda bind: calls.append(bind) or original_create_all(bind))
+
+    first = build_session_factory(database_url, pool_size=3, max_overflow=1)
+    second = build_session_factory(database_url, pool_size=3, max_overflow=1)
+
+    assert first.kw["bind"] is second.kw["bind"] is get_engine(database_url, pool_size=3, max_overflow=1)
+    assert len(calls) == 1
+    with first() as db:
+        assert db.execute(select(SchemaVersion.version)).scalar_one() == SCHEMA_VERSION
+
+
+def test_current_schema_version_skips_create_all_for_new_engine(tmp_path: Path, monkeypatch) -> None:
+    database_url = f"sqlite:///{tmp_path / 'current.db'}"
+    build_session_factory(database_url)
+
+    calls = []
+    monkeypatch.setattr(Base.metadata, "create_all", lambda bind: calls.append(bind))
+    # Different pool options give a separate engine that must still see the stored version.
+    build_session_factory(database_url, pool_pre_ping=True)
+
+    assert calls == []
+
+
+def test_older_database_gets_added_columns(tmp_path: Path) -> None:
+    database_url = f"sqlite:///{tmp_path / 'old.db'}"
+    legacy = create_engine(database_url)
+    Base.metadata.create_all(legacy)
+    with legacy.begin() as connection:
+        # Rebuild step_runs as it was before the resource-usage and chunk columns, with no stored version.
+        connection.execute(text("DROP TABLE step_runs"))
+        connection.execute(
+            text(
+                "CREATE TABLE step_runs (id INTEGER PRIMARY KEY, run_id INTEGER, step_name VARCHAR(64), "
+                "attempt INTEGER, status VARCHAR(32), started_at DATETIME, completed_at DATETIME, "
+                "duration_ms FLOAT, error TEXT)"
+            )
+        )
+        connection.execute(text("DROP TABLE schema_version"))
+    legacy.dispose()
+
+    session_factory = build_session_factory(database_url)
+
+    columns = {column["name"] for column in inspect(session_factory.kw["bind"]).get_columns("step_runs")}
+    assert {"cpu_time_ms", "records_processed", "chunks_total", "chunks_skipped"} <= columns
+    with session_factory() as db:
+        assert db.execute(select(SchemaVersion.version)).scalar_one() == SCHEMA_VERSION
+        run, _ = create_or_get_run(db, run_key="old-db", run_date=date(2026, 3, 1), trigger_source="manual")
+        step = create_step_attempt(db, run_id=run.id, step_name="ingest", attempt=1)
+        record_step_chunks(db, step, total=2, completed=1, skipped=1)
+
+
+def test_schema_version_insert_tolerates_a_concurrent_initializer(tmp_path: Path, monkeypatch) -> None:
+    database_url = f"sqlite:///{tmp_path / 'race.db'}"
+    session_factory = build_session_factory(database_url)
+    original_get = Session.get
+    lookups = []
+
+    def racing_get(self, entity, ident, **kwargs):
+        lookups.append(ident)
+        # The first lookup runs before the other process's insert became visible.
+        return None if len(lookups) == 1 else original_get(self, entity, ident, **kwargs)
+
+    monkeypatch.setattr(Session, "get", racing_get)
+    _store_schema_version(session_factory.kw["bind"])
+
+    assert len(lookups) == 2
+    with session_factory() as db:
+        assert db.execute(select(SchemaVersion.version)).scalars().all() == [SCHEMA_VERSION]
@@ -0,0 +1,43 @@
+from dataclasses import replace
+import gzip
+import json
+from pathlib import Path
+
+from app.config import get_settings
+from app.dry_run import format_dry_run, validate_file
+
+
+ROWS = [
+    {"record_key": "1", "full_name": "Grace", "email": "grace@example.com", "age": 36},
+    {"record_key": "2", "full_name": "Alan", "email": "bad-email", "age": 41},
+    {"record_key": "3", "full_name": "Ada", "email": "also-bad", "age": 30},
+    {"record_key": "4", "full_name": "Kid", "email": "kid@example.com", "age": 12},
+    {"record_key": "5", "full_name": "", "email": "anon@example.com", "age": "x"},
+]
+
+
+def test_validate_file_summarizes_reasons_and_writes_dead_letters(tmp_path: Path) -> None:
+    input_path = tmp_path / "partner.jsonl.gz"
+    with gzip.open(input_path, "wt", encoding="utf-8") as outfile:
+        outfile.writelines(json.dumps(row) + "\n" for row in ROWS)
+    settings = replace(get_settings(), chunk_size=2, database_url="postgresql://unreachable/none")
+
+    result = validate_file(settings, input_path, dead_letter_path=tmp_path / "out" / "dead.jsonl")
+
+    assert (result.total_records, result.valid_records, result.invalid_records) == (5, 1, 4)
+    assert result.reasons == {
+        "email format is invalid": 2,
+        "age must be between 18 and 120": 1,
+        "age must be an integer": 1,
+    }
+    dead = [json.loads(line) for line in (tmp_path / "out" / "dead.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert [(row["record_index"], row["reason"]) for row in dead] == [
+        (1, "email format is invalid"),
+        (2, "email format is invalid"),
+        (3, "age must be between 18 and 120"),
+        (4, "age must be an integer"),
+    ]
+
+    summary = format_dry_run(result)
+    assert "total=5 valid=1 invalid=4" in summary
+    assert "email format is invalid" in summary and "40.00%" in summary
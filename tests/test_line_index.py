@@ -0,0 +1,53 @@
+import json
+import os
+from pathlib import Path
+
+from app.line_index import index_path_for, iter_record_range, load_line_index
+from app.step_logic import iter_records
+
+
+def write_lines(path: Path, lines: list[str]) -> None:
+    path.write_text("".join(f"{line}\n" for line in lines), encoding="utf-8")
+
+
+def test_line_index_skips_blank_lines_and_splits_on_record_boundaries(tmp_path: Path) -> None:
+    input_path = tmp_path / "records-2026-03-03.jsonl"
+    write_lines(input_path, [json.dumps({"record_key": str(index)}) if index % 3 else "" for index in range(1, 11)])
+
+    index = load_line_index(input_path)
+    ranges = index.split(3)
+
+    keys = [
+        record["record_key"]
+        for item in ranges
+        for record in iter_record_range(input_path, item.start_byte, item.end_byte)
+    ]
+    assert len(index) == 7
+    assert [item.start_index for item in ranges] == [0, 3, 6]
+    assert keys == ["1", "2", "4", "5", "7", "8", "10"]
+    assert [record["record_key"] for record in iter_records(input_path, start_index=5)] == ["8", "10"]
+
+
+def test_cached_line_index_is_reused_until_input_changes(tmp_path: Path) -> None:
+    input_path = tmp_path / "records-2026-03-04.jsonl"
+    write_lines(input_path, ['{"record_key": "a"}', '{"record_key": "b"}'])
+
+    first = load_line_index(input_path, cache=True)
+    assert index_path_for(input_path).exists()
+    assert list(load_line_index(input_path, cache=True).offsets) == list(first.offsets)
+
+    write_lines(input_path, ['{"record_key": "a"}', '{"record_key": "b"}', '{"record_key": "c"}'])
+    stat = input_path.stat()
+    os.utime(input_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert len(load_line_index(input_path, cache=True)) == 3
+
+
+def test_unwritable_index_cache_does_not_fail_ingest(tmp_path: Path) -> None:
+    input_path = tmp_path / "records-2026-03-05.jsonl"
+    write_lines(input_path, ['{"record_key": "a"}', '{"record_key": "b"}'])
+    # A directory in the temp file's place makes the cache write fail even when running as root.
+    index_path_for(input_path).with_name(index_path_for(input_path).name + ".tmp").mkdir()
+
+    assert len(load_line_index(input_path, cache=True)) == 2
+    assert not index_path_for(input_path).exists()
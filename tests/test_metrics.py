@@ -0,0 +1,86 @@
+from datetime import date
+import json
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from app.metrics import REGISTRY, MetricsRegistry, start_http_server, write_textfile
+
+
+@pytest.fixture()
+def clean_registry():
+    REGISTRY.clear()
+    yield REGISTRY
+    REGISTRY.clear()
+
+
+def test_registry_renders_prometheus_text_format() -> None:
+    registry = MetricsRegistry()
+    counter = registry.counter("demo_total", "Demo counter.", ("reason",))
+    histogram = registry.histogram("demo_seconds", "Demo histogram.", buckets=(0.1, 1.0))
+    counter.inc(2, reason='say "hi"\n')
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    assert registry.render().splitlines() == [
+        "# HELP demo_total Demo counter.",
+        "# TYPE demo_total counter",
+        'demo_total{reason="say \\"hi\\"\\n"} 2',
+        "# HELP demo_seconds Demo histogram.",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{le="0.1"} 2',
+        'demo_seconds_bucket{le="1.0"} 3',
+        'demo_seconds_bucket{le="+Inf"} 4',
+        "demo_seconds_sum 3.65",
+        "demo_seconds_count 4",
+    ]
+    with pytest.raises(ValueError, match="expects labels"):
+        counter.inc(step="x")
+
+
+def test_pipeline_run_updates_metrics(runner, temp_workspace: Path, clean_registry) -> None:
+    run_date = date(2026, 2, 22)
+    rows = [
+        {"record_key": "1", "full_name": "Grace", "email": "grace@example.com", "age": 36},
+        {"record_key": "2", "full_name": "Alan", "email": "bad-email", "age": 41},
+        {"record_key": "3", "full_name": "Ada", "email": "also-bad", "age": 30},
+        {"record_key": "4", "full_name": "Kid", "email": "kid@example.com", "age": 12},
+    ]
+    (temp_workspace / "data" / "input" / f"records-{run_date.isoformat()}.jsonl").write_text(
+        "".join(json.dumps(row) + "\n" for row in rows),
+        encoding="utf-8",
+    )
+
+    assert runner.run(run_date=run_date, run_key="metrics-1").status == "succeeded"
+
+    text = clean_registry.render()
+    assert 'flowledger_runs_total{status="succeeded"} 1' in text
+    assert "flowledger_runs_in_flight 0" in text
+    assert 'flowledger_records_total{outcome="valid"} 1' in text
+    assert 'flowledger_invalid_records_total{reason="email format is invalid"} 2' in text
+    assert 'flowledger_invalid_records_total{reason="age must be between 18 and 120"} 1' in text
+    assert 'flowledger_step_duration_seconds_count{step="validate",status="succeeded"} 1' in text
+    assert 'flowledger_step_records_per_second{step="ingest"}' in text
+    assert 'flowledger_db_batch_seconds_count{table="published_records"} 1' in text
+
+
+def test_metrics_endpoint_and_textfile(tmp_path: Path) -> None:
+    registry = MetricsRegistry()
+    registry.gauge("demo_in_flight", "Demo gauge.").set(3)
+    server = start_http_server(0, "127.0.0.1", registry)
+    try:
+        port = server.server_address[1]
+        with urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert "demo_in_flight 3" in response.read().decode("utf-8")
+        with pytest.raises(HTTPError):
+            urlopen(f"http://127.0.0.1:{port}/other")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    path = write_textfile(tmp_path / "textfile" / "flowledger.prom", registry)
+    assert "demo_in_flight 3" in path.read_text(encoding="utf-8")
+    assert [entry.name for entry in path.parent.iterdir()] == ["flowledger.prom"]
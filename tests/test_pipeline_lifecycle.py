@@ -1,10 +1,21 @@
+from dataclasses import replace
 from datetime import date
+import gzip
 import json
 from pathlib import Path
+import threading
 
+import pytest
 from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
 
-from app.db_models import DeadLetterRecord, PipelineRun, StepRun
+from app import pipeline as pipeline_module
+from app.db_models import DeadLetterRecord, PipelineRun, PublishedRecord, StepRun
+from app.parallel import ChunkExecutor
+from app.pipeline import PipelineRunner
+from app.profiling import StepProfiler
+from app.rules import DEFAULT_RULE_SPEC
+from app.run_store import get_current_record
 
 
 def write_input_file(root: Path, run_date: date) -> None:
@@ -65,7 +76,14 @@ def test_full_run_lifecycle_and_idempotency(runner, temp_workspace: Path) -> Non
 
         steps = db.execute(select(StepRun).where(StepRun.run_id == run.id)).scalars().all()
         step_names = sorted(step.step_name for step in steps)
-        assert step_names == ["ingest", "publish_report", "transform", "validate"]
+        assert step_names == [
+            "ingest",
+            "publish_report",
+            "store_dead_letters",
+            "store_published_records",
+            "transform",
+            "validate",
+        ]
 
         dead_letters = db.execute(select(DeadLetterRecord).where(DeadLetterRecord.run_id == run.id)).scalars().all()
         assert len(dead_letters) == 1
@@ -103,7 +121,14 @@ def test_failed_run_can_be_retried_with_same_run_key(runner, temp_workspace: Pat
 
         steps = db.execute(select(StepRun).where(StepRun.run_id == run.id)).scalars().all()
         step_names = sorted(step.step_name for step in steps)
-        assert step_names == ["ingest", "publish_report", "transform", "validate"]
+        assert step_names == [
+            "ingest",
+            "publish_report",
+            "store_dead_letters",
+            "store_published_records",
+            "transform",
+            "validate",
+        ]
 
 
 def test_ingest_file_not_found_is_not_retried(runner) -> None:
@@ -119,3 +144,596 @@ def test_ingest_file_not_found_is_not_retried(runner) -> None:
             select(StepRun).where(StepRun.run_id == run.id, StepRun.step_name == "ingest")
         ).scalars().all()
         assert len(attempts) == 1
+
+
+def test_streaming_run_matches_batch_outputs_and_step_accounting(runner, temp_workspace: Path) -> None:
+    run_date = date(2026, 2, 22)
+    write_input_file(temp_workspace, run_date)
+
+    batch = runner.run(run_date=run_date, run_key="batch-2026-02-22")
+    streaming_runner = PipelineRunner(replace(runner.settings, streaming=True, chunk_size=1), runner.session_factory)
+    streamed = streaming_runner.run(run_date=run_date, run_key="stream-2026-02-22")
+
+    assert streamed.status == "succeeded"
+    assert (streamed.total_records, streamed.valid_records, streamed.invalid_records) == (
+        batch.total_records,
+        batch.valid_records,
+        batch.invalid_records,
+    )
+
+    outputs = temp_workspace / "outputs"
+    for folder in ("published", "dead-letter"):
+        batch_output = (outputs / folder / "batch-2026-02-22.jsonl").read_text(encoding="utf-8")
+        stream_output = (outputs / folder / "stream-2026-02-22.jsonl").read_text(encoding="utf-8")
+        assert stream_output == batch_output
+
+    with runner.session_factory() as db:
+        run = db.execute(select(PipelineRun).where(PipelineRun.run_key == "stream-2026-02-22")).scalar_one()
+        steps = db.execute(select(StepRun).where(StepRun.run_id == run.id)).scalars().all()
+        assert sorted(step.step_name for step in steps) == ["ingest", "publish_report", "transform", "validate"]
+        assert all(step.status == "succeeded" and step.duration_ms is not None for step in steps)
+
+        dead_letters = db.execute(select(DeadLetterRecord).where(DeadLetterRecord.run_id == run.id)).scalars().all()
+        assert [dead_letter.record_index for dead_letter in dead_letters] == [1]
+
+
+def test_streaming_run_missing_input_fails_ingest_stage(runner) -> None:
+    streaming_runner = PipelineRunner(replace(runner.settings, streaming=True), runner.session_factory)
+    result = streaming_runner.run(run_date=date(2026, 3, 1), run_key="stream-missing")
+
+    assert result.status == "failed"
+    with runner.session_factory() as db:
+        run = db.execute(select(PipelineRun).where(PipelineRun.run_key == "stream-missing")).scalar_one()
+        steps = db.execute(select(StepRun).where(StepRun.run_id == run.id)).scalars().all()
+        assert {step.step_name: step.status for step in steps} == {
+            "ingest": "failed",
+            "transform": "failed",
+            "validate": "failed",
+            "publish_report": "failed",
+        }
+        assert "input file not found" in run.error
+
+
+def test_parallel_run_outputs_are_byte_identical_to_serial(runner, temp_workspace: Path) -> None:
+    run_date = date(2026, 2, 22)
+    write_input_file(temp_workspace, run_date)
+
+    runner.run(run_date=run_date, run_key="serial-2026-02-22")
+    parallel_runner = PipelineRunner(replace(runner.settings, parallel_workers=2, chunk_size=1), runner.session_factory)
+    result = parallel_runner.run(run_date=run_date, run_key="parallel-2026-02-22")
+
+    assert result.status == "succeeded"
+    outputs = temp_workspace / "outputs"
+    for folder in ("published", "dead-letter"):
+        serial_output = (outputs / folder / "serial-2026-02-22.jsonl").read_bytes()
+        parallel_output = (outputs / folder / "parallel-2026-02-22.jsonl").read_bytes()
+        assert parallel_output == serial_output
+
+
+def test_fused_validate_run_records_single_transform_validate_step(runner, temp_workspace: Path) -> None:
+    run_date = date(2026, 2, 22)
+    write_input_file(temp_workspace, run_date)
+
+    runner.run(run_date=run_date, run_key="two-step-2026-02-22")
+    for streaming in (False, True):
+        run_key = f"fused-{streaming}-2026-02-22"
+        settings = replace(runner.settings, fused_validate=True, streaming=streaming)
+        result = PipelineRunner(settings, runner.session_factory).run(run_date=run_date, run_key=run_key)
+        assert result.status == "succeeded"
+
+        outputs = temp_workspace / "outputs"
+        for folder in ("published", "dead-letter"):
+            expected = (outputs / folder / "two-step-2026-02-22.jsonl").read_bytes()
+            assert (outputs / folder / f"{run_key}.jsonl").read_bytes() == expected
+
+        with runner.session_factory() as db:
+            run = db.execute(select(PipelineRun).where(PipelineRun.run_key == run_key)).scalar_one()
+            steps = db.execute(select(StepRun).where(StepRun.run_id == run.id)).scalars().all()
+            stores = [] if streaming else ["store_dead_letters", "store_published_records"]
+            assert sorted(step.step_name for step in steps) == ["ingest", "publish_report", *stores, "transform_validate"]
+
+
+def test_profiled_run_writes_profiles_and_step_usage(runner, temp_workspace: Path) -> None:
+    run_date = date(2026, 2, 22)
+    run_key = "profiled-2026-02-22"
+    write_input_file(temp_workspace, run_date)
+
+    settings = replace(runner.settings, profile_steps="cprofile,tracemalloc")
+    result = PipelineRunner(settings, runner.session_factory).run(run_date=run_date, run_key=run_key)
+    assert result.status == "succeeded"
+
+    profile_root = temp_workspace / "outputs" / "profiles" / run_key
+    for step_name in ("ingest", "transform", "validate", "publish_report"):
+        assert (profile_root / f"{step_name}-1" / "cprofile.prof").exists()
+        assert (profile_root / f"{step_name}-1" / "tracemalloc.txt").read_text(encoding="utf-8").startswith("current_bytes=")
+
+    with runner.session_factory() as db:
+        run = db.execute(select(PipelineRun).where(PipelineRun.run_key == run_key)).scalar_one()
+        steps = db.execute(select(StepRun).where(StepRun.run_id == run.id)).scalars().all()
+        assert {step.step_name: step.records_processed for step in steps} == {
+            "ingest": 2,
+            "transform": 2,
+            "validate": 2,
+            "publish_report": 2,
+            "store_published_records": 1,
+            "store_dead_letters": 1,
+        }
+        assert all(step.cpu_time_ms is not None and step.cpu_time_ms >= 0 for step in steps)
+
+
+def test_concurrent_steps_do_not_share_the_profiler(runner, temp_workspace: Path) -> None:
+    profiler = StepProfiler(frozenset({"cprofile", "tracemalloc"}), temp_workspace / "profiles")
+    holding, release = threading.Event(), threading.Event()
+
+    def first_step() -> None:
+        with profiler.profile("run", "first-1"):
+            holding.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=first_step)
+    thread.start()
+    assert holding.wait(5)
+    with profiler.profile("run", "second-1"):
+        pass
+    release.set()
+    thread.join()
+
+    assert (temp_workspace / "profiles" / "run" / "first-1" / "cprofile.prof").exists()
+    assert not (temp_workspace / "profiles" / "run" / "second-1").exists()
+
+    run_date = date(2026, 2, 22)
+    write_input_file(temp_workspace, run_date)
+    settings = replace(runner.settings, profile_steps="cprofile,tracemalloc", dag_workers=4)
+    assert PipelineRunner(settings, runner.session_factory).run(run_date=run_date, run_key="profiled-dag").status == (
+        "succeeded"
+    )
+
+
+def _fail_publish(*args, **kwargs) -> None:
+    raise OSError("disk full")
+
+
+def test_checkpointed_retry_resumes_from_first_unfinished_step(runner, temp_workspace: Path, monkeypatch) -> None:
+    run_date = date(2026, 2, 22)
+    run_key = "checkpointed-2026-02-22"
+    write_input_file(temp_workspace, run_date)
+    checkpoint_runner = PipelineRunner(replace(runner.settings, checkpoints=True), runner.session_factory)
+
+    monkeypatch.setattr(PipelineRunner, "_write_published", _fail_publish)
+    assert checkpoint_runner.run(run_date=run_date, run_key=run_key).status == "failed"
+    monkeypatch.undo()
+
+    ingest_calls = []
+    original_ingest = ChunkExecutor.ingest
+    monkeypatch.setattr(
+        ChunkExecutor,
+        "ingest",
+        lambda self, *args: ingest_calls.append(args) or original_ingest(self, *args),
+    )
+    result = checkpoint_runner.run(run_date=run_date, run_key=run_key)
+
+    assert result.status == "succeeded"
+    assert (result.total_records, result.valid_records, result.invalid_records) == (2, 1, 1)
+    assert ingest_calls == []
+    assert not (temp_workspace / "outputs" / "checkpoints" / run_key).exists()
+
+    with runner.session_factory() as db:
+        run = db.execute(select(PipelineRun).where(PipelineRun.run_key == run_key)).scalar_one()
+        steps = db.execute(select(StepRun).where(StepRun.run_id == run.id)).scalars().all()
+        assert {step.step_name: step.status for step in steps} == {
+            "ingest": "restored",
+            "transform": "restored",
+            "validate": "restored",
+            "publish_report": "succeeded",
+            "store_published_records": "succeeded",
+            "store_dead_letters": "succeeded",
+        }
+
+
+def test_checkpoints_are_invalidated_when_input_changes(runner, temp_workspace: Path, monkeypatch) -> None:
+    run_date = date(2026, 2, 22)
+    run_key = "checkpoint-stale-2026-02-22"
+    write_input_file(temp_workspace, run_date)
+    checkpoint_runner = PipelineRunner(replace(runner.settings, checkpoints=True), runner.session_factory)
+
+    monkeypatch.setattr(PipelineRunner, "_write_published", _fail_publish)
+    assert checkpoint_runner.run(run_date=run_date, run_key=run_key).status == "failed"
+    monkeypatch.undo()
+
+    input_file = temp_workspace / "data" / "input" / f"records-{run_date.isoformat()}.jsonl"
+    with input_file.open("a", encoding="utf-8") as outfile:
+        outfile.write(json.dumps({"record_key": "3", "full_name": "Alan", "email": "alan@example.com", "age": 41}))
+        outfile.write("\n")
+
+    result = checkpoint_runner.run(run_date=run_date, run_key=run_key)
+
+    assert result.status == "succeeded"
+    assert result.total_records == 3
+    with runner.session_factory() as db:
+        run = db.execute(select(PipelineRun).where(PipelineRun.run_key == run_key)).scalar_one()
+        steps = db.execute(select(StepRun).where(StepRun.run_id == run.id)).scalars().all()
+        assert all(step.status == "succeeded" for step in steps)
+
+
+def test_result_cache_hit_republishes_without_recomputing(runner, temp_workspace: Path, monkeypatch) -> None:
+    run_date = date(2026, 2, 22)
+    write_input_file(temp_workspace, run_date)
+    cache_runner = PipelineRunner(replace(runner.settings, result_cache=True), runner.session_factory)
+
+    first = cache_runner.run(run_date=run_date, run_key="cached-first")
+    monkeypatch.setattr(ChunkExecutor, "ingest", lambda *args: pytest.fail("cache hit should not ingest"))
+    second = cache_runner.run(run_date=run_date, run_key="cached-second")
+
+    assert (second.status, second.total_records, second.valid_records, second.invalid_records) == (
+        "succeeded",
+        2,
+        1,
+        1,
+    )
+    outputs = temp_workspace / "outputs"
+    first_report = json.loads((outputs / "reports" / "cached-first.json").read_text(encoding="utf-8"))
+    second_report = json.loads((outputs / "reports" / "cached-second.json").read_text(encoding="utf-8"))
+    assert first_report["result_cache"]["status"] == "miss"
+    assert second_report["result_cache"] == {
+        **first_report["result_cache"],
+        "status": "hit",
+        "source_run_id": first.run_id,
+    }
+    for folder in ("published", "dead-letter"):
+        assert (outputs / folder / "cached-second.jsonl").read_bytes() == (
+            outputs / folder / "cached-first.jsonl"
+        ).read_bytes()
+
+    with runner.session_factory() as db:
+        steps = db.execute(select(StepRun).where(StepRun.run_id == second.run_id)).scalars().all()
+        assert [step.step_name for step in steps] == ["publish_report"]
+        payloads = {
+            run_id: db.execute(select(PublishedRecord.payload).where(PublishedRecord.run_id == run_id)).scalars().all()
+            for run_id in (first.run_id, second.run_id)
+        }
+        assert payloads[first.run_id] == payloads[second.run_id] != []
+        dead_letters = db.execute(select(DeadLetterRecord).where(DeadLetterRecord.run_id == second.run_id)).scalars()
+        assert [row.reason for row in dead_letters] != []
+
+
+def test_result_cache_misses_when_source_run_is_gone(runner, temp_workspace: Path) -> None:
+    run_date = date(2026, 2, 22)
+    write_input_file(temp_workspace, run_date)
+    cache_runner = PipelineRunner(replace(runner.settings, result_cache=True), runner.session_factory)
+
+    first = cache_runner.run(run_date=run_date, run_key="cached-source")
+    with runner.session_factory() as db:
+        run = db.get(PipelineRun, first.run_id)
+        run.status = "failed"
+        db.commit()
+
+    second = cache_runner.run(run_date=run_date, run_key="cached-after-source-failed")
+
+    report = json.loads(Path(second.report_path).read_text(encoding="utf-8"))
+    assert second.status == "succeeded"
+    assert report["result_cache"]["status"] == "miss"
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_delta_publish_stores_only_new_and_changed_records(runner, temp_workspace: Path, streaming: bool) -> None:
+    delta_runner = PipelineRunner(
+        replace(runner.settings, delta_publish=True, streaming=streaming, chunk_size=1),
+        runner.session_factory,
+    )
+    first_date, second_date = date(2026, 2, 22), date(2026, 2, 23)
+    write_input_file(temp_workspace, first_date)
+    input_dir = temp_workspace / "data" / "input"
+    rows = [
+        {"record_key": "1", "full_name": "Grace Hopper", "email": "grace@example.com", "age": 36, "source": "web"},
+        {"record_key": "3", "full_name": "Alan Turing", "email": "alan@example.com", "age": 41, "source": "web"},
+        {"record_key": "4", "full_name": "Ada Lovelace", "email": "ada@example.com", "age": 36, "source": "web"},
+    ]
+    (input_dir / f"records-{second_date.isoformat()}.jsonl").write_text(
+        "".join(json.dumps(row) + "\n" for row in rows),
+        encoding="utf-8",
+    )
+    (input_dir / f"records-{date(2026, 2, 24).isoformat()}.jsonl").write_text(
+        "".join(json.dumps({**row, "age": 50} if row["record_key"] == "3" else row) + "\n" for row in rows[:2]),
+        encoding="utf-8",
+    )
+
+    first = delta_runner.run(run_date=first_date, run_key="delta-1")
+    second = delta_runner.run(run_date=second_date, run_key="delta-2")
+    third = delta_runner.run(run_date=date(2026, 2, 24), run_key="delta-3")
+
+    reports = {
+        result.run_key: json.loads(Path(result.report_path).read_text(encoding="utf-8"))
+        for result in (first, second, third)
+    }
+    counts = {
+        run_key: {name: report["delta"][name] for name in ("new", "changed", "unchanged", "deleted")}
+        for run_key, report in reports.items()
+    }
+    assert counts == {
+        "delta-1": {"new": 1, "changed": 0, "unchanged": 0, "deleted": 0},
+        "delta-2": {"new": 2, "changed": 0, "unchanged": 1, "deleted": 0},
+        "delta-3": {"new": 0, "changed": 1, "unchanged": 1, "deleted": 1},
+    }
+    delta_file = Path(reports["delta-3"]["delta"]["delta_output"])
+    assert delta_file == temp_workspace / "outputs" / "published" / "delta-3.delta.jsonl"
+    assert [json.loads(line)["record_key"] for line in delta_file.read_text(encoding="utf-8").splitlines()] == ["3"]
+    assert third.valid_records == 2
+
+    with runner.session_factory() as db:
+        stored = {
+            result.run_key: sorted(
+                db.execute(select(PublishedRecord.record_key).where(PublishedRecord.run_id == result.run_id)).scalars()
+            )
+            for result in (first, second, third)
+        }
+    assert stored == {"delta-1": ["1"], "delta-2": ["3", "4"], "delta-3": ["3"]}
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_delta_state_advances_only_after_every_other_side_effect(
+    runner, temp_workspace: Path, monkeypatch, streaming: bool
+) -> None:
+    delta_runner = PipelineRunner(
+        replace(runner.settings, delta_publish=True, current_records=True, streaming=streaming, max_step_retries=2),
+        runner.session_factory,
+    )
+    first_date, second_date = date(2026, 2, 22), date(2026, 2, 23)
+    write_input_file(temp_workspace, first_date)
+    (temp_workspace / "data" / "input" / f"records-{second_date.isoformat()}.jsonl").write_text(
+        json.dumps({"record_key": "1", "full_name": "Grace Hopper", "email": "grace@navy.mil", "age": 36}) + "\n",
+        encoding="utf-8",
+    )
+    assert delta_runner.run(run_date=first_date, run_key="delta-before").status == "succeeded"
+
+    failures = []
+
+    def fail_once(name, original):
+        def wrapper(*args, **kwargs):
+            if name not in failures:
+                failures.append(name)
+                raise OSError(f"{name} failed")
+            return original(*args, **kwargs)
+
+        return wrapper
+
+    # The report write is retried inside the run; the current_records refresh fails the run,
+    # which is then retried under the same run key.
+    monkeypatch.setattr(pipeline_module, "write_json", fail_once("report", pipeline_module.write_json))
+    monkeypatch.setattr(
+        pipeline_module,
+        "refresh_current_records",
+        fail_once("refresh", pipeline_module.refresh_current_records),
+    )
+    assert delta_runner.run(run_date=second_date, run_key="delta-after").status == "failed"
+    result = delta_runner.run(run_date=second_date, run_key="delta-after")
+
+    assert result.status == "succeeded" and failures == ["report", "refresh"]
+    report = json.loads(Path(result.report_path).read_text(encoding="utf-8"))
+    assert {name: report["delta"][name] for name in ("new", "changed", "unchanged")} == {
+        "new": 0,
+        "changed": 1,
+        "unchanged": 0,
+    }
+    with runner.session_factory() as db:
+        stored = db.execute(select(PublishedRecord.record_key).where(PublishedRecord.run_id == result.run_id))
+        assert list(stored.scalars()) == ["1"]
+        assert "grace@navy.mil" in get_current_record(db, "1").payload
+
+
+def test_current_records_follow_cache_hits(runner, temp_workspace: Path) -> None:
+    run_date = date(2026, 2, 22)
+    write_input_file(temp_workspace, run_date)
+    settings = replace(runner.settings, current_records=True, result_cache=True)
+    current_runner = PipelineRunner(settings, runner.session_factory)
+
+    current_runner.run(run_date=run_date, run_key="current-first")
+    second = current_runner.run(run_date=run_date, run_key="current-second")
+
+    with runner.session_factory() as db:
+        current = get_current_record(db, "1")
+        assert current.run_id == second.run_id
+        assert "Grace Hopper" in current.payload
+        assert get_current_record(db, "2") is None
+
+
+@pytest.mark.parametrize("parallel_workers", [0, 2])
+def test_gzip_input_and_outputs(runner, temp_workspace: Path, parallel_workers: int) -> None:
+    run_date = date(2026, 2, 22)
+    write_input_file(temp_workspace, run_date)
+    input_file = temp_workspace / "data" / "input" / f"records-{run_date.isoformat()}.jsonl"
+    input_file.with_name(input_file.name + ".gz").write_bytes(gzip.compress(input_file.read_bytes()))
+    input_file.unlink()
+    settings = replace(runner.settings, output_compression="gzip", parallel_workers=parallel_workers)
+
+    result = PipelineRunner(settings, runner.session_factory).run(run_date=run_date, run_key="gzip-run")
+
+    report = json.loads(Path(result.report_path).read_text(encoding="utf-8"))
+    assert (result.status, result.total_records, result.valid_records) == ("succeeded", 2, 1)
+    assert report["published_output"].endswith("published/gzip-run.jsonl.gz")
+    assert report["dead_letter_output"].endswith("dead-letter/gzip-run.jsonl.gz")
+    published = gzip.decompress(Path(report["published_output"]).read_bytes()).decode("utf-8")
+    assert json.loads(published)["record_key"] == "1"
+
+
+def test_sharded_output_matches_between_batch_and_streaming(runner, temp_workspace: Path) -> None:
+    run_date = date(2026, 2, 22)
+    rows = [
+        {"record_key": str(index), "full_name": "Ada", "email": f"a{index}@example.com", "age": 30, "source": source}
+        for index, source in enumerate(["web", "partner", "web", "web", "partner"])
+    ]
+    input_file = temp_workspace / "data" / "input" / f"records-{run_date.isoformat()}.jsonl"
+    input_file.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+
+    manifests = {}
+    for streaming in (False, True):
+        settings = replace(runner.settings, shard_field="source", shard_rows=2, streaming=streaming, chunk_size=2)
+        run_key = f"sharded-{streaming}"
+        result = PipelineRunner(settings, runner.session_factory).run(run_date=run_date, run_key=run_key)
+        report = json.loads(Path(result.report_path).read_text(encoding="utf-8"))
+        manifest_path = Path(report["published_manifest"])
+        assert manifest_path == temp_workspace / "outputs" / "published" / run_key / "manifest.json"
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        for shard in manifest["shards"]:
+            shard_file = manifest_path.parent / shard["path"]
+            assert shard_file.stat().st_size == shard["bytes"]
+            assert len(shard_file.read_text(encoding="utf-8").splitlines()) == shard["rows"]
+        manifests[streaming] = {**manifest, "run_key": None}
+
+    assert manifests[False] == manifests[True]
+    assert manifests[False]["total_rows"] == 5
+    assert [(shard["path"], shard["rows"]) for shard in manifests[False]["shards"]] == [
+        ("source=partner/part-00000.jsonl", 2),
+        ("source=web/part-00000.jsonl", 2),
+        ("source=web/part-00001.jsonl", 1),
+    ]
+
+
+def test_compiled_rule_spec_drives_validation_and_rules_version(runner, temp_workspace: Path) -> None:
+    run_date = date(2026, 2, 22)
+    write_input_file(temp_workspace, run_date)
+    spec = json.loads(json.dumps(DEFAULT_RULE_SPEC))
+    spec["rules"] = [rule for rule in spec["rules"] if rule["type"] in ("int", "required")]
+    spec["rules"] = [rule for rule in spec["rules"] if rule["field"] != "full_name"]
+    spec_path = temp_workspace / "rules.json"
+    spec_path.write_text(json.dumps(spec), encoding="utf-8")
+
+    default_runner = PipelineRunner(replace(runner.settings, validation_engine="compiled"), runner.session_factory)
+    custom_settings = replace(runner.settings, validation_engine="compiled", rules_spec=str(spec_path))
+    custom_runner = PipelineRunner(custom_settings, runner.session_factory)
+    result = custom_runner.run(run_date=run_date, run_key="custom-rules")
+
+    assert default_runner.rules_version != custom_runner.rules_version
+    # Record 2 has no name, a bad email and age 15; none of those rules remain.
+    assert (result.status, result.valid_records, result.invalid_records) == ("succeeded", 2, 0)
+
+
+def test_dag_publish_records_one_step_per_branch(runner, temp_workspace: Path) -> None:
+    run_date = date(2026, 2, 22)
+    write_input_file(temp_workspace, run_date)
+    runner.run(run_date=run_date, run_key="sequential-2026-02-22")
+    dag_runner = PipelineRunner(replace(runner.settings, dag_workers=4, delta_publish=True), runner.session_factory)
+
+    result = dag_runner.run(run_date=run_date, run_key="dag-2026-02-22")
+
+    assert result.status == "succeeded"
+    outputs = temp_workspace / "outputs"
+    for folder in ("published", "dead-letter"):
+        assert (outputs / folder / "dag-2026-02-22.jsonl").read_bytes() == (
+            outputs / folder / "sequential-2026-02-22.jsonl"
+        ).read_bytes()
+    assert json.loads(Path(result.report_path).read_text(encoding="utf-8"))["delta"]["new"] == 1
+
+    with runner.session_factory() as db:
+        steps = db.execute(select(StepRun).where(StepRun.run_id == result.run_id)).scalars().all()
+        assert {step.step_name: step.status for step in steps} == {
+            "ingest": "succeeded",
+            "transform": "succeeded",
+            "validate": "succeeded",
+            "classify_delta": "succeeded",
+            "write_published": "succeeded",
+            "write_dead_letters": "succeeded",
+            "write_delta": "succeeded",
+            "store_published_records": "succeeded",
+            "store_dead_letters": "succeeded",
+            "publish_report": "succeeded",
+            "save_delta_state": "succeeded",
+        }
+        published = db.execute(select(PublishedRecord).where(PublishedRecord.run_id == result.run_id)).scalars().all()
+        assert [record.record_key for record in published] == ["1"]
+
+
+def test_dag_publish_branch_failure_fails_run_without_report(runner, temp_workspace: Path, monkeypatch) -> None:
+    run_date = date(2026, 2, 22)
+    write_input_file(temp_workspace, run_date)
+    dag_runner = PipelineRunner(replace(runner.settings, dag_workers=4), runner.session_factory)
+    monkeypatch.setattr(PipelineRunner, "_write_dead_letters", lambda self, ctx, invalid_records: 1 / 0)
+
+    result = dag_runner.run(run_date=run_date, run_key="dag-failed-2026-02-22")
+
+    assert result.status == "failed"
+    assert not Path(result.report_path).exists()
+    with runner.session_factory() as db:
+        steps = db.execute(select(StepRun).where(StepRun.run_id == result.run_id)).scalars().all()
+        attempts = sorted((step.step_name, step.attempt, step.status) for step in steps)
+        assert ("write_dead_letters", 2, "failed") in attempts
+        assert "publish_report" not in {name for name, _, _ in attempts}
+
+    monkeypatch.undo()
+    assert dag_runner.run(run_date=run_date, run_key="dag-failed-2026-02-22").status == "succeeded"
+
+
+def test_publish_retry_rewrites_only_failed_and_remaining_files(runner, temp_workspace: Path, monkeypatch) -> None:
+    run_date = date(2026, 2, 22)
+    write_input_file(temp_workspace, run_date)
+    published_calls, dead_letter_calls = [], []
+    original_published, original_dead_letters = PipelineRunner._write_published, PipelineRunner._write_dead_letters
+
+    def flaky_dead_letters(self, ctx, invalid_records):
+        dead_letter_calls.append(1)
+        if len(dead_letter_calls) == 1:
+            raise OSError("disk full")
+        original_dead_letters(self, ctx, invalid_records)
+
+    monkeypatch.setattr(
+        PipelineRunner,
+        "_write_published",
+        lambda self, *args: published_calls.append(1) or original_published(self, *args),
+    )
+    monkeypatch.setattr(PipelineRunner, "_write_dead_letters", flaky_dead_letters)
+
+    result = runner.run(run_date=run_date, run_key="chunked-publish")
+
+    assert result.status == "succeeded"
+    assert (len(published_calls), len(dead_letter_calls)) == (1, 2)
+    with runner.session_factory() as db:
+        steps = db.execute(
+            select(StepRun)
+            .where(StepRun.run_id == result.run_id, StepRun.step_name == "publish_report")
+            .order_by(StepRun.attempt)
+        ).scalars().all()
+        history = [(s.status, s.chunks_total, s.chunks_completed, s.chunks_skipped) for s in steps]
+    assert history == [("failed", 3, 1, 0), ("succeeded", 3, 2, 1)]
+
+
+@pytest.mark.parametrize("dag_workers", [0, 2])
+def test_store_retry_resumes_after_last_committed_chunk(
+    runner, temp_workspace: Path, monkeypatch, dag_workers: int
+) -> None:
+    run_date = date(2026, 2, 22)
+    rows = [
+        {"record_key": str(index), "full_name": "Ada", "email": "ada@example.com", "age": 30, "source": "web"}
+        for index in range(4)
+    ]
+    (temp_workspace / "data" / "input" / f"records-{run_date.isoformat()}.jsonl").write_text(
+        "".join(json.dumps(row) + "\n" for row in rows),
+        encoding="utf-8",
+    )
+    stored_batches = []
+    original_store = pipeline_module.store_published_records
+
+    def flaky_store(db, *, records, **kwargs):
+        stored_batches.append([record["record_key"] for record in records])
+        if len(stored_batches) == 3:
+            raise OperationalError("INSERT", {}, ConnectionError("connection reset"))
+        original_store(db, records=records, **kwargs)
+
+    monkeypatch.setattr(pipeline_module, "store_published_records", flaky_store)
+    chunked_runner = PipelineRunner(
+        replace(runner.settings, dag_workers=dag_workers, chunk_size=1),
+        runner.session_factory,
+    )
+
+    result = chunked_runner.run(run_date=run_date, run_key="chunked-store")
+
+    assert result.status == "succeeded"
+    assert stored_batches == [["0"], ["1"], ["2"], ["2"], ["3"]]
+    with runner.session_factory() as db:
+        steps = db.execute(
+            select(StepRun)
+            .where(StepRun.run_id == result.run_id, StepRun.step_name == "store_published_records")
+            .order_by(StepRun.attempt)
+        ).scalars().all()
+        history = [(s.status, s.chunks_total, s.chunks_completed, s.chunks_skipped) for s in steps]
+        stored = db.execute(select(PublishedRecord.record_key).where(PublishedRecord.run_id == result.run_id))
+        assert sorted(stored.scalars()) == ["0", "1", "2", "3"]
+    assert history == [("failed", 4, 2, 0), ("succeeded", 4, 2, 2)]
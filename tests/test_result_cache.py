@@ -0,0 +1,43 @@
+import os
+from pathlib import Path
+
+from app.result_cache import ResultCache, cache_key
+from app.step_logic import write_jsonl
+
+
+def store_entry(cache: ResultCache, tmp_path: Path, key: str, size: int) -> None:
+    source = tmp_path / f"{key}.jsonl"
+    source.write_bytes(b"x" * size)
+    cache.store(key, source_run_id=1, total_records=1, valid_records=1, invalid_records=0, files={"published": source})
+
+
+def test_cache_key_changes_with_rules_version() -> None:
+    assert cache_key("input", "rules-a") != cache_key("input", "rules-b")
+    assert cache_key("input", "rules-a") == cache_key("input", "rules-a")
+
+
+def test_eviction_drops_least_recently_used_entries(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path / "cache", max_bytes=2_500)
+    store_entry(cache, tmp_path, "old", 1_000)
+    store_entry(cache, tmp_path, "recent", 1_000)
+    os.utime(cache.root / "old" / "meta.json", (0, 0))
+    os.utime(cache.root / "recent" / "meta.json", (10, 10))
+    assert cache.lookup("old") is not None
+
+    store_entry(cache, tmp_path, "new", 1_000)
+
+    assert cache.lookup("recent") is None
+    assert cache.lookup("old") is not None
+    assert cache.lookup("new") is not None
+
+
+def test_materialized_outputs_survive_rewrites_of_the_target(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path / "cache", max_bytes=10_000)
+    store_entry(cache, tmp_path, "entry", 10)
+    entry = cache.lookup("entry")
+    target = tmp_path / "published.jsonl"
+
+    cache.materialize(entry, "published", target)
+    write_jsonl(target, [{"changed": True}])
+
+    assert (entry.path / entry.files["published"]).read_bytes() == b"x" * 10
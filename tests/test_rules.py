@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from app.parallel import ChunkExecutor
+from app.rules import DEFAULT_RULE_SPEC, RuleSpecError, compile_rules
+from app.step_logic import transform_records, transform_validate_records, validate_records
+from benchmarks.synthetic import SyntheticSpec, generate_records
+
+
+def test_default_spec_compiles_to_the_hand_written_rules() -> None:
+    records = transform_records(list(generate_records(SyntheticSpec(records=3_000, invalid_rate=0.4))))
+    records += [{}, {"record_key": "k", "full_name": "Ada", "email": "a@b.c", "age": True}]
+
+    validate = compile_rules(DEFAULT_RULE_SPEC)
+
+    assert validate(records, start_index=5) == validate_records(records, start_index=5)
+    assert compile_rules(json.loads(json.dumps(DEFAULT_RULE_SPEC))) is validate
+
+
+def test_custom_spec_short_circuits_in_declared_order() -> None:
+    spec = {
+        "fields": [
+            {"name": "record_key", "default": "", "strip": True},
+            {"name": "email", "default": "", "strip": True, "lower": True},
+            {"name": "score", "raw": True},
+        ],
+        "rules": [
+            {"type": "regex", "field": "email", "pattern": r"^[^@\s]+@[^@\s]+\.[a-z]+$", "reason": "bad email"},
+            {"type": "required", "field": "record_key", "reason": "no key"},
+            {"type": "float", "field": "score", "reason": "score not numeric"},
+            {"type": "range", "field": "score", "min": 0, "reason": "negative score"},
+        ],
+        "derived": [{"name": "tier", "field": "score", "buckets": [{"max": 0.5, "value": "low"}], "default": "high"}],
+        "output": ["record_key", "email", "score", "tier"],
+    }
+    records = [
+        {"record_key": "a", "email": " A@X.IO ", "score": "0.9"},
+        {"record_key": "", "email": "bad", "score": "x"},
+        {"record_key": "", "email": "b@x.io", "score": "x"},
+        {"record_key": "c", "email": "c@x.io", "score": "x"},
+        {"record_key": "d", "email": "d@x.io", "score": -1},
+    ]
+
+    valid, invalid = compile_rules(spec)(records)
+
+    assert valid == [{"record_key": "a", "email": "a@x.io", "score": 0.9, "tier": "high"}]
+    assert [(item.record_index, item.reason) for item in invalid] == [
+        (1, "bad email"),
+        (2, "no key"),
+        (3, "score not numeric"),
+        (4, "negative score"),
+    ]
+
+
+def test_invalid_specs_are_rejected() -> None:
+    with pytest.raises(RuleSpecError):
+        compile_rules({"fields": [], "rules": [{"type": "required", "field": "missing"}]})
+    with pytest.raises(RuleSpecError):
+        compile_rules({"fields": [{"name": "a"}], "rules": [{"type": "between", "field": "a"}]})
+
+
+def test_compiled_engine_runs_in_workers() -> None:
+    records = list(generate_records(SyntheticSpec(records=200)))
+    spec = json.dumps(DEFAULT_RULE_SPEC)
+
+    with ChunkExecutor(2, 50, validation_engine="compiled", rules_spec=spec) as executor:
+        assert executor.transform_validate(records, start_index=3) == transform_validate_records(records, start_index=3)
@@ -0,0 +1,81 @@
+from datetime import date
+
+from sqlalchemy import select
+
+from app.db_models import DeadLetterRecord, PublishedRecord
+from app.run_store import (
+    create_or_get_run,
+    delete_current_records,
+    get_current_record,
+    refresh_current_records,
+    store_dead_letters,
+    store_published_records,
+)
+from app.schemas import InvalidRecord
+
+
+def test_store_published_records_batches_and_skips_existing_keys(runner) -> None:
+    records = [{"record_key": f"k-{index}", "full_name": "Ada"} for index in range(7)]
+
+    with runner.session_factory() as db:
+        run, _ = create_or_get_run(db, run_key="bulk-1", run_date=date(2026, 3, 2), trigger_source="manual")
+        store_published_records(db, run_id=run.id, records=records[:4], batch_size=3)
+        # A retried publish re-sends rows that were already stored.
+        store_published_records(db, run_id=run.id, records=records, batch_size=3)
+
+        stored = db.execute(
+            select(PublishedRecord.record_key).where(PublishedRecord.run_id == run.id).order_by(PublishedRecord.id)
+        ).scalars().all()
+
+    assert stored == [f"k-{index}" for index in range(7)]
+
+
+def test_store_dead_letters_bulk_inserts_all_rows(runner) -> None:
+    invalid = [InvalidRecord(index, {"record_key": str(index)}, "email format is invalid") for index in range(5)]
+
+    with runner.session_factory() as db:
+        run, _ = create_or_get_run(db, run_key="bulk-2", run_date=date(2026, 3, 2), trigger_source="manual")
+        store_dead_letters(db, run_id=run.id, invalid_records=invalid, batch_size=2)
+
+        rows = db.execute(
+            select(DeadLetterRecord).where(DeadLetterRecord.run_id == run.id).order_by(DeadLetterRecord.record_index)
+        ).scalars().all()
+
+    assert [row.record_index for row in rows] == [0, 1, 2, 3, 4]
+    assert rows[0].raw_record == "{'record_key': '0'}"
+
+
+def test_current_records_track_latest_payload_per_key(runner) -> None:
+    with runner.session_factory() as db:
+        first, _ = create_or_get_run(db, run_key="current-1", run_date=date(2026, 3, 2), trigger_source="manual")
+        second, _ = create_or_get_run(db, run_key="current-2", run_date=date(2026, 3, 3), trigger_source="manual")
+        store_published_records(db, run_id=first.id, records=[{"record_key": "a", "age": 1}, {"record_key": "b"}])
+        refresh_current_records(db, run_id=first.id)
+        store_published_records(db, run_id=second.id, records=[{"record_key": "a", "age": 2}])
+        refresh_current_records(db, run_id=second.id)
+        delete_current_records(db, ["b"])
+
+        current = get_current_record(db, "a")
+        assert current.payload == "{'record_key': 'a', 'age': 2}"
+        assert (current.run_id, current.run.run_key) == (second.id, "current-2")
+        assert get_current_record(db, "b") is None
+        assert get_current_record(db, "missing") is None
+
+
+def test_current_records_ignore_runs_published_out_of_order(runner) -> None:
+    with runner.session_factory() as db:
+        newer, _ = create_or_get_run(db, run_key="current-new", run_date=date(2026, 3, 5), trigger_source="manual")
+        older, _ = create_or_get_run(db, run_key="current-old", run_date=date(2026, 3, 4), trigger_source="manual")
+        store_published_records(db, run_id=newer.id, records=[{"record_key": "a", "age": 2}])
+        store_published_records(db, run_id=older.id, records=[{"record_key": "a", "age": 1}, {"record_key": "c"}])
+        refresh_current_records(db, run_id=newer.id)
+        # A backfill of the older date lands after the newer run was published.
+        refresh_current_records(db, run_id=older.id)
+
+        assert get_current_record(db, "a").run_id == newer.id
+        assert get_current_record(db, "a").payload == "{'record_key': 'a', 'age': 2}"
+        assert get_current_record(db, "c").run_id == older.id
+
+        # Re-publishing the same run still refreshes its rows.
+        refresh_current_records(db, run_id=newer.id)
+        assert get_current_record(db, "a").run_id == newer.id
@@ -1,4 +1,5 @@
-from app.step_logic import transform_records, validate_records
+from app.parallel import ChunkExecutor, _pool_context
+from app.step_logic import iter_chunks, transform_records, transform_validate_records, validate_records
 
 
 def test_transform_normalizes_email_and_source() -> None:
@@ -42,3 +43,57 @@ def test_validate_splits_valid_and_invalid() -> None:
     assert valid[0]["age_group"] == "18-34"
     assert len(invalid) == 1
     assert invalid[0].reason == "age must be an integer"
+
+
+def test_validate_start_index_keeps_global_record_index() -> None:
+    records = [
+        {"record_key": "A-1", "full_name": "Ada", "email": "ada@example.com", "age": 30, "source": "web"},
+        {"record_key": "A-2", "full_name": "", "email": "x@example.com", "age": 30, "source": "web"},
+        {"record_key": "A-3", "full_name": "Kid", "email": "kid@example.com", "age": 9, "source": "web"},
+    ]
+
+    chunks = list(iter_chunks(records, 2))
+    invalid_indexes = []
+    offset = 0
+    for chunk in chunks:
+        _, invalid = validate_records(chunk, start_index=offset)
+        invalid_indexes.extend(item.record_index for item in invalid)
+        offset += len(chunk)
+
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert invalid_indexes == [1, 2]
+
+
+def test_chunk_executor_parallel_matches_serial() -> None:
+    records = [
+        {"record_key": f"k-{index}", "full_name": "Ada", "email": " ADA@EXAMPLE.COM ", "age": age, "source": "Web"}
+        for index, age in enumerate([30, 12, "x", 55, 40, 121, 19])
+    ]
+
+    serial_valid, serial_invalid = validate_records(transform_records(records), start_index=10)
+    with ChunkExecutor(workers=3, chunk_size=2) as executor:
+        parallel_valid, parallel_invalid = executor.validate(executor.transform(records), start_index=10)
+
+    assert parallel_valid == serial_valid
+    assert parallel_invalid == serial_invalid
+    assert [item.record_index for item in parallel_invalid] == [11, 12, 15]
+
+
+def test_chunk_executor_pool_never_forks() -> None:
+    assert _pool_context().get_start_method() in {"forkserver", "spawn"}
+
+
+def test_fused_transform_validate_matches_two_step_path() -> None:
+    records = [
+        {"record_key": " A-1 ", "full_name": " Ada ", "email": " ADA@EXAMPLE.COM ", "age": "30", "source": " WEB "},
+        {"record_key": "A-2", "full_name": "Old", "email": "old@example.com", "age": 70},
+        {"record_key": "A-3", "full_name": "", "email": "x@example.com", "age": 40, "source": "web"},
+        {"record_key": "", "full_name": "No Key", "email": "nokey@example.com", "age": 40},
+        {"record_key": "A-5", "full_name": "Kid", "email": "kid", "age": 9},
+        {"record_key": "A-6", "full_name": "Bad Age", "email": "a@b.c", "age": None},
+        {"record_key": "A-7", "full_name": "Too Old", "email": "a@b.c", "age": 121},
+    ]
+
+    assert transform_validate_records(records, start_index=3) == validate_records(
+        transform_records(records), start_index=3
+    )
@@ -0,0 +1,102 @@
+from dataclasses import replace
+from datetime import date, timedelta
+import json
+from pathlib import Path
+
+from app.run_store import (
+    claim_queued_run,
+    create_or_get_run,
+    enqueue_run,
+    finish_queued_run,
+    get_queue_item,
+    heartbeat_run_lease,
+    mark_run_running,
+)
+from app.worker import RunWorker
+
+
+def write_input(root: Path, run_date: date) -> None:
+    (root / "data" / "input" / f"records-{run_date.isoformat()}.jsonl").write_text(
+        json.dumps({"record_key": run_date.isoformat(), "full_name": "Ada", "email": "ada@example.com", "age": 31})
+        + "\n",
+        encoding="utf-8",
+    )
+
+
+def test_enqueue_is_idempotent_and_claims_are_exclusive(runner) -> None:
+    run_date = date(2026, 3, 1)
+    with runner.session_factory() as db:
+        first, queued = enqueue_run(db, run_key="queued-1", run_date=run_date, trigger_source="scheduled")
+        _, queued_again = enqueue_run(db, run_key="queued-1", run_date=run_date, trigger_source="scheduled")
+        assert (queued, queued_again) == (True, False)
+
+        claimed = claim_queued_run(db, worker_id="a", lease_seconds=60)
+        assert (claimed.id, claimed.status, claimed.attempts, claimed.lease_owner) == (first.id, "leased", 1, "a")
+        assert claim_queued_run(db, worker_id="b", lease_seconds=60) is None
+
+        assert heartbeat_run_lease(db, item_id=first.id, worker_id="a", lease_seconds=60)
+        assert not heartbeat_run_lease(db, item_id=first.id, worker_id="b", lease_seconds=60)
+
+        assert finish_queued_run(db, item_id=first.id, worker_id="a", status="failed", error="boom")
+        # A failed item goes back on the queue when it is enqueued again.
+        item, requeued = enqueue_run(db, run_key="queued-1", run_date=run_date, trigger_source="scheduled")
+        assert (requeued, item.status, item.attempts) == (True, "queued", 0)
+
+
+def test_expired_leases_are_reclaimed(runner) -> None:
+    with runner.session_factory() as db:
+        enqueue_run(db, run_key="expiring", run_date=date(2026, 3, 1), trigger_source="manual")
+        item = claim_queued_run(db, worker_id="dead", lease_seconds=-1)
+
+        reclaimed = claim_queued_run(db, worker_id="alive", lease_seconds=60)
+        assert (reclaimed.id, reclaimed.attempts, reclaimed.lease_owner) == (item.id, 2, "alive")
+        assert not finish_queued_run(db, item_id=item.id, worker_id="dead", status="done")
+
+
+def test_workers_drain_the_queue_running_each_run_once(runner, temp_workspace: Path) -> None:
+    run_dates = [date(2026, 3, 1) + timedelta(days=offset) for offset in range(5)]
+    with runner.session_factory() as db:
+        for run_date in run_dates:
+            write_input(temp_workspace, run_date)
+            enqueue_run(db, run_key=f"queue-{run_date.isoformat()}", run_date=run_date, trigger_source="scheduled")
+
+    results = RunWorker(runner.settings, runner.session_factory, concurrency=3).drain()
+
+    assert [result.run_date for result in results] == run_dates
+    assert all(result.status == "succeeded" and not result.reused_existing_run for result in results)
+    with runner.session_factory() as db:
+        items = [get_queue_item(db, f"queue-{run_date.isoformat()}") for run_date in run_dates]
+        assert {(item.status, item.attempts, item.lease_owner) for item in items} == {("done", 1, None)}
+        assert sorted(item.run_id for item in items) == sorted(result.run_id for result in results)
+
+
+def test_run_abandoned_by_a_dead_worker_is_retried(runner, temp_workspace: Path) -> None:
+    run_date = date(2026, 3, 1)
+    write_input(temp_workspace, run_date)
+    with runner.session_factory() as db:
+        enqueue_run(db, run_key="abandoned", run_date=run_date, trigger_source="manual")
+        claim_queued_run(db, worker_id="dead", lease_seconds=-1)
+        run, _ = create_or_get_run(db, run_key="abandoned", run_date=run_date, trigger_source="manual")
+        mark_run_running(db, run)
+
+    results = RunWorker(runner.settings, runner.session_factory).drain()
+
+    assert [(result.run_key, result.status, result.reused_existing_run) for result in results] == [
+        ("abandoned", "succeeded", False)
+    ]
+    with runner.session_factory() as db:
+        item = get_queue_item(db, "abandoned")
+        assert (item.status, item.attempts) == ("done", 2)
+
+
+def test_items_past_max_attempts_are_failed_without_running(runner) -> None:
+    settings = replace(runner.settings, queue_max_attempts=1)
+    with runner.session_factory() as db:
+        enqueue_run(db, run_key="poison", run_date=date(2026, 3, 1), trigger_source="manual")
+        claim_queued_run(db, worker_id="dead", lease_seconds=-1)
+
+    assert RunWorker(settings, runner.session_factory).drain() == []
+    with runner.session_factory() as db:
+        item = get_queue_item(db, "poison")
+        assert (item.status, item.run_id) == ("failed", None)
+        assert "lease expired" in item.error